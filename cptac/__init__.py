@@ -12,33 +12,58 @@
 import pandas as pd
 import webbrowser
 import os.path as path
+import importlib
 import io
 import sys
 import warnings
 
 # Function imports
-from .file_download import download
-from .file_download import download_text as _download_text
+from .file_cache import cache_info, clear_cache
+from .version_check import check_version as _check_version
 from .exceptions import CptacError, CptacWarning, InvalidParameterError, NoInternetError, OldPackageVersionWarning
 
-# Dataset imports
-from .brca import Brca
-from .ccrcc import Ccrcc
-from .colon import Colon
-from .endometrial import Endometrial
-from .gbm import Gbm
-from .hnscc import Hnscc
-from .lscc import Lscc
-from .luad import Luad
-from .ovarian import Ovarian
+# Dataset imports. Each dataset module is only imported the first time its class is used, as is file_download, which pulls in requests and bs4.
+_LAZY_IMPORTS = {
+    "Brca": ".brca",
+    "Ccrcc": ".ccrcc",
+    "Colon": ".colon",
+    "Endometrial": ".endometrial",
+    "Gbm": ".gbm",
+    "Hnscc": ".hnscc",
+    "Lscc": ".lscc",
+    "Luad": ".luad",
+    "Ovarian": ".ovarian",
+    "download": ".file_download",
+    "utils": ".utils", # A subpackage, not a name in one
+}
+
+__all__ = [
+    "cache_info", "clear_cache",
+    "CptacError", "CptacWarning", "InvalidParameterError", "NoInternetError", "OldPackageVersionWarning",
+    "list_datasets", "embargo", "version", "how_to_cite",
+] + list(_LAZY_IMPORTS.keys()) # So "from cptac import *" gets the lazy names too, which it can't find in the module's globals
+
+def __getattr__(name):
+    """Import the module for a dataset class, function, or subpackage the first time it's used."""
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+    value = module if module.__name__ == f"{__name__}.{name}" else getattr(module, name)
+    globals()[name] = value # So we only go through __getattr__ once for each name
+    return value
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(_LAZY_IMPORTS.keys()))
 
 def list_datasets():
     """List all available datasets."""
 
     dataset_list_url = "https://byu.box.com/shared/static/5vwsvgu8fyzao0pb7rx8lt26huofcdax.tsv"
 
+    from .file_download import download_text
     try:
-        dataset_list_text = _download_text(dataset_list_url)
+        dataset_list_text = download_text(dataset_list_url)
     except NoInternetError:
         raise NoInternetError("Insufficient internet to download available dataset info. Check your internet connection.") from None
 
@@ -83,13 +108,5 @@ sys.excepthook = _exception_handler # Set our custom exception hook
 warnings.showwarning = _warning_displayer # And our custom warning displayer
 warnings.simplefilter("always", category=CptacWarning) # Edit the warnings filter to show multiple occurences of cptac-generated warnings
 
-# Check whether the package is up-to-date
-version_url = "https://byu.box.com/shared/static/kbwivmqnrdnn5im2gu6khoybk5a3rfl0.txt"
-try:
-    remote_version = _download_text(version_url)
-except NoInternetError:
-    pass
-else:
-    local_version = version()
-    if remote_version != local_version:
-        warnings.warn(f"Your version of cptac ({local_version}) is out-of-date. Latest is {remote_version}. Please run 'pip install --upgrade cptac' to update it.", OldPackageVersionWarning, stacklevel=2)
+# Check whether the package is up-to-date. This doesn't wait on the network: it uses the version we saved from the last check if it's less than a day old, and otherwise checks in a background thread. Set the CPTAC_NO_VERSION_CHECK environment variable to turn it off.
+_check_version()
@@ -15,16 +15,19 @@ import os
 import warnings
 from .dataset import Dataset
 from .dataframe_tools import *
+from .file_tools import read_gct
 from .exceptions import FailedReindexWarning, ReindexMapError
 
 class Brca(Dataset):
 
-    def __init__(self, version="latest", no_internet=False):
+    def __init__(self, version="latest", no_internet=False, lazy=False, n_jobs=1):
         """Load all of the brca dataframes as values in the self._data dict variable, with names as keys, and format them properly.
 
         Parameters:
         version (str, optional): The version number to load, or the string "latest" to just load the latest building. Default is "latest".
         no_internet (bool, optional): Whether to skip the index update step because it requires an internet connection. This will be skipped automatically if there is no internet at all, but you may want to manually skip it if you have a spotty internet connection. Default is False.
+        lazy (bool, optional): Whether to wait to parse each dataframe until it's first requested, instead of parsing them all now. Samples from each dataframe are added to the clinical dataframe as it's parsed. Default is False.
+        n_jobs (int, optional): The number of threads to parse the data files with, since they can be parsed independently. Pass -1 to use one thread for each CPU. Default is 1.
         """
 
         # Set some needed variables, and pass them to the parent Dataset class __init__ function
@@ -50,205 +53,183 @@ class Brca(Dataset):
                 "prosp-brca-v3.1-sample-annotation.csv.gz"],
         }
 
-        super().__init__(cancer_type="brca", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet)
+        # The files each table is parsed from, across all versions. This way, if we're loading lazily, we know which files to parse when a table is requested.
+        table_files = {
+            "acetylproteomics": ["prosp-brca-v3.1-acetylome-ratio-norm-NArm.gct.gz"],
+            "clinical": ["prosp-brca-v3.1-sample-annotation.csv.gz"],
+            "CNV": ["prosp-brca-v3.1-gene-level-cnv-gistic2-all_data_by_genes.gct.gz"],
+            "derived_molecular": ["prosp-brca-v3.1-sample-annotation.csv.gz"],
+            "followup": ["Breast_One_Year_Clinical_Data_20160927.xls"],
+            "phosphoproteomics": ["prosp-brca-v3.1-phosphoproteome-ratio-norm-NArm.gct.gz"],
+            "proteomics": ["prosp-brca-v3.1-proteome-ratio-norm-NArm.gct.gz"],
+            "somatic_mutation": ["prosp-brca-v3.0-v1.4.somatic.variants.070918.maf.gz"],
+            "transcriptomics": ["prosp-brca-v3.1-rnaseq-fpkm-log2-row-norm-2comp.gct.gz"],
+        }
 
-        # Load the data into dataframes in the self._data dict
-        loading_msg = f"Loading {self.get_cancer_type()} v{self.version()}"
-        for file_path in self._data_files_paths: # Loops through files variable
-
-            # Print a loading message. We add a dot every time, so the user knows it's not frozen.
-            loading_msg = loading_msg + "."
-            print(loading_msg, end='\r')
-
-            path_elements = file_path.split(os.sep) # Get a list of the levels of the path
-            file_name = path_elements[-1] # The last element will be the name of the file
-
-            if file_name == "prosp-brca-v3.1-acetylome-ratio-norm-NArm.gct.gz":
-                df = pd.read_csv(file_path, sep='\t', skiprows=2, dtype=object) # First two rows of file aren't part of the dataframe. Also, due to extra metadata rows we're going to remove, all cols have mixed types, so we pass dtype=object for now.
-                df = df[df["GeneSymbol"] != "na"] # There are several metadata rows at the beginning of the dataframe, which duplicate the clinical and derived_molecular dataframes. They all don't have a value for GeneSymbol, so we'll use that to filter them out.
-
-                # Prepare some columns we'll need later for the multiindex
-                df["variableSites"] = df["variableSites"].str.replace(r"[a-z\s]", "", regex=True) # Get rid of all lowercase delimeters and whitespace in the sites
-                df = df.rename(columns={
-                    "GeneSymbol": "Name",
-                    "variableSites": "Site",
-                    "sequence": "Peptide", # We take this instead of sequenceVML, to match the other datasets' format
-                    "accession_numbers": "Database_ID" # We take all accession numbers they have, instead of the singular accession_number column
-                    })
-
-                # Some rows have at least one localized acetylation site, but also have other acetylations that aren't localized. We'll drop those rows, if their localized sites are duplicated in another row, to avoid creating duplicates, because we only preserve information about the localized sites in a given row. However, if the localized sites aren't duplicated in another row, we'll keep the row.
-                split_ids = df["id"].str.split('_', expand=True)
-                unlocalized_to_drop = df.index[~split_ids[3].eq(split_ids[4]) & df.duplicated(["Name", "Site", "Peptide", "Database_ID"], keep=False)] # Column 3 of the split "id" column is number of phosphorylations detected, and column 4 is number of phosphorylations localized, so if the two values aren't equal, the row has at least one unlocalized site
-                df = df.drop(index=unlocalized_to_drop)
-
-                # Give it a multiindex
-                df = df.set_index(["Name", "Site", "Peptide", "Database_ID"])                
-
-                df = df.drop(columns=["id", "id.description", "geneSymbol", "numColumnsVMsiteObserved", "bestScore", "bestDeltaForwardReverseScore", 
-                "Best_scoreVML", "sequenceVML", "accessionNumber_VMsites_numVMsitesPresent_numVMsitesLocalizedBest_earliestVMsiteAA_latestVMsiteAA",
-                "protein_mw", "species", "speciesMulti", "orfCategory", "accession_number", "protein_group_num", "entry_name"]) # We don't need these. The dropped columns include a "geneSymbol" column that is a duplicate of the original GeneSymbol.
-                df = df.apply(pd.to_numeric) # Now that we've dropped all the extra metadata columns, convert everything to floats.
-                df = df.sort_index()
-                df = df.transpose()
-                df = df.sort_index()
-                df.index.name = "Patient_ID"
-                self._data["acetylproteomics"] = df
-
-            elif file_name == "prosp-brca-v3.1-gene-level-cnv-gistic2-all_data_by_genes.gct.gz":
-                df = pd.read_csv(file_path, sep='\t', skiprows=2, index_col=0, dtype=object) # First two rows of file aren't part of the dataframe. Also, due to extra metadata rows we're going to remove, all cols have mixed types, so we pass dtype=object for now.
-                df = df[df["geneSymbol"] != "na"] # There are several metadata rows at the beginning of the dataframe, which duplicate the clinical and derived_molecular dataframes. They all don't have a value for geneSymbol, so we'll use that to filter them out.
-                df = df.drop(columns="Cytoband")
-                df["geneSymbol"] = df["geneSymbol"].str.rsplit('|', n=1, expand=True)[0] # Some of the geneSymbols have the gene IDs appended to them, to get rid of duplicates. We're going to create a multiindex with all the gene names and gene IDs, so we can drop the appended IDs.
-                df = df.rename(columns={"geneSymbol": "Name", "Gene.ID": "Database_ID"})
-                df = df.set_index(["Name", "Database_ID"])
-                df = df.apply(pd.to_numeric) # Now that we've dropped all the extra metadata columns, convert everything to floats.
-                df = df.sort_index()
-                df = df.transpose()
-                df = df.sort_index()
-                df.index.name = "Patient_ID"
-                self._data["CNV"] = df
-
-            elif file_name == "prosp-brca-v3.1-phosphoproteome-ratio-norm-NArm.gct.gz":
-                df = pd.read_csv(file_path, sep='\t', skiprows=2, dtype=object) # First two rows of file aren't part of the dataframe. Also, due to extra metadata rows we're going to remove, all cols have mixed types, so we pass dtype=object for now.
-                df = df[df["GeneSymbol"] != "na"] # There are several metadata rows at the beginning of the dataframe, which duplicate the clinical and derived_molecular dataframes. They all don't have a value for GeneSymbol, so we'll use that to filter them out.
-
-                # Prepare some columns we'll need later for the multiindex
-                df["variableSites"] = df["variableSites"].str.replace(r"[a-z\s]", "", regex=True) # Get rid of all lowercase delimeters and whitespace in the sites
-                df = df.rename(columns={
-                    "GeneSymbol": "Name",
-                    "variableSites": "Site",
-                    "sequence": "Peptide", # We take this instead of sequenceVML, to match the other datasets' format
-                    "accession_numbers": "Database_ID" # We take all accession numbers they have, instead of the singular accession_number column
-                    })
-
-                # Some rows have at least one localized phosphorylation site, but also have other phosphorylations that aren't localized. We'll drop those rows, if their localized sites are duplicated in another row, to avoid creating duplicates, because we only preserve information about the localized sites in a given row. However, if the localized sites aren't duplicated in another row, we'll keep the row.
-                split_ids = df["id"].str.split('_', expand=True)
-                unlocalized_to_drop = df.index[~split_ids[3].eq(split_ids[4]) & df.duplicated(["Name", "Site", "Peptide", "Database_ID"], keep=False)] # Column 3 of the split "id" column is number of phosphorylations detected, and column 4 is number of phosphorylations localized, so if the two values aren't equal, the row has at least one unlocalized site
-                df = df.drop(index=unlocalized_to_drop)
-
-                # Give it a multiindex
-                df = df.set_index(["Name", "Site", "Peptide", "Database_ID"])                
-
-                df = df.drop(columns=["id", "id.description", "geneSymbol", "numColumnsVMsiteObserved", "bestScore", "bestDeltaForwardReverseScore",
-                "Best_scoreVML", "Best_numActualVMSites_sty", "Best_numLocalizedVMsites_sty", "sequenceVML",
-                "accessionNumber_VMsites_numVMsitesPresent_numVMsitesLocalizedBest_earliestVMsiteAA_latestVMsiteAA", "protein_mw", "species",
-                "speciesMulti", "orfCategory", "accession_number", "protein_group_num", "entry_name"]) # We don't need these. The dropped columns include a "geneSymbol" column that is a duplicate of the original GeneSymbol.
-                df = df.apply(pd.to_numeric) # Now that we've dropped all the extra metadata columns, convert everything to floats.
-                df = df.sort_index()
-                df = df.transpose()
-                df = df.sort_index()
-                df.index.name = "Patient_ID"
-                self._data["phosphoproteomics"] = df
-
-            elif file_name == "prosp-brca-v3.1-proteome-ratio-norm-NArm.gct.gz":
-                df = pd.read_csv(file_path, sep='\t', skiprows=2, dtype=object) # First two rows of file aren't part of the dataframe. Also, due to extra metadata rows we're going to remove, all cols have mixed types, so we pass dtype=object for now.
-                df = df[df["GeneSymbol"] != "na"] # There are several metadata rows at the beginning of the dataframe, which duplicate the clinical and derived_molecular dataframes. They all don't have a value for GeneSymbol, so we'll use that to filter them out.
-
-                df = df.rename(columns={"GeneSymbol": "Name", "accession_numbers": "Database_ID"})
-                df = df.set_index(["Name", "Database_ID"])
-                df = df.drop(columns=["id", "id.description", "geneSymbol", "numColumnsProteinObserved", "numSpectraProteinObserved",
-                "protein_mw", "percentCoverage", "numPepsUnique", "scoreUnique", "species", "orfCategory", "accession_number", 
-                "subgroupNum", "entry_name"]) # We don't need these. The dropped columns include a "geneSymbol" column that is a duplicate of GeneSymbol.
-                df = df.apply(pd.to_numeric) # Now that we've dropped all the extra metadata columns, convert everything to floats.
-                df = df.sort_index()
-                df = df.transpose()
-                df = df.sort_index()
-                df.index.name = "Patient_ID"
-                self._data["proteomics"] = df
-
-            elif file_name == "prosp-brca-v3.1-rnaseq-fpkm-log2-row-norm-2comp.gct.gz":
-                df = pd.read_csv(file_path, sep='\t', skiprows=2, index_col=0, dtype=object) # First two rows of file aren't part of the dataframe. Also, due to extra metadata rows we're going to remove, all cols have mixed types, so we pass dtype=object for now.
-                df = df[df["geneSymbol"] != "na"] # There are several metadata rows at the beginning of the dataframe, which duplicate the clinical and derived_molecular dataframes. They all don't have a value for GeneSymbol, so we'll use that to filter them out.
-                df = df.set_index("geneSymbol")
-                df = df.drop(columns="description") # We don't need this.
-                df = df.apply(pd.to_numeric) # Now that we've dropped all the extra metadata columns, convert everything to floats.
-                df = df.sort_index()
-                df = df.transpose()
-                df = df.sort_index()
-                df.index.name = "Patient_ID"
-                self._data["transcriptomics"] = df
-
-            elif file_name == "prosp-brca-v3.1-sample-annotation.csv.gz":
-                df = pd.read_csv(file_path, index_col=0)
-                df = df.drop(columns="Participant") # This column is just a duplicate of the index
-                df = df.rename(columns={"Sample.IDs": "Replicate_Measurement_IDs", "Type": "Sample_Tumor_Normal"})
-                df = df.replace("unknown", np.nan)
-                df = df.astype({"Age.in.Month": np.float64})
-                df.index.name = "Patient_ID"
-                self._data["metadata"] = df
-
-            elif file_name == "Breast_One_Year_Clinical_Data_20160927.xls" and self._version == "3.1.1":
-                df = pd.read_excel(file_path)
-
-                # Replace redundant values for "not reported" with NaN
-                nan_equivalents = ['Not Reported/ Unknown', 'Reported/ Unknown', 'Not Reported / Unknown', 'Not Reported /Unknown',
-                    'Not Applicable', 'not applicable', 'Not applicable;', 'na', 'Not Performed', 'Not Performed;',
-                    'Unknown tumor status', 'Unknown Tumor Status','Unknown', 'unknown', 'Not specified', 'Not Reported/ Unknown;']
-
-                df = df.replace(nan_equivalents, np.nan)
-
-                # Set and name the index
-                df = df.rename(columns={"Participant ID": "Patient_ID"})
-                df["Patient_ID"] = "X" + df["Patient_ID"]
-                df = df.set_index("Patient_ID")
-                df = df.sort_index()
-
-                self._data["followup"] = df
-
-            elif file_name == "prosp-brca-v3.0-v1.4.somatic.variants.070918.maf.gz" and self._version == "3.1.1":
-                df = pd.read_csv(file_path, sep='\t')
-                df = df.rename(columns={"Sample.ID": "Patient_ID"})
-
-                df = df[['Patient_ID','Hugo_Symbol','Variant_Classification','HGVSp_Short']]
-                df = df.rename(columns={
-                    "Hugo_Symbol":"Gene",
-                    "Variant_Classification":"Mutation",
-                    "HGVSp_Short":"Location"}) # Rename the columns we want to keep to the appropriate names
-
-                df = df.sort_values(by=["Patient_ID", "Gene"])
-                df = df.set_index("Patient_ID")
-
-                self._data["somatic_mutation"] = df
-
-        print(' ' * len(loading_msg), end='\r') # Erase the loading message
-        formatting_msg = "Formatting dataframes..."
-        print(formatting_msg, end='\r')
-
-        # Separate the clinical and derived_molecular dataframes
-        metadata = self._data["metadata"]
-        del self._data["metadata"] # We'll replace it, split into clinical and derived_molecular
-        clinical = metadata[[
-             "Replicate_Measurement_IDs", "Sample_Tumor_Normal", "Age.in.Month", "Gender", "Race", "Human.Readable.Label", "Experiment", "Channel", "Stage", 
-             "PAM50", "NMF.v2.1", "ER", "PR", "ER.IHC.Score", "PR.IHC.Score", "Coring.or.Excision", "Ischemia.Time.in.Minutes", 
-             "Ischemia.Decade", "Necrosis", "Tumor.Cellularity", "Total.Cellularity", "In.CR", "QC.status"]]
-        self._data["clinical"] = clinical
-
-        derived_molecular = metadata[[
-            "HER2.IHC.Score", "HER2.FISH.Status", "HER2.original", "HER2.Amplified", "HER2.refined", "STARD3.ERBB2.GRB7.protein", 
-            "HER2.class.Satpathy", "HER2.status.Satpathy", "PAM50.Her2.CNA", "PAM50.Her2.HER2.status", "CDH1.mutation", 
-            "GATA3.mutation", "MAP3K1.mutation", "PIK3CA.mutation", "PTEN.mutation", "TP53.mutation", "CDH1.mutation.status", 
-            "GATA3.mutation.status", "MAP3K1.mutation.status", "PIK3CA.mutation.status", "PTEN.mutation.status", "TP53.mutation.status", 
-            "Number.of.Mutations", "Number.of.Mutated.Genes", "Chromosome.INstability.index.CIN.", "ESTIMATE.TumorPurity", 
-            "ESTIMATE.ImmuneScore", "ESTIMATE.StromalScore", "xCell.ImmuneScore", "xCell.StromaScore", "Cibersort.Absolute.score", "Stemness.Score"]]
-        self._data["derived_molecular"] = derived_molecular
-
-        # Get a union of all dataframes' indices, with duplicates removed
-        master_index = unionize_indices(self._data, exclude="followup")
-
-        # Use the master index to reindex the clinical dataframe, so the clinical dataframe has a record of every sample in the dataset. Rows that didn't exist before (such as the rows for normal samples) are filled with NaN.
-        clinical = self._data["clinical"]
-        clinical = clinical.reindex(master_index)
-
-        # Fill in NaNs in the clinical table's Sample_Tumor_Normal column
-        clinical["Sample_Tumor_Normal"] = clinical["Sample_Tumor_Normal"].where(cond=~(pd.isnull(clinical["Sample_Tumor_Normal"]) & ~clinical.index.str.endswith(".N")), other="Tumor")
+        super().__init__(cancer_type="brca", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet)
 
-        # Replace the clinical dataframe in the data dictionary with our new and improved version!
-        self._data['clinical'] = clinical
+        # Load the data into dataframes in the self._data dict, and format them
+        self._load_data(table_files=table_files, lazy=lazy, n_jobs=n_jobs)
 
-        # Call function from dataframe_tools.py to sort all tables first by sample status, and then by the index
-        self._data = sort_all_rows(self._data)
+    def _parse_file(self, file_path):
+        """Parse one of the brca data files into dataframes.
 
-        # Call function from dataframe_tools.py to standardize the names of the index and column axes
-        self._data = standardize_axes_names(self._data)
+        Parameters:
+        file_path (str): The path to the file to parse.
 
-        print(" " * len(formatting_msg), end='\r') # Erase the formatting message
+        Returns:
+        dict: The dataframes parsed from the file. Keys are str of dataframe names, values are pandas.DataFrame
+        """
+        data = {}
+        path_elements = file_path.split(os.sep) # Get a list of the levels of the path
+        file_name = path_elements[-1] # The last element will be the name of the file
+
+        if file_name == "prosp-brca-v3.1-acetylome-ratio-norm-NArm.gct.gz":
+            row_annotations, df = read_gct(file_path)
+            row_annotations = row_annotations[row_annotations["GeneSymbol"] != "na"] # Drop any sites without a gene symbol. The metadata rows at the beginning of the file, which duplicate the clinical and derived_molecular dataframes, are already skipped by read_gct.
+
+            # Prepare some columns we'll need later for the multiindex
+            row_annotations["variableSites"] = row_annotations["variableSites"].str.replace(r"[a-z\s]", "", regex=True) # Get rid of all lowercase delimeters and whitespace in the sites
+            row_annotations = row_annotations.rename(columns={
+                "GeneSymbol": "Name",
+                "variableSites": "Site",
+                "sequence": "Peptide", # We take this instead of sequenceVML, to match the other datasets' format
+                "accession_numbers": "Database_ID" # We take all accession numbers they have, instead of the singular accession_number column
+                })
+
+            # Some rows have at least one localized acetylation site, but also have other acetylations that aren't localized. We'll drop those rows, if their localized sites are duplicated in another row, to avoid creating duplicates, because we only preserve information about the localized sites in a given row. However, if the localized sites aren't duplicated in another row, we'll keep the row.
+            split_ids = row_annotations["id"].str.split('_', expand=True)
+            unlocalized_to_drop = row_annotations.index[~split_ids[3].eq(split_ids[4]) & row_annotations.duplicated(["Name", "Site", "Peptide", "Database_ID"], keep=False)] # Column 3 of the split "id" column is number of phosphorylations detected, and column 4 is number of phosphorylations localized, so if the two values aren't equal, the row has at least one unlocalized site
+            row_annotations = row_annotations.drop(index=unlocalized_to_drop)
+
+            # Give it a multiindex
+            df = df[row_annotations.index]
+            df.columns = pd.MultiIndex.from_frame(row_annotations[["Name", "Site", "Peptide", "Database_ID"]])
+
+            df = df.sort_index(axis=1)
+            df = df.sort_index()
+            df.index.name = "Patient_ID"
+            data["acetylproteomics"] = df
+
+        elif file_name == "prosp-brca-v3.1-gene-level-cnv-gistic2-all_data_by_genes.gct.gz":
+            row_annotations, df = read_gct(file_path)
+            row_annotations = row_annotations[row_annotations["geneSymbol"] != "na"] # Drop any genes without a gene symbol. The metadata rows at the beginning of the file, which duplicate the clinical and derived_molecular dataframes, are already skipped by read_gct.
+            row_annotations["geneSymbol"] = row_annotations["geneSymbol"].str.rsplit('|', n=1, expand=True)[0] # Some of the geneSymbols have the gene IDs appended to them, to get rid of duplicates. We're going to create a multiindex with all the gene names and gene IDs, so we can drop the appended IDs.
+            row_annotations = row_annotations.rename(columns={"geneSymbol": "Name", "Gene.ID": "Database_ID"})
+            df = df[row_annotations.index]
+            df.columns = pd.MultiIndex.from_frame(row_annotations[["Name", "Database_ID"]])
+            df = df.sort_index(axis=1)
+            df = df.sort_index()
+            df.index.name = "Patient_ID"
+            data["CNV"] = df
+
+        elif file_name == "prosp-brca-v3.1-phosphoproteome-ratio-norm-NArm.gct.gz":
+            row_annotations, df = read_gct(file_path)
+            row_annotations = row_annotations[row_annotations["GeneSymbol"] != "na"] # Drop any sites without a gene symbol. The metadata rows at the beginning of the file, which duplicate the clinical and derived_molecular dataframes, are already skipped by read_gct.
+
+            # Prepare some columns we'll need later for the multiindex
+            row_annotations["variableSites"] = row_annotations["variableSites"].str.replace(r"[a-z\s]", "", regex=True) # Get rid of all lowercase delimeters and whitespace in the sites
+            row_annotations = row_annotations.rename(columns={
+                "GeneSymbol": "Name",
+                "variableSites": "Site",
+                "sequence": "Peptide", # We take this instead of sequenceVML, to match the other datasets' format
+                "accession_numbers": "Database_ID" # We take all accession numbers they have, instead of the singular accession_number column
+                })
+
+            # Some rows have at least one localized phosphorylation site, but also have other phosphorylations that aren't localized. We'll drop those rows, if their localized sites are duplicated in another row, to avoid creating duplicates, because we only preserve information about the localized sites in a given row. However, if the localized sites aren't duplicated in another row, we'll keep the row.
+            split_ids = row_annotations["id"].str.split('_', expand=True)
+            unlocalized_to_drop = row_annotations.index[~split_ids[3].eq(split_ids[4]) & row_annotations.duplicated(["Name", "Site", "Peptide", "Database_ID"], keep=False)] # Column 3 of the split "id" column is number of phosphorylations detected, and column 4 is number of phosphorylations localized, so if the two values aren't equal, the row has at least one unlocalized site
+            row_annotations = row_annotations.drop(index=unlocalized_to_drop)
+
+            # Give it a multiindex
+            df = df[row_annotations.index]
+            df.columns = pd.MultiIndex.from_frame(row_annotations[["Name", "Site", "Peptide", "Database_ID"]])
+
+            df = df.sort_index(axis=1)
+            df = df.sort_index()
+            df.index.name = "Patient_ID"
+            data["phosphoproteomics"] = df
+
+        elif file_name == "prosp-brca-v3.1-proteome-ratio-norm-NArm.gct.gz":
+            row_annotations, df = read_gct(file_path)
+            row_annotations = row_annotations[row_annotations["GeneSymbol"] != "na"] # Drop any proteins without a gene symbol. The metadata rows at the beginning of the file, which duplicate the clinical and derived_molecular dataframes, are already skipped by read_gct.
+
+            row_annotations = row_annotations.rename(columns={"GeneSymbol": "Name", "accession_numbers": "Database_ID"})
+            df = df[row_annotations.index]
+            df.columns = pd.MultiIndex.from_frame(row_annotations[["Name", "Database_ID"]])
+            df = df.sort_index(axis=1)
+            df = df.sort_index()
+            df.index.name = "Patient_ID"
+            data["proteomics"] = df
+
+        elif file_name == "prosp-brca-v3.1-rnaseq-fpkm-log2-row-norm-2comp.gct.gz":
+            row_annotations, df = read_gct(file_path)
+            row_annotations = row_annotations[row_annotations["geneSymbol"] != "na"] # Drop any genes without a gene symbol. The metadata rows at the beginning of the file, which duplicate the clinical and derived_molecular dataframes, are already skipped by read_gct.
+            df = df[row_annotations.index]
+            df.columns = pd.Index(row_annotations["geneSymbol"])
+            df = df.sort_index(axis=1)
+            df = df.sort_index()
+            df.index.name = "Patient_ID"
+            data["transcriptomics"] = df
+
+        elif file_name == "prosp-brca-v3.1-sample-annotation.csv.gz":
+            df = pd.read_csv(file_path, index_col=0)
+            df = df.drop(columns="Participant") # This column is just a duplicate of the index
+            df = df.rename(columns={"Sample.IDs": "Replicate_Measurement_IDs", "Type": "Sample_Tumor_Normal"})
+            df = df.replace("unknown", np.nan)
+            df = df.astype({"Age.in.Month": np.float64})
+            df.index.name = "Patient_ID"
+
+            # Separate the clinical and derived_molecular dataframes
+            data["clinical"] = df[[
+                 "Replicate_Measurement_IDs", "Sample_Tumor_Normal", "Age.in.Month", "Gender", "Race", "Human.Readable.Label", "Experiment", "Channel", "Stage", 
+                 "PAM50", "NMF.v2.1", "ER", "PR", "ER.IHC.Score", "PR.IHC.Score", "Coring.or.Excision", "Ischemia.Time.in.Minutes", 
+                 "Ischemia.Decade", "Necrosis", "Tumor.Cellularity", "Total.Cellularity", "In.CR", "QC.status"]]
+
+            data["derived_molecular"] = df[[
+                "HER2.IHC.Score", "HER2.FISH.Status", "HER2.original", "HER2.Amplified", "HER2.refined", "STARD3.ERBB2.GRB7.protein", 
+                "HER2.class.Satpathy", "HER2.status.Satpathy", "PAM50.Her2.CNA", "PAM50.Her2.HER2.status", "CDH1.mutation", 
+                "GATA3.mutation", "MAP3K1.mutation", "PIK3CA.mutation", "PTEN.mutation", "TP53.mutation", "CDH1.mutation.status", 
+                "GATA3.mutation.status", "MAP3K1.mutation.status", "PIK3CA.mutation.status", "PTEN.mutation.status", "TP53.mutation.status", 
+                "Number.of.Mutations", "Number.of.Mutated.Genes", "Chromosome.INstability.index.CIN.", "ESTIMATE.TumorPurity", 
+                "ESTIMATE.ImmuneScore", "ESTIMATE.StromalScore", "xCell.ImmuneScore", "xCell.StromaScore", "Cibersort.Absolute.score", "Stemness.Score"]]
+
+        elif file_name == "Breast_One_Year_Clinical_Data_20160927.xls" and self._version == "3.1.1":
+            df = pd.read_excel(file_path)
+
+            # Replace redundant values for "not reported" with NaN
+            nan_equivalents = ['Not Reported/ Unknown', 'Reported/ Unknown', 'Not Reported / Unknown', 'Not Reported /Unknown',
+                'Not Applicable', 'not applicable', 'Not applicable;', 'na', 'Not Performed', 'Not Performed;',
+                'Unknown tumor status', 'Unknown Tumor Status','Unknown', 'unknown', 'Not specified', 'Not Reported/ Unknown;']
+
+            df = df.replace(nan_equivalents, np.nan)
+
+            # Set and name the index
+            df = df.rename(columns={"Participant ID": "Patient_ID"})
+            df["Patient_ID"] = "X" + df["Patient_ID"]
+            df = df.set_index("Patient_ID")
+            df = df.sort_index()
+
+            data["followup"] = df
+
+        elif file_name == "prosp-brca-v3.0-v1.4.somatic.variants.070918.maf.gz" and self._version == "3.1.1":
+            df = pd.read_csv(file_path, sep='\t', usecols=["Sample.ID", "Hugo_Symbol", "Variant_Classification", "HGVSp_Short"], dtype={"Hugo_Symbol": "category", "Variant_Classification": "category"}) # We don't need any of the other columns, so we don't read them. Genes and mutations repeat a lot, so we store them as categoricals.
+            df = df.rename(columns={"Sample.ID": "Patient_ID"})
+
+            df = df[['Patient_ID','Hugo_Symbol','Variant_Classification','HGVSp_Short']] # usecols keeps the columns in the order they're in the file, so this puts them in the order we want
+            df = df.rename(columns={
+                "Hugo_Symbol":"Gene",
+                "Variant_Classification":"Mutation",
+                "HGVSp_Short":"Location"}) # Rename the columns we want to keep to the appropriate names
+
+            df = df.sort_values(by=["Patient_ID", "Gene"])
+            df = df.set_index("Patient_ID")
+
+            data["somatic_mutation"] = df
+
+        return data
+
+    def _impute_sample_status(self, clinical):
+        """Fill in NaNs in the brca clinical dataframe's Sample_Tumor_Normal column. Samples with a Patient_ID that doesn't end in ".N" are tumor samples."""
+        clinical["Sample_Tumor_Normal"] = clinical["Sample_Tumor_Normal"].where(cond=~(pd.isnull(clinical["Sample_Tumor_Normal"]) & ~clinical.index.str.endswith(".N")), other="Tumor")
+        return clinical
@@ -16,18 +16,23 @@ import warnings
 
 from .dataset import Dataset
 from .dataframe_tools import *
-from .exceptions import FailedReindexWarning, ReindexMapError
+from .exceptions import FailedReindexWarning, InvalidParameterError, ReindexMapError
 
 class Ccrcc(Dataset):
 
-    def __init__(self, version="latest", no_internet=False):
+    def __init__(self, version="latest", no_internet=False, lazy=False, n_jobs=1):
         """Load all of the ccrcc dataframes as values in the self._data dict variable, with names as keys, and format them properly.
 
         Parameters:
         version (str, optional): The version number to load, or the string "latest" to just load the latest building. Default is "latest".
         no_internet (bool, optional): Whether to skip the index update step because it requires an internet connection. This will be skipped automatically if there is no internet at all, but you may want to manually skip it if you have a spotty internet connection. Default is False.
+        lazy (bool, optional): Not supported for the ccrcc dataset, since its tables have to be formatted together. Passing True raises an InvalidParameterError. Default is False.
+        n_jobs (int, optional): The number of threads to parse the data files with, since they can be parsed independently. Pass -1 to use one thread for each CPU. Default is 1.
         """
 
+        if lazy:
+            raise InvalidParameterError("The ccrcc dataset can't be loaded lazily, because its tables are reindexed with columns of the clinical dataframe, and its CNV and methylation tables are filtered by the samples in the proteomics table, so they have to be loaded together. Pass lazy=False.")
+
         # Set some needed variables, and pass them to the parent Dataset class __init__ function
 
         valid_versions = ["0.0", "0.1", "0.1.1"] # This keeps a record of all versions that the code is equipped to handle. That way, if there's a new data release but they didn't update their package, it won't try to parse the new data version it isn't equipped to handle.
@@ -73,206 +78,218 @@ class Ccrcc(Dataset):
 
         super().__init__(cancer_type="ccrcc", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet)
 
+        # Load the data into dataframes in the self._data dict, and format them
+        # Warning filters are shared by the whole process, so we set this one here, around all the parsing, instead of in _parse_file, where threads parsing other files at the same time could lose or keep it
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", "Unknown extension is not supported and will be removed") # This warning is just due to some formatting on the S044 clinical spreadsheet. We don't need to worry about it.
+            self._load_data(n_jobs=n_jobs)
+
+    def _parse_file(self, file_path):
+        """Parse one of the ccrcc data files into dataframes.
+
+        Parameters:
+        file_path (str): The path to the file to parse.
+
+        Returns:
+        dict: The dataframes parsed from the file. Keys are str of dataframe names, values are pandas.DataFrame
+        """
+        data = {}
+
         # We're going to need to drop the samples below from a couple dataframes
         nci_labels = ["NCI7-1", "NCI7-2", "NCI7-3", "NCI7-4", "NCI7-5"]
         nci_dotted_labels = [label.replace("-", ".") for label in nci_labels]
         qc_labels = ["QC1", "QC2", "QC3", "QC4", "QC5", "QC6", "QC7", "QC8"]
 
-        # We have multiple clinical files, so we'll load those into a separate dict, and combine them later
+        path_elements = file_path.split(os.sep) # Get a list of the levels of the path
+        file_name = path_elements[-1] # The last element will be the name of the file
+        df_name = file_name.split(".")[0] # Our dataframe name will be the first section of file name (i.e. proteomics.txt.gz becomes proteomics)
+
+        if file_name == "6_CPTAC3_CCRCC_Phospho_abundance_gene_protNorm=2_CB_imputed.tsv.gz":
+            df = pd.read_csv(file_path, sep='\t', index_col=0)
+            ref_intensities = df["ReferenceIntensity"] # Copy this out, so we can subtract the reference intensities later
+            df = df.drop(columns=["NumberPSM", "Proteins", "ReferenceIntensity"] + nci_dotted_labels + qc_labels)
+            df = df.subtract(ref_intensities, axis="index") # Subtract reference intensities from all the values, to get ratios
+            df = df.transpose()
+            data["phosphoproteomics_gene"] = df
+
+        elif file_name == "6_CPTAC3_CCRCC_Phospho_abundance_phosphosite_protNorm=2_CB.tsv.gz":
+            df = pd.read_csv(file_path, sep='\t')
+
+            # Drop unlocalized sites
+            unlocalized_sites = (df["Index"].str.rsplit("_", n=1, expand=True)[1] == '0') 
+            df = df[~unlocalized_sites]
+
+            # Drop unwanted samples
+            df = df.drop(columns=nci_labels + qc_labels)
+
+            # Subtract reference intensities from numerical data columns, to get ratios
+            df = df.rename(columns={"Gene": "Name"})
+            metadata_cols = ["Index", "Name", "Peptide", "ReferenceIntensity"]
+            metadata = df[metadata_cols] # Extract these for later
+            df = df.drop(columns=metadata_cols) # Get the df to contain just the numerical data columns
+            ref_intensities = metadata["ReferenceIntensity"]
+            df = df.subtract(ref_intensities, axis="index") # Subtract reference intensities
+            df = metadata.join(df, how="outer") # Put the metadata columns back in
+            df = df.drop(columns="ReferenceIntensity") # Don't need this anymore
+
+            # Parse a few columns out of the "Index" column that we'll need for our multiindex
+            split_ids = df["Index"].str.split('_', expand=True)
+            df = df.drop(columns="Index")
+            sites = split_ids.iloc[:, -1]
+            database_ids = split_ids[0].str.cat(split_ids[1], sep='_')
+            df = df.assign(**{"Site": sites, "Database_ID": database_ids})
+
+            # Some rows have at least one localized phosphorylation site, but also have other phosphorylations that aren't localized. We'll drop those rows, if their localized sites are duplicated in another row, to avoid creating duplicates, because we only preserve information about the localized sites in a given row. However, if the localized sites aren't duplicated in another row, we'll keep the row.
+            unlocalized_to_drop = df.index[~split_ids[4].eq(split_ids[5]) & df.duplicated(["Name", "Site", "Peptide", "Database_ID"], keep=False)] # Column 4 of the split "Index" column is number of phosphorylations detected, and column 5 is number of phosphorylations localized, so if the two values aren't equal, the row has at least one unlocalized site
+            df = df.drop(index=unlocalized_to_drop)
+
+            # Give it a multiindex
+            df = df.set_index(["Name", "Site", "Peptide", "Database_ID"]) # This will create a multiindex from these columns, in this order.
+            df = df.sort_index()
+            df = df.transpose()
+            df = df.sort_index()
+            data["phosphoproteomics"] = df
+        
+        elif file_name == "6_CPTAC3_CCRCC_Whole_abundance_protein_pep=unique_protNorm=2_CB.tsv.gz":
+            df = pd.read_csv(file_path, sep='\t')
+            df = df.rename(columns={"Proteins": "Name", "Index": "Database_ID"})
+            df = df.set_index(["Name", "Database_ID"])
+            ref_intensities = df["ReferenceIntensity"] # Copy this out, so we can subtract the reference intensities later
+            df = df.drop(columns=["NumberPSM", "ReferenceIntensity"] + nci_labels + qc_labels)
+            df = df.subtract(ref_intensities, axis="index") # Subtract reference intensities from all the values, to get ratios
+            df = df.sort_index()
+            df = df.transpose()
+            df = df.sort_index()
+            data["proteomics"] = df
+        
+        elif file_name == "Clinical Table S1.xlsx":
+            df = pd.\
+                read_excel(file_path, sheet_name="ccrcc_clinical_characteristics", index_col=0).\
+                dropna(how="all", axis=0).\
+                dropna(how="all", axis=1)
+            df.index.name = "Patient_ID" # The index is currently "case_id", but we call that "Patient_ID"
+            data["authoritative_clinical"] = df
+        
+        elif file_name == "ccrcc.somatic.consensus.gdc.umichigan.wu.112918.maf.gz":
+            df = pd.read_csv(file_path, sep='\t', usecols=["Tumor_Sample_Barcode", "Hugo_Symbol", "Variant_Classification", "HGVSp_Short"], dtype={"Hugo_Symbol": "category", "Variant_Classification": "category"}) # We don't need any of the other columns, so we don't read them. Genes and mutations repeat a lot, so we store them as categoricals.
+            split_barcode = df["Tumor_Sample_Barcode"].str.split("_", n=1, expand=True) # The first part of the barcode is the patient id, which we need want to make the index
+            df["Tumor_Sample_Barcode"] = split_barcode[0]
+            df = df[["Tumor_Sample_Barcode","Hugo_Symbol","Variant_Classification","HGVSp_Short"]] # usecols keeps the columns in the order they're in the file, so this puts them in the order we want
+            df = df.rename(columns={"Tumor_Sample_Barcode":"Patient_ID","Hugo_Symbol":"Gene","Variant_Classification":"Mutation","HGVSp_Short":"Location"})                
+            df = df.sort_values(by=["Patient_ID", "Gene"])
+            df = df.set_index("Patient_ID")
+            data["somatic_mutation"] = df
+
+        elif file_name == "ccrccMethylGeneLevelByMean.txt.gz":
+            df = pd.read_csv(file_path, sep='\t')
+            df = df.sort_index()
+            df = df.transpose()
+            df.index.name = "Patient_ID"
+            data["methylation"] = df
+
+        elif file_name == "cptac-metadata.xls.gz":
+            df = pd.read_csv(file_path, index_col=0)
+            df = df.drop(index=["pooled sample"] + nci_labels + qc_labels) # Drop the pooled samples in addition to other samples to exclude
+            data["metadata_and_keys"] = df
+        
+        elif file_name == "kirc_wgs_cnv_gene.csv.gz":
+            df = pd.read_csv(file_path)
+            df = df.rename(columns={"gene_name": "Name", "gene_id": "Database_ID"})
+            df = df.set_index(["Name", "Database_ID"])
+            df = df.sort_index()
+            df = df.transpose()
+
+            # The dataframe contains 4 rows for each sample: lr.loc_***,  lr.seg_***, mzd.loc_***, or  mzd.seg_*** where *** is the 
+            # Patient_ID. "lr" stands for log ratio, and "mzd" stands for Mean Zygosity Deviation. “lr.loc” is based on average of lr 
+            # of probes belonging to each gene. “lr.seg” is based on segmented CNV result (i.e. first performed segmentation based on 
+            # probe level data, and then use the lr of the representative segment of each gene as the gene-level lr). They used the
+            # lr.seg values in the paper, so we'll use those.
+            df = df.drop(index=df[~df.index.str.startswith("lr.seg")].index)
+
+            # Parse a Patient_ID index out of the current index
+            barcode_col = df.index.to_series()
+            split_barcode = barcode_col.str.split("_", n=1, expand=True) # The second part of the barcode is the patient id, which we want to make the index
+            df.index = pd.Index(split_barcode[1])
+            df.index.name = "Patient_ID"
+
+            df = df.sort_index()
+            data["CNV"] = df
+
+        elif file_name == "RNA_Normal_Tumor_185_samples.tsv.gz":
+            df = pd.read_csv(file_path, sep='\t')
+            df = df.sort_index()
+            df = df.transpose()
+
+            # There are a couple duplicate column headers, but they're full of just zeros. We'll drop them.
+            # You can do this with a one liner: df =  df.loc[:, ~df.columns.duplicated(keep=False) | (df != 0).any(axis=0)]
+            # But the one liner is about 100 times slower.
+            dups = df.loc[:, df.columns.duplicated(keep=False)] # Select all the columns with duplicated headers
+            dups = dups.loc[:, (dups != 0).any(axis=0)] # Get only the columns that aren't all zeros
+            df = df.loc[:, ~df.columns.duplicated(keep=False)] # Get rid of the duplicate columns from the original dataframe
+            df = df.join(dups, how="outer") # Sub in our un-duplicated selections
+            df = df.sort_index(axis="columns") # Get all the column names in order again
+
+            data["transcriptomics"] = df
+        
+        elif file_name == "S044_CPTAC_CCRCC_Discovery_Cohort_Clinical_Data_r3_Mar2019.xlsx":
+
+            clinical_sheets = pd.read_excel(file_path,
+                sheet_name=['Patient_Clinical_Attributes', 'Other_Medical_Information', 'Specimen_Attributes'],
+                index_col=0,
+                usecols=lambda x: x != "tumor_code") # Don't load the tumor_code column in any of them--it's just "CCRCC" for every row. The formatting warning this gives is filtered in __init__.
+
+            for sheet, df in clinical_sheets.items(): # Return them with the other clinical dataframes, to be combined when we format the dataframes
+                df.index.name = "Patient_ID" # The indices are currently "case_id", but we call that "Patient_ID"
+                data[sheet] = df
+
+        elif file_name == "Table S7.xlsx":
+            immune_groups = pd.\
+                read_excel(
+                    file_path, 
+                    sheet_name="xCell Signatures", 
+                    index_col = 0, 
+                    header=None,
+                    skiprows=range(0, 3)
+                ).\
+                transpose()
+            immune_groups = immune_groups[["Samples", "Immune Group"]] # We only need these columns
+            immune_groups = immune_groups.set_index("Samples")
+            data["immune_groups"] = immune_groups
+
+        elif file_name == 'CCRCC_followup_9_12.xlsx' and self._version == "0.1.1":
+            df = pd.read_excel(file_path)
+
+            # Replace redundant values for "not reported" with NaN
+            nan_equivalents = ['Not Reported/ Unknown', 'Reported/ Unknown', 'Not Applicable', 'na',
+                'unknown', 'Not Performed', 'Unknown tumor status', 'Unknown', ' Unknown', 'Unknown ',
+                'Unknown Tumor Status', 'Not specified']
+
+            df = df.replace(nan_equivalents, np.nan)
+
+            # Replace redundanct values in "Cause of Death" column
+            disease_prog_equivalents = ['Metastatic Renal Cell Carcinoma', 'Tumor progression',
+                'Progression of disease', 'Progression of disease ', 'Tumor', 'Disease progression',
+                'Progressive Disease', 'Disease progression', 'disease progression ', 'main disease ']
+
+            df['Cause of Death'] = df['Cause of Death'].replace(disease_prog_equivalents, 'Disease progression')
+
+            # Rename, set, and sort by index
+            df = df.rename(columns={"Case ID": "Patient_ID"})
+            df = df.set_index("Patient_ID")
+            df = df.sort_index()
+
+            data["followup"] = df
+
+        return data
+
+    def _format_dataframes(self):
+        """Format the ccrcc dataframes once they've all been parsed."""
+
+        # We have multiple clinical files, so we'll take those out of the data dict into a separate dict, and combine them
         clinical_dfs = {}
-
-        # Load the data into dataframes in the self._data dict
-        loading_msg = f"Loading {self.get_cancer_type()} v{self.version()}"
-        for file_path in self._data_files_paths: # Loops through files variable
-
-            # Print a loading message. We add a dot every time, so the user knows it's not frozen.
-            loading_msg = loading_msg + "."
-            print(loading_msg, end='\r')
-
-            path_elements = file_path.split(os.sep) # Get a list of the levels of the path
-            file_name = path_elements[-1] # The last element will be the name of the file
-            df_name = file_name.split(".")[0] # Our dataframe name will be the first section of file name (i.e. proteomics.txt.gz becomes proteomics)
-
-            if file_name == "6_CPTAC3_CCRCC_Phospho_abundance_gene_protNorm=2_CB_imputed.tsv.gz":
-                df = pd.read_csv(file_path, sep='\t', index_col=0)
-                ref_intensities = df["ReferenceIntensity"] # Copy this out, so we can subtract the reference intensities later
-                df = df.drop(columns=["NumberPSM", "Proteins", "ReferenceIntensity"] + nci_dotted_labels + qc_labels)
-                df = df.subtract(ref_intensities, axis="index") # Subtract reference intensities from all the values, to get ratios
-                df = df.transpose()
-                self._data["phosphoproteomics_gene"] = df
-
-            elif file_name == "6_CPTAC3_CCRCC_Phospho_abundance_phosphosite_protNorm=2_CB.tsv.gz":
-                df = pd.read_csv(file_path, sep='\t')
-
-                # Drop unlocalized sites
-                unlocalized_sites = (df["Index"].str.rsplit("_", n=1, expand=True)[1] == '0') 
-                df = df[~unlocalized_sites]
-
-                # Drop unwanted samples
-                df = df.drop(columns=nci_labels + qc_labels)
-
-                # Subtract reference intensities from numerical data columns, to get ratios
-                df = df.rename(columns={"Gene": "Name"})
-                metadata_cols = ["Index", "Name", "Peptide", "ReferenceIntensity"]
-                metadata = df[metadata_cols] # Extract these for later
-                df = df.drop(columns=metadata_cols) # Get the df to contain just the numerical data columns
-                ref_intensities = metadata["ReferenceIntensity"]
-                df = df.subtract(ref_intensities, axis="index") # Subtract reference intensities
-                df = metadata.join(df, how="outer") # Put the metadata columns back in
-                df = df.drop(columns="ReferenceIntensity") # Don't need this anymore
-
-                # Parse a few columns out of the "Index" column that we'll need for our multiindex
-                split_ids = df["Index"].str.split('_', expand=True)
-                df = df.drop(columns="Index")
-                sites = split_ids.iloc[:, -1]
-                database_ids = split_ids[0].str.cat(split_ids[1], sep='_')
-                df = df.assign(**{"Site": sites, "Database_ID": database_ids})
-
-                # Some rows have at least one localized phosphorylation site, but also have other phosphorylations that aren't localized. We'll drop those rows, if their localized sites are duplicated in another row, to avoid creating duplicates, because we only preserve information about the localized sites in a given row. However, if the localized sites aren't duplicated in another row, we'll keep the row.
-                unlocalized_to_drop = df.index[~split_ids[4].eq(split_ids[5]) & df.duplicated(["Name", "Site", "Peptide", "Database_ID"], keep=False)] # Column 4 of the split "Index" column is number of phosphorylations detected, and column 5 is number of phosphorylations localized, so if the two values aren't equal, the row has at least one unlocalized site
-                df = df.drop(index=unlocalized_to_drop)
-
-                # Give it a multiindex
-                df = df.set_index(["Name", "Site", "Peptide", "Database_ID"]) # This will create a multiindex from these columns, in this order.
-                df = df.sort_index()
-                df = df.transpose()
-                df = df.sort_index()
-                self._data["phosphoproteomics"] = df
-            
-            elif file_name == "6_CPTAC3_CCRCC_Whole_abundance_protein_pep=unique_protNorm=2_CB.tsv.gz":
-                df = pd.read_csv(file_path, sep='\t')
-                df = df.rename(columns={"Proteins": "Name", "Index": "Database_ID"})
-                df = df.set_index(["Name", "Database_ID"])
-                ref_intensities = df["ReferenceIntensity"] # Copy this out, so we can subtract the reference intensities later
-                df = df.drop(columns=["NumberPSM", "ReferenceIntensity"] + nci_labels + qc_labels)
-                df = df.subtract(ref_intensities, axis="index") # Subtract reference intensities from all the values, to get ratios
-                df = df.sort_index()
-                df = df.transpose()
-                df = df.sort_index()
-                self._data["proteomics"] = df
-            
-            elif file_name == "Clinical Table S1.xlsx":
-                df = pd.\
-                    read_excel(file_path, sheet_name="ccrcc_clinical_characteristics", index_col=0).\
-                    dropna(how="all", axis=0).\
-                    dropna(how="all", axis=1)
-                df.index.name = "Patient_ID" # The index is currently "case_id", but we call that "Patient_ID"
-                clinical_dfs["authoritative_clinical"] = df
-            
-            elif file_name == "ccrcc.somatic.consensus.gdc.umichigan.wu.112918.maf.gz":
-                df = pd.read_csv(file_path, sep='\t', dtype={"PUBMED":object}) # "PUBMED" column has mixed types, so we specify object as the dtype to prevent a warning from printing. We don't actually use the column, so that's all we need to do.
-                split_barcode = df["Tumor_Sample_Barcode"].str.split("_", n=1, expand=True) # The first part of the barcode is the patient id, which we need want to make the index
-                df["Tumor_Sample_Barcode"] = split_barcode[0]
-                df = df[["Tumor_Sample_Barcode","Hugo_Symbol","Variant_Classification","HGVSp_Short"]]
-                df = df.rename(columns={"Tumor_Sample_Barcode":"Patient_ID","Hugo_Symbol":"Gene","Variant_Classification":"Mutation","HGVSp_Short":"Location"})                
-                df = df.sort_values(by=["Patient_ID", "Gene"])
-                df = df.set_index("Patient_ID")
-                self._data["somatic_mutation"] = df
-
-            elif file_name == "ccrccMethylGeneLevelByMean.txt.gz":
-                df = pd.read_csv(file_path, sep='\t')
-                df = df.sort_index()
-                df = df.transpose()
-                df.index.name = "Patient_ID"
-                self._data["methylation"] = df
-
-            elif file_name == "cptac-metadata.xls.gz":
-                df = pd.read_csv(file_path, index_col=0)
-                df = df.drop(index=["pooled sample"] + nci_labels + qc_labels) # Drop the pooled samples in addition to other samples to exclude
-                clinical_dfs["metadata_and_keys"] = df
-            
-            elif file_name == "kirc_wgs_cnv_gene.csv.gz":
-                df = pd.read_csv(file_path)
-                df = df.rename(columns={"gene_name": "Name", "gene_id": "Database_ID"})
-                df = df.set_index(["Name", "Database_ID"])
-                df = df.sort_index()
-                df = df.transpose()
-
-                # The dataframe contains 4 rows for each sample: lr.loc_***,  lr.seg_***, mzd.loc_***, or  mzd.seg_*** where *** is the 
-                # Patient_ID. "lr" stands for log ratio, and "mzd" stands for Mean Zygosity Deviation. “lr.loc” is based on average of lr 
-                # of probes belonging to each gene. “lr.seg” is based on segmented CNV result (i.e. first performed segmentation based on 
-                # probe level data, and then use the lr of the representative segment of each gene as the gene-level lr). They used the
-                # lr.seg values in the paper, so we'll use those.
-                df = df.drop(index=df[~df.index.str.startswith("lr.seg")].index)
-
-                # Parse a Patient_ID index out of the current index
-                barcode_col = df.index.to_series()
-                split_barcode = barcode_col.str.split("_", n=1, expand=True) # The second part of the barcode is the patient id, which we want to make the index
-                df.index = pd.Index(split_barcode[1])
-                df.index.name = "Patient_ID"
-
-                df = df.sort_index()
-                self._data["CNV"] = df
-
-            elif file_name == "RNA_Normal_Tumor_185_samples.tsv.gz":
-                df = pd.read_csv(file_path, sep='\t')
-                df = df.sort_index()
-                df = df.transpose()
-
-                # There are a couple duplicate column headers, but they're full of just zeros. We'll drop them.
-                # You can do this with a one liner: df =  df.loc[:, ~df.columns.duplicated(keep=False) | (df != 0).any(axis=0)]
-                # But the one liner is about 100 times slower.
-                dups = df.loc[:, df.columns.duplicated(keep=False)] # Select all the columns with duplicated headers
-                dups = dups.loc[:, (dups != 0).any(axis=0)] # Get only the columns that aren't all zeros
-                df = df.loc[:, ~df.columns.duplicated(keep=False)] # Get rid of the duplicate columns from the original dataframe
-                df = df.join(dups, how="outer") # Sub in our un-duplicated selections
-                df = df.sort_index(axis="columns") # Get all the column names in order again
-
-                self._data["transcriptomics"] = df
-            
-            elif file_name == "S044_CPTAC_CCRCC_Discovery_Cohort_Clinical_Data_r3_Mar2019.xlsx":
-
-                with warnings.catch_warnings():
-                    warnings.filterwarnings("ignore", "Unknown extension is not supported and will be removed") # This warning is just due to some formatting on the spreadsheet. We don't need to worry about it.
-                    clinical_sheets = pd.read_excel(file_path,
-                        sheet_name=['Patient_Clinical_Attributes', 'Other_Medical_Information', 'Specimen_Attributes'],
-                        index_col=0,
-                        usecols=lambda x: x != "tumor_code") # Don't load the tumor_code column in any of them--it's just "CCRCC" for every row.
-
-                for sheet, df in clinical_sheets.items(): # Put them in the clinical_dfs dictionary for processing later
-                    df.index.name = "Patient_ID" # The indices are currently "case_id", but we call that "Patient_ID"
-                    clinical_dfs[sheet] = df
-
-            elif file_name == "Table S7.xlsx":
-                immune_groups = pd.\
-                    read_excel(
-                        file_path, 
-                        sheet_name="xCell Signatures", 
-                        index_col = 0, 
-                        header=None,
-                        skiprows=range(0, 3)
-                    ).\
-                    transpose()
-                immune_groups = immune_groups[["Samples", "Immune Group"]] # We only need these columns
-                immune_groups = immune_groups.set_index("Samples")
-
-            elif file_name == 'CCRCC_followup_9_12.xlsx' and self._version == "0.1.1":
-                df = pd.read_excel(file_path)
-
-                # Replace redundant values for "not reported" with NaN
-                nan_equivalents = ['Not Reported/ Unknown', 'Reported/ Unknown', 'Not Applicable', 'na',
-                    'unknown', 'Not Performed', 'Unknown tumor status', 'Unknown', ' Unknown', 'Unknown ',
-                    'Unknown Tumor Status', 'Not specified']
-
-                df = df.replace(nan_equivalents, np.nan)
-
-                # Replace redundanct values in "Cause of Death" column
-                disease_prog_equivalents = ['Metastatic Renal Cell Carcinoma', 'Tumor progression',
-                    'Progression of disease', 'Progression of disease ', 'Tumor', 'Disease progression',
-                    'Progressive Disease', 'Disease progression', 'disease progression ', 'main disease ']
-
-                df['Cause of Death'] = df['Cause of Death'].replace(disease_prog_equivalents, 'Disease progression')
-
-                # Rename, set, and sort by index
-                df = df.rename(columns={"Case ID": "Patient_ID"})
-                df = df.set_index("Patient_ID")
-                df = df.sort_index()
-
-                self._data["followup"] = df
-
-        print(' ' * len(loading_msg), end='\r') # Erase the loading message
-        formatting_msg = "Formatting dataframes..."
-        print(formatting_msg, end='\r')
+        for name in ["authoritative_clinical", "metadata_and_keys", "Patient_Clinical_Attributes", "Other_Medical_Information", "Specimen_Attributes"]:
+            clinical_dfs[name] = self._data.pop(name)
+        immune_groups = self._data.pop("immune_groups", None)
 
         # Process and combine the multiple clinical dataframes
         clinical = clinical_dfs["metadata_and_keys"] # We'll start with this dataframe, and add the others to it.
@@ -400,5 +417,3 @@ class Ccrcc(Dataset):
 
         # Call function from dataframe_tools.py to standardize the names of the index and column axes
         self._data = standardize_axes_names(self._data)
-
-        print(" " * len(formatting_msg), end='\r') # Erase the formatting message
@@ -19,12 +19,14 @@ from .exceptions import FailedReindexWarning, ReindexMapError
 
 class Colon(Dataset):
 
-    def __init__(self, version="latest", no_internet=False):
+    def __init__(self, version="latest", no_internet=False, lazy=False, n_jobs=1):
         """Load all of the colon dataframes as values in the self._data dict variable, with names as keys, and format them properly.
 
         Parameters:
         version (str, optional): The version number to load, or the string "latest" to just load the latest building. Default is "latest".
         no_internet (bool, optional): Whether to skip the index update step because it requires an internet connection. This will be skipped automatically if there is no internet at all, but you may want to manually skip it if you have a spotty internet connection. Default is False.
+        lazy (bool, optional): Whether to wait to parse each dataframe until it's first requested, instead of parsing them all now. Samples from each dataframe are added to the clinical dataframe as it's parsed. Default is False.
+        n_jobs (int, optional): The number of threads to parse the data files with, since they can be parsed independently. Pass -1 to use one thread for each CPU. Default is 1.
         """
 
         # Set some needed variables, and pass them to the parent Dataset class __init__ function
@@ -56,136 +58,144 @@ class Colon(Dataset):
                 "transcriptomics.gz"],
         }
 
-        super().__init__(cancer_type="colon", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet)
-
-        # Load the data into dataframes in the self._data dict
-        loading_msg = f"Loading {self.get_cancer_type()} v{self.version()}"
-        for file_path in self._data_files_paths: # Loops through files variable
-
-            # Print a loading message. We add a dot every time, so the user knows it's not frozen.
-            loading_msg = loading_msg + "."
-            print(loading_msg, end='\r')
-
-            path_elements = file_path.split(os.sep) # Get a list of the levels of the path
-            file_name = path_elements[-1] # The last element will be the name of the file
-            file_name_split = file_name.split(".")
-            df_name = file_name_split[0] # Our dataframe name will be the first section of file name (i.e. proteomics.txt.gz becomes proteomics)
-
-            if file_name == 'Colon_One_Year_Clinical_Data_20160927.xls' and self._version == "0.0.1":
-                df = pd.read_excel(file_path)
-
-                # Replace redundant values for "not reported" with NaN
-                nan_equivalents = ['Not Reported/ Unknown', 'Reported/ Unknown', 'Not Applicable',
-                    'na', 'unknown', 'Not Performed', 'Unknown tumor status']
-
-                df = df.replace(nan_equivalents, np.nan)
-
-                # Rename and set index
-                df = df.rename(columns={'PPID': 'Patient_ID'})
-                df = df.set_index("Patient_ID")
-                df = df.sort_index()
-
-                self._data["followup"] = df
-
-            elif file_name == "Human__CPTAC_COAD__VU__SCNA__ExomeSeq__01_28_2016__BCM__Gene__BCM_CopyWriteR_GISTIC2.cct.gz" and self._version == "0.0.1":
-                df = pd.read_csv(file_path, sep="\t",index_col=0)
-                df = df.sort_index()
-                df = df.transpose()
-                self._data["CNV"] = df
-
-            else:
-                df = pd.read_csv(file_path, sep="\t",index_col=0)
-                df = df.sort_index()
-                df = df.transpose()
-                self._data[df_name] = df # Maps dataframe name to dataframe. self._data was initialized when we called the parent class __init__()
-
-        print(' ' * len(loading_msg), end='\r') # Erase the loading message
-        formatting_msg = "Formatting dataframes..."
-        print(formatting_msg, end='\r')
-
-        # Reformat and rename the somatic_mutation dataframe
-        mut = self._data["mutation"]
-        mut = mut.transpose() # Transpose it back to its original orientation
-        mut = mut.sort_values(by="SampleID")
-        mut = mut.reset_index()
-        mut = mut[["SampleID","Gene","Variant_Type","Protein_Change"]]
-        mut = mut.drop_duplicates(keep="first") # Get rid of rows that are now duplicates since we didn't keep the mRNA column. We do this before setting the index, because drop_duplicates doesn't consider the index.
-        mut = mut.rename(columns={"SampleID":"Patient_ID", "Variant_Type":"Mutation", "Protein_Change":"Location"})
-        mut = mut.sort_values(by=["Patient_ID", "Gene"])
-        mut = mut.set_index("Patient_ID") # We only do this after the drop_duplicates call above because drop_duplicates doesn't consider the index, but we of course want the Patient_ID to be considered when identifying duplicate rows to drop.
-        self._data["somatic_mutation"] = mut # Maps dataframe name to dataframe. self._data was initialized when we called the parent class __init__()
-        del self._data["mutation"] # Delete the old version with the old name
-
-        # Rename mutation_binary dataframe to somatic_mutation_binary
-        self._data["somatic_mutation_binary"] = self._data["mutation_binary"]
-        del self._data["mutation_binary"]
-
-        # Separate clinical and derived molecular dataframes
-        all_clinical_data = self._data.get("clinical")
-        clinical_df = all_clinical_data.drop(columns=['StromalScore', 'ImmuneScore', 'ESTIMATEScore', 'TumorPurity','immuneSubtype', 'CIN', 'Integrated.Phenotype', 'Transcriptomic_subtype', 'Proteomic_subtype', 'mutation_rate', 'Mutation_Phenotype'])
-        derived_molecular_df = all_clinical_data[['StromalScore', 'ImmuneScore', 'ESTIMATEScore', 'TumorPurity', 'immuneSubtype', 'CIN', 'Integrated.Phenotype', 'Transcriptomic_subtype', 'Proteomic_subtype', 'mutation_rate', 'Mutation_Phenotype']]
-
-        # Format the dataframes
-        clinical_df = clinical_df.apply(pd.to_numeric, errors="ignore")
-        derived_molecular_df = derived_molecular_df.apply(pd.to_numeric, errors="ignore")
-        derived_molecular_df = derived_molecular_df.sort_index(axis="columns")
-
-        # Put them in our data dictionary
-        self._data["clinical"] = clinical_df # Replaces original clinical dataframe
-        self._data["derived_molecular"] = derived_molecular_df
-
-        # Combine the two proteomics dataframes
-        prot_tumor = self._data.get("proteomics_tumor")
-        prot_normal = self._data.get("proteomics_normal") # Normal entries are already marked with 'N' on the end of the ID
-        prot_combined = prot_tumor.append(prot_normal)
-        self._data["proteomics"] = prot_combined
-        del self._data["proteomics_tumor"]
-        del self._data["proteomics_normal"]
-
-        # Get phosphoproteomics dataframes, so we can process and combine them
-        phos_tumor = self._data.get("phosphoproteomics_tumor")
-        phos_normal = self._data.get("phosphoproteomics_normal") # Normal entries are not marked
-
-        # Mark entries in phosphoproteomics_normal dataframe with an N at the end of the ID
-        phos_normal = phos_normal.set_index(phos_normal.index + 'N')
-
-        # Combine the two phosphoproteomics dataframes into one dataframe
-        phos_combined = phos_tumor.append(phos_normal)
-
-        # Create our phosphoproteomics columns multiindex
-        multiindex = phos_combined.columns.str.split('[_:]', expand=True) # Split the column names into their constituent parts
-        multiindex = multiindex.droplevel([2, 4]) # The third level is just empty strings, and the fifth is a duplicate of the second
-        multiindex = multiindex.set_names(["Name", "Site", "Database_ID"])
-        phos_combined.columns = multiindex
-        phos_combined = phos_combined.sort_index(axis=1) # Put all the columns in alphabetical order
-        self._data['phosphoproteomics'] = phos_combined
-        del self._data["phosphoproteomics_tumor"]
-        del self._data["phosphoproteomics_normal"]
-
-        # Get a union of all dataframes' indices, with duplicates removed
-        master_index = unionize_indices(self._data, exclude="followup")
-
-        # Use the master index to reindex the clinical dataframe, so the clinical dataframe has a record of every sample in the dataset. Rows that didn't exist before (such as the rows for normal samples) are filled with NaN.
-        master_clinical = self._data['clinical'].reindex(master_index)
+        # The files each table is parsed from, across all versions. This way, if we're loading lazily, we know which files to parse when a table is requested.
+        table_files = {
+            "clinical": ["clinical.tsi.gz"],
+            "CNV": ["Human__CPTAC_COAD__VU__SCNA__ExomeSeq__01_28_2016__BCM__Gene__BCM_CopyWriteR_GISTIC2.cct.gz"],
+            "derived_molecular": ["clinical.tsi.gz"],
+            "followup": ["Colon_One_Year_Clinical_Data_20160927.xls"],
+            "miRNA": ["miRNA.cct.gz"],
+            "phosphoproteomics": ["phosphoproteomics_normal.gz", "phosphoproteomics_tumor.gz"],
+            "proteomics": ["proteomics_normal.cct.gz", "proteomics_tumor.cct.gz"],
+            "somatic_mutation": ["mutation.txt.gz"],
+            "somatic_mutation_binary": ["mutation_binary.cbt.gz"],
+            "transcriptomics": ["transcriptomics.gz"],
+        }
 
-        # Add a column called Sample_Tumor_Normal to the clinical dataframe indicating whether each sample is a tumor or normal sample. Samples with a Patient_ID ending in N are normal.
-        clinical_status_col = generate_sample_status_col(master_clinical, normal_test=lambda sample: sample[-1] == 'N')
-        master_clinical.insert(0, "Sample_Tumor_Normal", clinical_status_col)
+        super().__init__(cancer_type="colon", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet)
 
-        # Replace the clinical dataframe in the data dictionary with our new and improved version!
-        self._data['clinical'] = master_clinical 
+        # Load the data into dataframes in the self._data dict, and format them
+        self._load_data(table_files=table_files, lazy=lazy, n_jobs=n_jobs)
 
-        # Edit the format of the Patient_IDs to have normal samples marked the same way as in other datasets
-        # Currently, normal patient IDs have an "N" appended. We're going to make that a ".N"
-        self._data = reformat_normal_patient_ids(self._data, existing_identifier="N", existing_identifier_location="end")
+    def _parse_file(self, file_path):
+        """Parse one of the colon data files into dataframes.
 
-        # Call function from dataframe_tools.py to sort all tables first by sample status, and then by the index
-        self._data = sort_all_rows(self._data)
+        Parameters:
+        file_path (str): The path to the file to parse.
 
-        # Call function from dataframe_tools.py to standardize the names of the index and column axes
-        self._data = standardize_axes_names(self._data)
+        Returns:
+        dict: The dataframes parsed from the file. Keys are str of dataframe names, values are pandas.DataFrame
+        """
+        data = {}
+        path_elements = file_path.split(os.sep) # Get a list of the levels of the path
+        file_name = path_elements[-1] # The last element will be the name of the file
+        file_name_split = file_name.split(".")
+        df_name = file_name_split[0] # Our dataframe name will be the first section of file name (i.e. proteomics.txt.gz becomes proteomics)
+
+        if file_name == 'Colon_One_Year_Clinical_Data_20160927.xls' and self._version == "0.0.1":
+            df = pd.read_excel(file_path)
+
+            # Replace redundant values for "not reported" with NaN
+            nan_equivalents = ['Not Reported/ Unknown', 'Reported/ Unknown', 'Not Applicable',
+                'na', 'unknown', 'Not Performed', 'Unknown tumor status']
+
+            df = df.replace(nan_equivalents, np.nan)
+
+            # Rename and set index
+            df = df.rename(columns={'PPID': 'Patient_ID'})
+            df = df.set_index("Patient_ID")
+            df = df.sort_index()
+
+            data["followup"] = df
+
+        elif file_name == "Human__CPTAC_COAD__VU__SCNA__ExomeSeq__01_28_2016__BCM__Gene__BCM_CopyWriteR_GISTIC2.cct.gz" and self._version == "0.0.1":
+            df = pd.read_csv(file_path, sep="\t",index_col=0)
+            df = df.sort_index()
+            df = df.transpose()
+            data["CNV"] = df
+
+        elif file_name == "mutation.txt.gz":
+            df = pd.read_csv(file_path, sep="\t", index_col=0)
+            df = df.sort_index()
+            df = df.sort_values(by="SampleID")
+            df = df.reset_index()
+            df = df[["SampleID","Gene","Variant_Type","Protein_Change"]]
+            df = df.drop_duplicates(keep="first") # Get rid of rows that are now duplicates since we didn't keep the mRNA column. We do this before setting the index, because drop_duplicates doesn't consider the index.
+            df = df.rename(columns={"SampleID":"Patient_ID", "Variant_Type":"Mutation", "Protein_Change":"Location"})
+            df = df.sort_values(by=["Patient_ID", "Gene"])
+            df = df.set_index("Patient_ID") # We only do this after the drop_duplicates call above because drop_duplicates doesn't consider the index, but we of course want the Patient_ID to be considered when identifying duplicate rows to drop.
+            data["somatic_mutation"] = df
+
+        elif file_name == "clinical.tsi.gz":
+            df = pd.read_csv(file_path, sep="\t",index_col=0)
+            df = df.sort_index()
+            df = df.transpose()
+
+            # Separate clinical and derived molecular dataframes
+            derived_molecular_cols = ['StromalScore', 'ImmuneScore', 'ESTIMATEScore', 'TumorPurity', 'immuneSubtype', 'CIN', 'Integrated.Phenotype', 'Transcriptomic_subtype', 'Proteomic_subtype', 'mutation_rate', 'Mutation_Phenotype']
+            clinical_df = df.drop(columns=derived_molecular_cols)
+            derived_molecular_df = df[derived_molecular_cols]
+
+            # Format the dataframes
+            clinical_df = clinical_df.apply(pd.to_numeric, errors="ignore")
+            derived_molecular_df = derived_molecular_df.apply(pd.to_numeric, errors="ignore")
+            derived_molecular_df = derived_molecular_df.sort_index(axis="columns")
+
+            data["clinical"] = clinical_df
+            data["derived_molecular"] = derived_molecular_df
+
+        else:
+            df = pd.read_csv(file_path, sep="\t",index_col=0)
+            df = df.sort_index()
+            df = df.transpose()
+
+            if df_name == "phosphoproteomics_normal":
+                df = df.set_index(df.index + 'N') # Mark entries with an N at the end of the ID, like the proteomics normal entries already are
+            elif df_name == "mutation_binary":
+                df_name = "somatic_mutation_binary"
+
+            data[df_name] = df # Maps dataframe name to dataframe
+
+        return data
+
+    def _combine_tables(self, data):
+        """Combine the colon tumor and normal proteomics tables, and the tumor and normal phosphoproteomics tables."""
 
-        print(" " * len(formatting_msg), end='\r') # Erase the formatting message
+        # Combine the two proteomics dataframes
+        if "proteomics_tumor" in data.keys():
+            prot_tumor = data.pop("proteomics_tumor")
+            prot_normal = data.pop("proteomics_normal") # Normal entries are already marked with 'N' on the end of the ID
+            data["proteomics"] = prot_tumor.append(prot_normal)
+
+        # Combine the two phosphoproteomics dataframes into one dataframe. The normal entries were marked with an 'N' when we parsed them.
+        if "phosphoproteomics_tumor" in data.keys():
+            phos_tumor = data.pop("phosphoproteomics_tumor")
+            phos_normal = data.pop("phosphoproteomics_normal")
+            phos_combined = phos_tumor.append(phos_normal)
+
+            # Create our phosphoproteomics columns multiindex
+            multiindex = phos_combined.columns.str.split('[_:]', expand=True) # Split the column names into their constituent parts
+            multiindex = multiindex.droplevel([2, 4]) # The third level is just empty strings, and the fifth is a duplicate of the second
+            multiindex = multiindex.set_names(["Name", "Site", "Database_ID"])
+            phos_combined.columns = multiindex
+            phos_combined = phos_combined.sort_index(axis=1) # Put all the columns in alphabetical order
+            data["phosphoproteomics"] = phos_combined
+
+        return data
+
+    def _get_patient_id_map(self, patient_ids):
+        """Mark the colon normal samples the same way as in other datasets. Their Patient_IDs have an "N" appended, which we're going to make a ".N"."""
+        sample_statuses = pd.Series(np.where(patient_ids.str.endswith("N"), "Normal", "Tumor"), index=patient_ids)
+        return get_normal_patient_id_map(sample_statuses, existing_identifier="N", existing_identifier_location="end")
+
+    def _impute_sample_status(self, clinical):
+        """Add a column called Sample_Tumor_Normal to the colon clinical dataframe, indicating whether each sample is a tumor or normal sample. Samples with a Patient_ID ending in ".N" are normal."""
+        sample_status_col = np.where(clinical.index.str.endswith(".N"), "Normal", "Tumor")
+        if "Sample_Tumor_Normal" in clinical.columns: # We're adding samples from a table that was loaded lazily
+            clinical["Sample_Tumor_Normal"] = sample_status_col
+        else:
+            clinical.insert(0, "Sample_Tumor_Normal", sample_status_col)
+        return clinical
 
     # Overload the default how_to_cite function, to provide the specific publication information for the Colon dataset
     def how_to_cite(self):
@@ -28,10 +28,15 @@ def unionize_indices(dataset, exclude=[]):
         exclude = [exclude]
 
     indices = [df.index for name, df in dataset.items() if name not in exclude]
-    master_index = pd.Index([])
-    for index in indices:
-        master_index = master_index.union(index)
-        master_index = master_index.drop_duplicates()
+    if len(indices) == 0:
+        return pd.Index([])
+
+    # Put all the indices together in one go, and then drop the duplicates, instead of taking the union of each one in turn
+    master_index = indices[0].append(indices[1:]).unique()
+    try:
+        master_index = master_index.sort_values() # The union used to sort the samples, so we do too
+    except TypeError: # If the samples can't be compared, the union would have left them unsorted too
+        pass
     return master_index
 
 def generate_sample_status_col(df, normal_test):
@@ -85,11 +90,19 @@ def reindex_dataframe(df, reindex_map, new_index_name, keep_old):
     Returns:
     pandas.DataFrame: A copy of the given dataframe, with the new index.
     """
-    if not df.index.isin(reindex_map.keys()).all(): # This works for a dict or a pandas Series, because Series have a .keys() attribute that's an alias for the index
-        not_in = df.index[~(df.index.isin(reindex_map.keys()))]
+    if isinstance(reindex_map, dict):
+        reindex_map = pd.Series(reindex_map, dtype=object)
+
+    # Look up all the old index values in the map at once, instead of one at a time
+    if not reindex_map.index.is_unique: # get_indexer needs unique values, so if an old value is in the map more than once, we use its first new value
+        reindex_map = reindex_map[~reindex_map.index.duplicated()]
+    positions = reindex_map.index.get_indexer(df.index)
+
+    if (positions < 0).any():
+        not_in = df.index[positions < 0]
         raise ReindexMapError(not_in)
 
-    new_index = df.index.map(reindex_map.get)
+    new_index = pd.Index(reindex_map.to_numpy()[positions])
 
     if keep_old:
         df = df.reset_index()
@@ -151,65 +164,103 @@ def reformat_normal_patient_ids(data_dict, existing_identifier=None, existing_id
     Returns:
     dict: The data dictionary for the dataset, with normal samples' patient IDs reformatted in the specified dataframes.
     """
+    # The clinical dataframe has a record of every sample in the dataset, so we work out every sample's new ID from it once, and then rename each table's samples with that
+    id_map = get_normal_patient_id_map(data_dict["clinical"]["Sample_Tumor_Normal"], existing_identifier, existing_identifier_location)
+
+    # The followup dataframe can have patients that aren't anywhere else in the dataset. They aren't normal samples, so they're just left as they are.
+    return apply_patient_id_map(data_dict, id_map, unmapped_ok="followup")
 
+def get_normal_patient_id_map(sample_statuses, existing_identifier=None, existing_identifier_location=None):
+    """Work out the reformatted patient IDs for a set of samples, with the normal samples marked by an appended ".N"
+
+    Parameters:
+    sample_statuses (pandas.Series): The Sample_Tumor_Normal column, indexed by the samples' current patient IDs.
+    existing_identifier (str, optional): A normal sample identifier that already exists on the normal samples' patient IDs, which we will remove before adding the new identifier. Default of None will cause nothing to be removed.
+    existing_identifier_location (str, optional): Either "start" or "end": Indicates whether the existing identifier is at the beginning or end of the normal samples' patient IDs, so we know which end to remove it from. Optional if nothing is passed to the existing_identifier parameter.
+
+    Returns:
+    pandas.Series: The new patient IDs, indexed by the old ones. Only normal samples' IDs are changed.
+    """
     # Check parameters
     if (existing_identifier is None and existing_identifier_location is not None) or (existing_identifier is not None and existing_identifier_location is None):
         raise CptacDevError("Parameters existing_identifier and existing_identifier_location must either both be None, or both not be None.")
 
-    sample_statuses_old_index = data_dict["clinical"]["Sample_Tumor_Normal"] # We'll need this every time, and we need it with the un-reformatted index
+    new_ids = pd.Series(sample_statuses.index.to_numpy(dtype=object), index=sample_statuses.index, dtype=object)
+    is_normal = (sample_statuses == "Normal").to_numpy()
+
+    if existing_identifier is not None: # There's an existing normal sample identifier to remove
+        existing_length = len(existing_identifier)
+
+        if existing_identifier_location == "start":
+            to_strip = is_normal & (new_ids.str[0:existing_length] == existing_identifier).to_numpy()
+            new_ids[to_strip] = new_ids[to_strip].str[existing_length:]
+
+        elif existing_identifier_location == "end":
+            to_strip = is_normal & (new_ids.str[-existing_length:] == existing_identifier).to_numpy()
+            new_ids[to_strip] = new_ids[to_strip].str[:-existing_length] # Note that we use the negative of the existing length, since we're working with the end of the string
+
+        else:
+            raise CptacDevError("existing_identifier_location parameter must be either 'start' or 'end'")
+
+    # Append ".N" to the patient IDs of normal samples
+    new_ids[is_normal] = new_ids[is_normal] + ".N"
+    return new_ids
+
+def apply_patient_id_map(data_dict, id_map, skip=[], unmapped_ok=[]):
+    """Rename the samples in each table's index with one map of old patient IDs to new ones. The map only needs to be worked out once, e.g. over the master index from unionize_indices, and each table's index is looked up in it with get_indexer, so we never have to move a table's index into a column to edit it. IDs that aren't in the map are left as they are, with a single warning listing them.
+
+    Parameters:
+    data_dict (dict): The data dictionary for a dataset.
+    id_map (pandas.Series): The new patient IDs, indexed by the old ones. The old IDs must be unique.
+    skip (str or list of str, optional): Tables to leave alone.
+    unmapped_ok (str or list of str, optional): Tables that are expected to have IDs that aren't in the map, so we don't warn about them.
+
+    Returns:
+    dict: The data dictionary, with each table's index renamed.
+    """
+    if isinstance(skip, str): # If it's a single dataframe name, make it a list so we can treat everything the same
+        skip = [skip]
+    if isinstance(unmapped_ok, str):
+        unmapped_ok = [unmapped_ok]
+
+    new_ids = id_map.to_numpy(dtype=object)
+    unmapped = pd.Index([])
 
     for name in data_dict.keys(): # Loop over the keys so we can edit the values without any issues
+        if name in skip:
+            continue
 
         df = data_dict[name]
+        positions = id_map.index.get_indexer(df.index)
+        is_unmapped = positions < 0
+
+        if is_unmapped.any():
+            if name not in unmapped_ok:
+                unmapped = unmapped.append(df.index[is_unmapped])
+            new_index = np.where(is_unmapped, df.index.to_numpy(dtype=object), new_ids[positions])
+        else:
+            new_index = new_ids[positions]
 
-        # Add in the tumor/normal statuses for these samples, if they aren't already in the table
-        added_sample_statuses = False # So we can keep track of whether to drop the column when we're done
-        if "Sample_Tumor_Normal" not in df.columns:
-            df = join_col_to_dataframe(df, sample_statuses_old_index)
-            added_sample_statuses = True
-
-        df.index.name = "Patient_ID" # So we can easily access it when we've made it into a column
-        df = df.reset_index() # This makes the Patient_ID index a column, so we can edit it.
-
-        if (existing_identifier is not None) and (existing_identifier_location is not None): # There's an existing normal sample identifier to remove
-            existing_length = len(existing_identifier)
-
-            if existing_identifier_location == "start":
-                df["Patient_ID"] = df["Patient_ID"].where(
-                    cond=(~((df["Sample_Tumor_Normal"] == "Normal") & (df["Patient_ID"].str[0:existing_length] == existing_identifier))),
-                    other=df["Patient_ID"].str[existing_length:]
-                )
-
-            elif existing_identifier_location == "end":
-                df["Patient_ID"] = df["Patient_ID"].where(
-                    cond=(~((df["Sample_Tumor_Normal"] == "Normal") & (df["Patient_ID"].str[-existing_length:] == existing_identifier))),
-                    other=df["Patient_ID"].str[:-existing_length] # Note that we use the negative of the existing length, since we're working with the end of the string
-                )
-
-            else:
-                raise CptacDevError("existing_identifier_location parameter must be either 'start' or 'end'")
-
-        # Append ".N" to the patient IDs of normal samples
-        df["Patient_ID"] = df["Patient_ID"].where(
-            cond=(~(df["Sample_Tumor_Normal"] == "Normal")),
-            other=df["Patient_ID"] + ".N"
-        )
-
-        # Set the index to the reformatted Patient IDs
-        df = df.set_index("Patient_ID")
-
-        # If we added the Sample_Tumor_Normal column, drop it
-        if added_sample_statuses:
-            if isinstance(df.columns, pd.MultiIndex):
-                df = df.drop(columns="Sample_Tumor_Normal", level=0) # level=0 prevents a PerformanceWarning
-            else:
-                df = df.drop(columns="Sample_Tumor_Normal")
-
-        # Put the dataframe with reformatted patient IDs back into the data dictionary
+        df.index = pd.Index(new_index, name="Patient_ID") # Just the index is replaced, so the table's values aren't copied
         data_dict[name] = df
 
+    if len(unmapped) > 0:
+        warnings.warn(f"No new Patient_ID was found for the following samples, so they were left as they were: {', '.join(unmapped.drop_duplicates().astype(str))}", FailedReindexWarning, stacklevel=3)
+
     return data_dict
 
+def hyphenate_patient_ids(ids):
+    """Replace the periods in patient IDs with hyphens, except for the period before the N that marks a normal sample. For example, C3N.00545.N becomes C3N-00545.N.
+
+    Parameters:
+    ids (pandas.Index): The patient IDs.
+
+    Returns:
+    pandas.Index: The reformatted patient IDs.
+    """
+    ids = ids.str.replace(r"\.", "-", regex=True)
+    return ids.str.replace(r"-N$", ".N", regex=True) # If there's a "-N" at the end, it's part of the normal identifier, which we want to actually be ".N"
+
 def join_col_to_dataframe(df, col):
     """Join a sample status column into a dataframe, automatically accounting for whether the dataframe has a column multiindex or not.
 
@@ -263,12 +314,23 @@ def sort_all_rows(data_dict):
     Returns:
     dict: The dataframe dictionary, with the dataframes sorted by their indices. Keys are str of dataframe names, values are pandas.DataFrame
     """
-    # Get the Sample_Tumor_Normal column as a single-column dataframe
-    sample_status_col = data_dict["clinical"]["Sample_Tumor_Normal"].copy(deep=True) # We'll need this every time
+    sample_status_col = data_dict["clinical"]["Sample_Tumor_Normal"]
+
+    # Sort the samples once, and give each one its position in the sorted order. Then each table's rows can be sorted by looking up those positions, without joining in the sample statuses or comparing any strings.
+    sample_order = _get_sample_status_order(sample_status_col, sample_status_col.index)
+    sample_sort_keys = np.empty(len(sample_order), dtype=np.intp)
+    sample_sort_keys[sample_order] = np.arange(len(sample_order))
 
     for name in data_dict.keys(): # Loop over the keys so we can alter the values without any issues
         df = data_dict[name]
-        df = sort_df_by_sample_status(df, sample_status_col)
+
+        sample_positions = sample_status_col.index.get_indexer(df.index) if sample_status_col.index.is_unique else None
+        if sample_positions is None or (sample_positions < 0).any(): # Some of the table's samples have no sample status, so they have to be sorted by Patient_ID along with the clinical samples that have no status
+            df = sort_df_by_sample_status(df, sample_status_col)
+        else:
+            df = _take_rows(df, np.argsort(sample_sort_keys[sample_positions], kind="stable")) # Stable, so rows for the same sample stay in order
+            df.index.name = "Patient_ID"
+
         data_dict[name] = df
 
     return data_dict
@@ -282,25 +344,88 @@ def sort_df_by_sample_status(df, sample_status_col):
     Returns:
     pandas.DataFrame: The dataframe, sorted.
     """
-    # Add in the tumor/normal statuses for these samples, if they aren't already in the table
-    added_sample_statuses = False # So we can keep track of whether to drop the column when we're done
+    # Get the tumor/normal statuses for these samples, if they aren't already in the table
+    if "Sample_Tumor_Normal" in df.columns and not isinstance(df.columns, pd.MultiIndex):
+        statuses = df["Sample_Tumor_Normal"]
+    else:
+        statuses = sample_status_col.reindex(df.index)
+
+    df = _take_rows(df, _get_sample_status_order(statuses, df.index))
+    df.index.name = "Patient_ID"
+    return df
 
-    if "Sample_Tumor_Normal" not in df.columns:
-        df = join_col_to_dataframe(df, sample_status_col)
-        added_sample_statuses = True
+def _get_sample_status_order(statuses, patient_ids):
+    """Get the positions that sort rows first by sample status, in descending order so "Tumor" comes before "Normal", and then by Patient_ID. Missing statuses and Patient_IDs go last. The sort is stable, so rows that tie keep their order.
 
-    # Sort first by the Sample_Tumor_Normal column, and then by the index
-    df.index.name = "Patient_ID" # To make sure we can reference it in the next line
-    df = df.sort_values(by=["Sample_Tumor_Normal", "Patient_ID"], ascending=[False, True]) # Sorts first by sample status, and in descending order, so "Tumor" samples are first
+    Parameters:
+    statuses (pandas.Series or array-like): The sample status of each row.
+    patient_ids (pandas.Index or array-like): The Patient_ID of each row.
 
-    # If we added the Sample_Tumor_Normal column, drop it
-    if added_sample_statuses:
-        if isinstance(df.columns, pd.MultiIndex):
-            df = df.drop(columns="Sample_Tumor_Normal", level=0) # level=0 prevents a PerformanceWarning
-        else:
-            df = df.drop(columns="Sample_Tumor_Normal")
+    Returns:
+    numpy.ndarray: The positions of the rows, in sorted order.
+    """
+    status_codes, status_values = pd.factorize(statuses, sort=True)
+    status_keys = np.where(status_codes < 0, len(status_values), len(status_values) - 1 - status_codes)
+    id_codes, ids = pd.factorize(patient_ids, sort=True)
+    id_keys = np.where(id_codes < 0, len(ids), id_codes)
+    return np.lexsort((id_keys, status_keys))
 
-    return df
+def _take_rows(df, order):
+    """Put a dataframe's rows in the given order. If they're already in that order, the dataframe is returned as is, so it isn't copied.
+
+    Parameters:
+    df (pandas.DataFrame): The dataframe.
+    order (numpy.ndarray): The positions of the rows, in the order to put them in.
+
+    Returns:
+    pandas.DataFrame: The dataframe, with its rows in order.
+    """
+    if np.array_equal(order, np.arange(len(order))):
+        return df
+    return df.take(order)
+
+def sparsify_binary_table(df):
+    """Convert a table that's mostly zeros, like the somatic_mutation_binary table, to a sparse dataframe that only stores its nonzero values. Each column keeps its dtype, with 0 as the fill value, so the values are unchanged.
+
+    Parameters:
+    df (pandas.DataFrame): The table to convert.
+
+    Returns:
+    pandas.DataFrame: The sparse table. If the table was already sparse, it's returned as is.
+    """
+    if all(isinstance(dtype, pd.SparseDtype) for dtype in df.dtypes):
+        return df
+
+    if df.dtypes.nunique() == 1: # Usually every column has the same dtype, so we can convert them all at once
+        return df.astype(pd.SparseDtype(df.dtypes.iloc[0], fill_value=0))
+
+    sparse_cols = [df.iloc[:, [i]].astype(pd.SparseDtype(df.dtypes.iloc[i], fill_value=0)) for i in range(df.shape[1])]
+    return pd.concat(sparse_cols, axis=1)
+
+def binarize_mutations(mutations):
+    """Build a table like the somatic_mutation_binary table from a somatic_mutation table. It has a column for each location on each gene, named with the gene and the location separated by an underscore, with a 1 for each sample that has a mutation there and a 0 everywhere else. Mutations with no location are left out.
+
+    Parameters:
+    mutations (pandas.DataFrame): The somatic_mutation table, indexed by Patient_ID, with Gene and Location columns.
+
+    Returns:
+    pandas.DataFrame: The binary table, stored sparse. Rows are the samples in the mutations table, in the same order, and columns are sorted.
+    """
+    import scipy.sparse # Imported here, so importing the package doesn't pull in scipy
+
+    sample_codes, samples = pd.factorize(mutations.index)
+    has_location = mutations["Location"].notnull().to_numpy()
+    gene_locations = mutations["Gene"].astype(str) + "_" + mutations["Location"].astype(str)
+    col_codes, cols = pd.factorize(gene_locations[has_location], sort=True)
+
+    # A sample can have more than one mutation at the same location, so drop repeated pairs, or the sparse matrix would add them up
+    pairs = np.unique(np.stack([sample_codes[has_location], col_codes]), axis=1)
+    matrix = scipy.sparse.csc_matrix((np.ones(pairs.shape[1], dtype=np.int64), (pairs[0], pairs[1])), shape=(len(samples), len(cols)))
+
+    binary = pd.DataFrame.sparse.from_spmatrix(matrix, index=samples, columns=cols)
+    binary.index.name = "Patient_ID"
+    binary.columns.name = "Name"
+    return binary
 
 def add_index_levels(to, source, fill=""):
     """Add levels to the "to" index so it has all levels in the "source" index. The possible levels are, in this order: "Name", "Site", "Peptide", "Database_ID"
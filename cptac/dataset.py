@@ -11,12 +11,14 @@
 
 import pandas as pd
 import numpy as np
+import os
+import concurrent.futures
 import warnings
 from functools import reduce
-import re
 from .file_download import update_index
 from .file_tools import validate_version, get_version_files_paths
-from .dataframe_tools import add_index_levels, join_col_to_dataframe, sort_df_by_sample_status
+from .file_cache import is_cache_valid, load_cached_tables, load_cached_definitions, save_cached_tables
+from .dataframe_tools import add_index_levels, apply_patient_id_map, binarize_mutations, join_col_to_dataframe, sort_all_rows, sort_df_by_sample_status, sparsify_binary_table, standardize_axes_names, unionize_indices
 from .exceptions import *
 
 import cptac.utils as ut
@@ -57,6 +59,24 @@ class Dataset:
         self._data = {}
         self._definitions = {}
 
+        # If the dataset is loaded lazily, this will hold the tables that haven't been parsed yet. Keys are table names, values are lists of the paths to the files each table is parsed from.
+        self._unparsed_tables = {}
+
+        # Whether the tables for this dataset were loaded from the cache. Set when the data is loaded.
+        self._use_cache = False
+
+        # The position of each table's samples in the clinical dataframe's index, which has every sample in the dataset. Keys are table names, values are tuples of the table and clinical dataframe the codes were computed from, and the codes. See sample_codes.
+        self._sample_codes = {}
+
+        # The positions of the tumor and normal rows in each table, so we don't have to look up sample statuses every time a table is filtered by tissue type. Keys are table names, values are tuples of the table and clinical dataframe the positions were computed from, and the positions. See sample_partitions.
+        self._sample_partitions = {}
+
+        # For each omics table, the positions of each gene's columns, so selecting genes doesn't mean scanning every column. Keys are tuples of the table name and whether genes were taken from column name prefixes, values are tuples of the table the positions were computed from, and the gene index, offsets, and positions. See _get_gene_columns.
+        self._gene_columns = {}
+
+        # For the somatic_mutation table, the positions of each gene's rows, so getting a gene's mutations doesn't mean scanning the whole table. A tuple of the table the positions were computed from, and the gene index, offsets, and positions, or None until it's needed. See _get_gene_mutation_rows.
+        self._gene_mutation_rows = None
+
         # Assign the valid dfs lists, but make them instance variables so they're easy to override if needed
         # These are the omics dataframes that are valid for use in the utilities functions
         self._valid_omics_dfs = [
@@ -82,71 +102,71 @@ class Dataset:
             #"followup", # Right now there are duplicate rows, so don't include follow up tables for joins.
             ] # We don't allow the treatment df, as in Ovarian, or medical_history df, as in Ccrcc, because they both have multiple rows for each sample.
 
-    # Methods to get metadata dataframes
-    def get_clinical(self, tissue_type="both"):
+    # Methods to get metadata dataframes. Like the methods to get omics and mutations dataframes, these return copies by default, so you can edit them freely. Pass copy=False to get the dataset's own dataframe instead, which saves the time and memory of copying it, but must not be modified.
+    def get_clinical(self, tissue_type="both", copy=True):
         """Get the clinical dataframe."""
-        return self._get_dataframe("clinical", tissue_type)
+        return self._get_dataframe("clinical", tissue_type, copy=copy)
 
-    def get_derived_molecular(self, tissue_type="both"):
+    def get_derived_molecular(self, tissue_type="both", copy=True):
         """Get the derived_molecular dataframe."""
-        return self._get_dataframe("derived_molecular", tissue_type)
+        return self._get_dataframe("derived_molecular", tissue_type, copy=copy)
 
-    def get_experimental_design(self, tissue_type="both"):
+    def get_experimental_design(self, tissue_type="both", copy=True):
         """Get the experimental_design dataframe."""
-        return self._get_dataframe("experimental_design", tissue_type)
+        return self._get_dataframe("experimental_design", tissue_type, copy=copy)
 
-    def get_medical_history(self, tissue_type="both"):
+    def get_medical_history(self, tissue_type="both", copy=True):
         """Get the medical_history dataframe."""
-        return self._get_dataframe("medical_history", tissue_type)
+        return self._get_dataframe("medical_history", tissue_type, copy=copy)
 
-    def get_treatment(self, tissue_type="both"):
+    def get_treatment(self, tissue_type="both", copy=True):
         """Get the treatment dataframe."""
-        return self._get_dataframe("treatment", tissue_type)
+        return self._get_dataframe("treatment", tissue_type, copy=copy)
 
-    def get_followup(self, tissue_type="both"):
+    def get_followup(self, tissue_type="both", copy=True):
         """Get the followup dataframe."""
-        return self._get_dataframe("followup", tissue_type)
+        return self._get_dataframe("followup", tissue_type, copy=copy)
 
     # Methods to get omics dataframes
-    def get_acetylproteomics(self, tissue_type="both"):
+    def get_acetylproteomics(self, tissue_type="both", copy=True):
         """Get the acetylproteomics dataframe."""
-        return self._get_dataframe("acetylproteomics", tissue_type)
+        return self._get_dataframe("acetylproteomics", tissue_type, copy=copy)
 
-    def get_circular_RNA(self, tissue_type="both"):
+    def get_circular_RNA(self, tissue_type="both", copy=True):
         """Get the circular_RNA dataframe."""
-        return self._get_dataframe("circular_RNA", tissue_type)
+        return self._get_dataframe("circular_RNA", tissue_type, copy=copy)
 
-    def get_CNV(self):
+    def get_CNV(self, copy=True):
         """Get the CNV dataframe."""
-        return self._get_dataframe("CNV")
+        return self._get_dataframe("CNV", copy=copy)
 
-    def get_lincRNA(self, tissue_type="both"):
+    def get_lincRNA(self, tissue_type="both", copy=True):
         """Get the lincRNA dataframe."""
-        return self._get_dataframe("lincRNA",tissue_type)
+        return self._get_dataframe("lincRNA", tissue_type, copy=copy)
 
-    def get_lipidomics(self, tissue_type="both"):
+    def get_lipidomics(self, tissue_type="both", copy=True):
         """Get the lipidomics dataframe."""
-        return self._get_dataframe("lipidomics", tissue_type)
+        return self._get_dataframe("lipidomics", tissue_type, copy=copy)
 
-    def get_metabolomics(self, tissue_type="both"):
+    def get_metabolomics(self, tissue_type="both", copy=True):
         """Get the metabolomics dataframe."""
-        return self._get_dataframe("metabolomics", tissue_type)
+        return self._get_dataframe("metabolomics", tissue_type, copy=copy)
 
-    def get_methylation(self, tissue_type="both"):
+    def get_methylation(self, tissue_type="both", copy=True):
         """Get the methylation dataframe."""
-        return self._get_dataframe("methylation", tissue_type)
+        return self._get_dataframe("methylation", tissue_type, copy=copy)
 
-    def get_miRNA(self, tissue_type="both"):
+    def get_miRNA(self, tissue_type="both", copy=True):
         """Get the miRNA dataframe."""
-        return self._get_dataframe("miRNA",tissue_type)
+        return self._get_dataframe("miRNA", tissue_type, copy=copy)
 
-    def get_phosphoproteomics(self, tissue_type="both"):
+    def get_phosphoproteomics(self, tissue_type="both", copy=True):
         """Get the phosphoproteomics dataframe."""
-        return self._get_dataframe("phosphoproteomics",tissue_type)
+        return self._get_dataframe("phosphoproteomics", tissue_type, copy=copy)
 
-    def get_phosphoproteomics_gene(self, tissue_type="both"):
+    def get_phosphoproteomics_gene(self, tissue_type="both", copy=True):
         """Get the phosphoproteomics_gene dataframe. The gene level phosphorylation measurement is an aggregate metric which potentially averages together individual measurements of different sites. Use get_phosphoproteomics() to view the data for individual sites."""
-        return self._get_dataframe("phosphoproteomics_gene",tissue_type)
+        return self._get_dataframe("phosphoproteomics_gene", tissue_type, copy=copy)
 
     def get_phosphosites(self, genes):
         """Returns dataframe with all phosphosites of specified gene or list of genes.
@@ -159,26 +179,37 @@ class Dataset:
         """
         return self._get_omics_cols("phosphoproteomics", genes)
 
-    def get_proteomics(self, tissue_type="both"):
+    def get_proteomics(self, tissue_type="both", copy=True):
         """Get the proteomics dataframe."""
-        return self._get_dataframe("proteomics",tissue_type)
+        return self._get_dataframe("proteomics", tissue_type, copy=copy)
 
-    def get_transcriptomics(self, tissue_type="both"):
+    def get_transcriptomics(self, tissue_type="both", copy=True):
         """Get the transcriptomics dataframe."""
-        return self._get_dataframe("transcriptomics", tissue_type)
+        return self._get_dataframe("transcriptomics", tissue_type, copy=copy)
 
     # Methods to get mutations dataframes
-    def get_gene_fusion(self):
+    def get_gene_fusion(self, copy=True):
         """Get the gene_fusion dataframe."""
-        return self._get_dataframe("gene_fusion")
-
-    def get_somatic_mutation(self):
-        """Get the somatic_mutation dataframe."""
-        return self._get_dataframe("somatic_mutation")
+        return self._get_dataframe("gene_fusion", copy=copy)
+
+    def get_somatic_mutation(self, copy=True):
+        """Get the somatic_mutation dataframe. Its Gene and Mutation columns are stored as categoricals, but they're returned as regular columns of strings, so the dataframe can be edited and grouped like before. If they need converting, the returned dataframe is always a new one, regardless of copy."""
+        somatic_mutation = self._get_dataframe("somatic_mutation", copy=False)
+        to_decode = {col: object for col in ["Gene", "Mutation"] if col in somatic_mutation.columns and isinstance(somatic_mutation[col].dtype, pd.CategoricalDtype)}
+        if len(to_decode) > 0:
+            return somatic_mutation.astype(to_decode) # This makes a new dataframe, so we don't need to copy it first
+        return somatic_mutation.copy(deep=True) if copy else somatic_mutation
+
+    def get_somatic_mutation_binary(self, copy=True, dense=True, derive=False):
+        """Get the somatic_mutation_binary dataframe, which has a binary value indicating, for each location on each gene, whether there was a mutation in that gene at that location, for each sample. Almost all the values are 0, so it's stored internally as a sparse dataframe. By default it's returned as a regular dataframe; pass dense=False to get the sparse one, which uses much less memory. Pass derive=True to build it from the somatic_mutation dataframe instead of using the one from the data files; that way it can be had for datasets that don't include one."""
+        if derive:
+            binary = binarize_mutations(self._get_dataframe("somatic_mutation", copy=False)) # This makes a new dataframe, so we don't need to copy anything
+        else:
+            binary = self._get_dataframe("somatic_mutation_binary", copy=copy and not dense) # Making it dense makes a new dataframe too
 
-    def get_somatic_mutation_binary(self):
-        """Get the somatic_mutation_binary dataframe, which has a binary value indicating, for each location on each gene, whether there was a mutation in that gene at that location, for each sample."""
-        return self._get_dataframe("somatic_mutation_binary")
+        if dense:
+            binary = binary.sparse.to_dense()
+        return binary
 
     # Help methods
     def define(self, term):
@@ -211,9 +242,76 @@ class Dataset:
     def list_data(self):
         """Print list of loaded dataframes and dimensions."""
         print("Below are the dataframes contained in this dataset:")
-        for name in sorted(self._data.keys(), key=str.lower):
-            df = self._data[name]
-            print("\t{}\n\t\tDimensions: {}".format(name, df.shape))
+        for name in sorted(self._data.keys() | self._unparsed_tables.keys(), key=str.lower):
+            if name in self._unparsed_tables.keys():
+                print("\t{}\n\t\tDimensions: Not loaded yet".format(name)) # We don't parse the table just to list it
+            else:
+                df = self._data[name]
+                print("\t{}\n\t\tDimensions: {}".format(name, df.shape))
+
+    def sample_partitions(self, name):
+        """Get the positions of the tumor and normal samples among the rows of a dataframe, for selecting them with take or iloc. These are computed the first time they're needed for each dataframe, and reused after that.
+
+        Parameters:
+        name (str): The name of the dataframe.
+
+        Returns:
+        dict: Keys are "tumor" and "normal", values are read-only numpy.ndarray of the positions of the rows for those samples, in order.
+        """
+        if name in self._unparsed_tables.keys(): # The dataset was loaded lazily, and this table hasn't been requested before
+            self._parse_unparsed_table(name)
+
+        if name not in self._data.keys():
+            raise DataFrameNotIncludedError(f"{name} dataframe not included in the {self.get_cancer_type()} dataset.")
+
+        df = self._data[name]
+        clinical = self._data["clinical"]
+
+        # If neither the table nor the clinical dataframe has been replaced since we computed the positions, they're still good
+        cached = self._sample_partitions.get(name)
+        if cached is not None and cached[0] is df and cached[1] is clinical:
+            return dict(cached[2])
+
+        # Look up each row's status by its integer sample code, instead of matching Patient_IDs
+        codes = self.sample_codes(name)
+        sample_status = np.append(clinical["Sample_Tumor_Normal"].to_numpy(dtype=object), np.nan)[codes] # Codes of -1 are samples with no clinical record, so they get the NaN we put at the end
+        partitions = {}
+        for tissue_type, status in [("tumor", "Tumor"), ("normal", "Normal")]:
+            positions = np.flatnonzero(sample_status == status)
+            positions.flags.writeable = False # They're shared between callers, so don't let anyone change them
+            partitions[tissue_type] = positions
+
+        self._sample_partitions[name] = (df, clinical, partitions)
+        return dict(partitions)
+
+    def sample_codes(self, name):
+        """Get the position of each row's sample in the dataset's sample index, which is the clinical dataframe's index, and has every sample in the dataset. Tables can be lined up by these integer codes instead of by their Patient_ID strings. These are computed the first time they're needed for each dataframe, and reused after that.
+
+        Parameters:
+        name (str): The name of the dataframe.
+
+        Returns:
+        numpy.ndarray of int: Read-only. The code of each row's sample, in order, or -1 if the sample isn't in the clinical dataframe, as in the followup dataframe.
+        """
+        if name in self._unparsed_tables.keys(): # The dataset was loaded lazily, and this table hasn't been requested before
+            self._parse_unparsed_table(name)
+
+        if name not in self._data.keys():
+            raise DataFrameNotIncludedError(f"{name} dataframe not included in the {self.get_cancer_type()} dataset.")
+
+        df = self._data[name]
+        clinical = self._data["clinical"]
+
+        # If neither the table nor the clinical dataframe has been replaced since we computed the codes, they're still good
+        cached = self._sample_codes.get(name)
+        if cached is not None and cached[0] is df and cached[1] is clinical:
+            return cached[2]
+
+        codes = clinical.index.get_indexer(df.index)
+        codes.flags.writeable = False # They're shared between callers, so don't let anyone change them
+
+        self._sample_codes[name] = (df, clinical, codes)
+        return codes
 
     def list_definitions(self):
         """Print all terms defined in the dataset's list of definitions."""
@@ -224,220 +322,170 @@ class Dataset:
             raise NoDefinitionsError("No definitions provided for this dataset.")
 
     def get_genotype_all_vars(self, mutations_genes, mutations_filter=None, show_location=True, mutation_hotspot=None):
-        """Return a dataframe that has the mutation type and wheather or not it is a multiple mutation
+        """Return a dataframe that has the mutation type and wheather or not it is a multiple mutation. This is get_genotype_matrix for a single gene, with the columns named Mutation, Location, and Mutation_Status, and their values as strings.
         Parameters:
-        mutation_genes (str, or list or array-like of str): The gene(s) to get mutation data for.
+        mutation_genes (str): The gene to get mutation data for.
         mutations_filter (list, optional):  List of mutations to prioritize when filtering out multiple mutations, in order of priority.
         show_location (bool, optional): Whether to include the Location column from the mutation dataframe. Defaults to True.
         mutation_hotspot (optional): a list of hotspots
         """
 
-        #If they don't give us a filter, this is the default.
-
-        if mutations_filter == None:
-            if self.get_cancer_type() == "colon":
-                mutations_filter = ["Deletion", #deletion
-                                        'frameshift deletion', 'frameshift insertion', 'frameshift substitution', 'stopgain', 'stoploss', #truncation
-                                        'Missense_Mutation_hotspot',
-    	                                'nonframeshift deletion', 'nonframeshift insertion', 'nonframeshift substitution', 'nonsynonymous SNV', #missense
-                                        'Amplification',
-                                         'Wildtype']
-
-
-            elif self.get_cancer_type() == "hnscc":
-                mutations_filter = ["Deletion", #deletion
-                                        'Frame_Shift_Del', 'Frame_Shift_Ins', 'Nonsense_Mutation', 'Nonstop_Mutation', #truncation
-                                        'Missense_Mutation_hotspot',
-    	                                'Missense_Mutation',
-                                        'Amplification',
-                                        'In_Frame_Del', 'In_Frame_Ins', 'Splice_Site' #inframe changes
-                                        'Silent','Wildtype']
-
-            elif self.get_cancer_type() == "gbm":
-                mutations_filter = ["Deletion", #deletion
-                                        'Frame_Shift_Del', 'Frame_Shift_Ins', 'Nonsense_Mutation', 'Nonstop_Mutation', #truncation
-                                        'Missense_Mutation_hotspot',
-                                        'Missense_Mutation',
-                                        'Amplification',
-                                        'In_Frame_Del', 'In_Frame_Ins', 'Splice_Site' #inframe changes
-                                        'Silent','Wildtype']
-
-            else:
-                mutations_filter = ["Deletion",
-                                        'Frame_Shift_Del', 'Frame_Shift_Ins', 'Nonsense_Mutation', 'Nonstop_Mutation', #tuncation
-                                        'Missense_Mutation_hotspot',
-    	                                'Missense_Mutation',
-                                        'Amplification',
-                                        'In_Frame_Del', 'In_Frame_Ins', 'Splice_Site'
-                                        'Silent',
-                                        'Wildtype']
-
-        if self.get_cancer_type() == 'colon':
-            truncations = ['frameshift deletion', 'frameshift insertion', 'frameshift substitution', 'stopgain', 'stoploss']
-            missenses = ['nonframeshift deletion', 'nonframeshift insertion', 'nonframeshift substitution', 'nonsynonymous SNV']
-        elif self.get_cancer_type() == 'hnscc' and self.version() == "0.1":
-            truncations =["stopgain", "stoploss"]
-            missenses = ["nonframeshift insertion", "nonframeshift deletion"]
-        else:
-            truncations = ['Frame_Shift_Del', 'Frame_Shift_Ins', 'Nonsense_Mutation', 'Nonstop_Mutation', 'Splice_Site']
-            missenses = ['In_Frame_Del', 'In_Frame_Ins', 'Missense_Mutation']
-
-        if self.get_cancer_type() == "gbm":
-            noncodings = ["Intron", "RNA", "3'Flank", "Splice_Region", "5'UTR", "5'Flank", "3'UTR"]
-
-
-
         #check that gene is in the somatic_mutation DataFrame
-        somatic_mutation = self.get_somatic_mutation()
-        if mutations_genes not in somatic_mutation["Gene"].unique(): #if the gene isn't in the somacic mutations df it will still have CNV data that we want
-            def add_del_and_amp_no_somatic(row):
-                if row[mutations_genes] <= -.2:
-                    mutations = 'Deletion'
-
-                elif row[mutations_genes] >= .2:
-                    mutations = 'Amplification'
-                else:
-                    mutations = "No_Mutation"
-
-                return mutations
-            
-            cnv = self.get_CNV()
-            #drop the database index from ccrcc and brca
+        if not self._get_gene_mutation_positions(pd.Index([mutations_genes]))[1].all(): #if the gene isn't in the somacic mutations df it will still have CNV data that we want
+            cnv = self._get_dataframe("CNV", copy=False)
+            #drop the database index from ccrcc and brca. We select the gene's columns first, so we don't change the dataset's own dataframe.
             if isinstance(cnv.keys(), pd.core.indexes.multi.MultiIndex):
                 drop = ['Database_ID']
-                cnv = ut.reduce_multiindex(df=cnv, levels_to_drop=drop)       
-            gene_cnv = cnv[[mutations_genes]]
-            mutation_col = gene_cnv.apply(add_del_and_amp_no_somatic, axis=1)
+                gene_cnv = cnv.loc[:, cnv.columns.get_level_values("Name") == mutations_genes]
+                gene_cnv = ut.reduce_multiindex(df=gene_cnv, levels_to_drop=drop)
+            else:
+                gene_cnv = cnv[[mutations_genes]]
+            gene_values = gene_cnv[mutations_genes]
+            mutation_col = np.select([gene_values <= -.2, gene_values >= .2], ['Deletion', 'Amplification'], default='No_Mutation').astype(object)
             df = gene_cnv.assign(Mutation = mutation_col)
             return df
 
-
-        #combine the cnv and mutations dataframe
-        combined = self.join_omics_to_mutations(omics_df_name="CNV", mutations_genes=mutations_genes, omics_genes=mutations_genes)
-
-
-        #drop the database index from ccrcc
-        if self.get_cancer_type() == "ccrcc" or self.get_cancer_type() == "brca":
-             cc = self.get_CNV()
-             drop = ['Database_ID']
-             combined = ut.reduce_multiindex(df=combined, levels_to_drop=drop)
-
-
-        #If there are hotspot mutations, append 'hotspot' to the mutation type so that it's prioritized correctly
-        def mark_hotspot_locations(row):
-            #iterate through each location in the current row
-            mutations = []
-            for location in row[mutations_genes+'_Location']:
-                if location in mutation_hotspot: #if it's a hotspot mutation
-                    #get the position of the location
-                    position = row[mutations_genes+'_Location'].index(location)
-                    #use that to change the correct mutation
-                    mutations.append(row[mutations_genes+"_Mutation"][position] + "_hotspot")
-                else:
-                    # get the position of the location
-                    position = row[mutations_genes+'_Location'].index(location)
-                    mutations.append(row[mutations_genes+"_Mutation"][position])
-            return mutations
-
-        if mutation_hotspot is not None:
-            combined['hotspot'] = combined.apply(mark_hotspot_locations, axis=1)
-            combined[mutations_genes+"_Mutation"] = combined['hotspot']
-            combined = combined.drop(columns='hotspot')
-
-        # Based on cnv make a new column with mutation type that includes deletions and amplifications
-        def add_del_and_amp(row):
-            if row[mutations_genes+"_CNV"] <= -.2:
-                mutations = row[mutations_genes+"_Mutation"] + ['Deletion']
-                locations = row[mutations_genes+'_Location']+['Deletion']
-
-            elif row[mutations_genes+"_CNV"] >= .2:
-                mutations = row[mutations_genes+"_Mutation"] + ['Amplification']
-                locations = row[mutations_genes+'_Location']+['Amplification']
-            else:
-                mutations = row[mutations_genes+"_Mutation"]
-                locations = row[mutations_genes+"_Location"]
-
-            return mutations, locations
-
-
-        combined['mutations'], combined['locations'] = zip(*combined.apply(add_del_and_amp, axis=1))
+        matrix = self.get_genotype_matrix(mutations_genes, mutations_filter=mutations_filter, show_location=show_location, mutation_hotspot=mutation_hotspot)
+        df = matrix.astype(object)
+        df.columns = [col[len(mutations_genes) + 1:] for col in matrix.columns] # Strip the gene name off, e.g. TP53_Mutation becomes Mutation
+        df.columns.name = "Name"
+        return df
 
 
-        #now that we have the deletion and amplifications, we need to prioritize the correct mutations.
-        def sort(row):
-            sortedcol = []
-            location = []
-            chosen_indices = []
-            sample_mutations_list = row['mutations']
-            sample_locations_list = row['locations']
-            if len(sample_mutations_list) == 1: #if there's only one mutation in the list
-                sortedcol.append(sample_mutations_list[0])
-                location.append(sample_locations_list[0])
+    def get_genotype_matrix(self, genes, mutations_filter=None, show_location=True, mutation_hotspot=None):
+        """Get the genotype of many genes at once. get_genotype_all_vars gives the same thing for one gene. For each sample and gene, each mutation in the gene, plus a Deletion or Amplification if the gene's CNV is at most -0.2 or at least 0.2, is a candidate, and the highest priority one is chosen.
 
-            else:
-                for filter_val in mutations_filter: # This will start at the beginning of the filter list, thus filters earlier in the list are prioritized, like we want
-                    if filter_val in sample_mutations_list:
-                        chosen_indices = [index for index, value in enumerate(sample_mutations_list) if value == filter_val]
-                    if len(chosen_indices) > 0: # We found at least one mutation from the filter to prioritize, so we don't need to worry about later values in the filter priority list
-                        break
-
-                if len(chosen_indices) == 0: # None of the mutations for the sample were in the filter, so we're going to have to use our default hierarchy
-                    for mutation in sample_mutations_list:
-                        if mutation in truncations:
-                            chosen_indices += [index for index, value in enumerate(sample_mutations_list) if value == mutation]
-
-                if len(chosen_indices) == 0: # None of them were in the filter, nor were truncations, so we'll grab all the missenses
-                    for mutation in sample_mutations_list:
-                        if mutation in missenses:
-                            chosen_indices += [index for index, value in enumerate(sample_mutations_list) if value == mutation]
-
-                if self.get_cancer_type() == "gbm" and len(chosen_indices) == 0: # None of them were in the filter, nor were truncations, nor missenses, so we'll grab all the noncodings
-                    for mutation in sample_mutations_list:
-                        if mutation in noncodings:
-                            chosen_indices += [index for index, value in enumerate(sample_mutations_list) if value == mutation]
-
-                soonest_mutation = sample_mutations_list[chosen_indices[0]]
-                soonest_location = sample_locations_list[chosen_indices[0]]
-                chosen_indices.clear()
-                sortedcol.append(soonest_mutation)
-                location.append(soonest_location)
-
-            return pd.Series([sortedcol, location],index=['mutations', 'locations'])
-
-        df = combined.apply(sort, axis=1)
-        combined['Mutation'] = df['mutations']
-        combined['Location'] = df['locations']
-
-        #get a sample_status column that says if the gene has multiple mutations (including dletion and amplification)
-        def sample_status(row):
-            if len(row['mutations']) > 1: #if there's more than one mutation
-                if len(row['mutations']) == 2 and "Wildtype_Tumor" in row['mutations']: #one of the mutations might be a "wildtype tumor"
-                    status ="Single_mutation"
-
-                elif len(row['mutations']) == 2 and "Wildtype_Normal" in row['mutations']:
-                    status ="Single_mutation"
+        Parameters:
+        genes (str, or list or array-like of str): The gene(s) to get genotypes for. Each must be in the somatic_mutation or CNV data.
+        mutations_filter (list, optional): List of mutations to prioritize when choosing one mutation, in order of priority. If none of a sample's mutations are in the filter, truncations are chosen over missenses, and for gbm missenses over noncoding mutations. Ties go to the mutation that's first in the somatic_mutation table, and then to mutations over deletions and amplifications. Default of None will use the default filter from _get_genotype_filter.
+        show_location (bool, optional): Whether to include the Location columns. Defaults to True.
+        mutation_hotspot (list of str, optional): Locations of hotspot mutations. Mutations at these locations have "_hotspot" appended to their type, so they can be prioritized in the filter, e.g. with "Missense_Mutation_hotspot". Default of None marks no hotspots.
 
-                else:
-                    status = "Multiple_mutation"
+        Returns:
+        pandas.DataFrame: Samples as the index, tumor samples first, and Mutation, Location, and Mutation_Status columns for each gene, named like TP53_Mutation. The columns are categorical, and all columns of the same kind share their categories. Samples with no mutations in a gene are Wildtype_Tumor or Wildtype_Normal, with a location of No_mutation. Mutation_Status is Single_mutation or Multiple_mutation, counting deletions and amplifications as mutations.
+        """
+        # Process genes parameter
+        if isinstance(genes, str): # If it's a single gene, put it in a list
+            genes = [genes]
+        elif not isinstance(genes, (list, pd.Series, pd.Index)): # If it's neither of those, they done messed up. Tell 'em.
+            raise InvalidParameterError("Genes parameter {} is of invalid type {}. Valid types: str, or list or array-like of str.".format(genes, type(genes)))
+        genes = pd.Index(genes).drop_duplicates()
+
+        if mutations_filter is None:
+            mutations_filter = self._get_genotype_filter()
+        if mutation_hotspot is None:
+            mutation_hotspot = []
+
+        somatic_mutation = self._get_dataframe("somatic_mutation", copy=False)
+        cnv = self._get_dataframe("CNV", copy=False)
+
+        # Find each gene's CNV column. If a gene has more than one, e.g. for different database IDs, we use the first.
+        cnv_genes = cnv.columns.get_level_values("Name") if isinstance(cnv.columns, pd.MultiIndex) else cnv.columns
+        first_cnv_cols = np.flatnonzero(~cnv_genes.duplicated())
+        cnv_col_positions = cnv_genes[first_cnv_cols].get_indexer(genes)
+
+        # Select the mutations for all the genes
+        gene_mutations = somatic_mutation.iloc[self._get_gene_mutation_positions(genes)[0]]
+        mutation_genes = genes.get_indexer(gene_mutations["Gene"])
+        not_found = genes[(np.bincount(mutation_genes, minlength=len(genes)) == 0) & (cnv_col_positions == -1)]
+        if len(not_found) > 0:
+            raise InvalidParameterError(f"{', '.join(not_found)} not found in somatic_mutation or CNV data.")
+
+        # Get all the samples, sorted with tumor samples first, like an outer join of the CNV and somatic_mutation tables would be
+        samples = cnv.index.union(somatic_mutation.index.drop_duplicates())
+        samples = sort_df_by_sample_status(pd.DataFrame(index=samples), self._get_dataframe("clinical", copy=False)["Sample_Tumor_Normal"]).index
+        mutation_samples = samples.get_indexer(gene_mutations.index)
+
+        # Each cell of the matrix is a sample and a gene, numbered in row-major order
+        num_cells = len(samples) * len(genes)
+        mutation_cells = mutation_samples * len(genes) + mutation_genes
+
+        mutations = np.asarray(gene_mutations["Mutation"], dtype=object)
+        locations = np.asarray(gene_mutations["Location"], dtype=object)
+        if len(mutation_hotspot) > 0: # Append "_hotspot" to hotspot mutation types, so they're prioritized correctly
+            is_hotspot = pd.Series(locations, dtype=object).isin(mutation_hotspot).to_numpy()
+            mutations[is_hotspot] = mutations[is_hotspot] + "_hotspot"
+
+        # Rank each distinct mutation type once. Mutations in the filter come first, in filter order, then truncations, missenses, and gbm noncodings, then everything else.
+        truncations, missenses, noncodings = self._get_mutation_classes()
+        num_filters = len(mutations_filter)
+        filter_ranks = {}
+        for i, filter_val in reversed(list(enumerate(mutations_filter))): # Go backwards, so filter values earlier in the list overwrite later ones
+            filter_ranks[filter_val] = i
+        def get_rank(mutation):
+            if mutation in filter_ranks:
+                return filter_ranks[mutation]
+            elif mutation in truncations:
+                return num_filters
+            elif mutation in missenses:
+                return num_filters + 1
+            elif mutation in noncodings:
+                return num_filters + 2
             else:
-                if row["mutations"] == ["Wildtype_Normal"]:
-                    status = "Wildtype_Normal"
-                elif row['mutations'] == ['Wildtype_Tumor']:
-                    status = "Wildtype_Tumor"
-                else:
-                    status = "Single_mutation"
-
-            return status
-        combined['Mutation_Status'] = combined.apply(sample_status, axis=1)
-
-        #drop all the unnecessary Columns
-        df = combined.drop(columns=[mutations_genes+"_CNV", mutations_genes+"_Mutation", mutations_genes+"_Location", mutations_genes+"_Mutation_Status", 'Sample_Status', 'mutations','locations'])
-        df['Mutation'] = [','.join(map(str, l)) for l in df['Mutation']]
-        df['Location'] = [','.join(map(str, l)) for l in df['Location']]
-        if show_location == False: df = df.drop(columns="Location") #if they don't want us to show the location, drop it
+                return num_filters + 3
+
+        mutation_codes, mutation_types = pd.factorize(mutations)
+        mutation_ranks = np.array([get_rank(mutation) for mutation in mutation_types] + [num_filters + 3])[mutation_codes] # Codes of -1 are NaNs, which get the extra rank at the end
+
+        # Choose the best mutation in each cell, and count them
+        order = np.lexsort((np.arange(len(mutations)), mutation_ranks, mutation_cells))
+        sorted_cells = mutation_cells[order]
+        best_mutations = order[np.flatnonzero(np.diff(sorted_cells, prepend=-1))]
+        mutated_cells = mutation_cells[best_mutations]
+        num_mutations = np.bincount(mutation_cells, minlength=num_cells)
+
+        # Start with every cell wildtype, or missing if we don't know the sample's status, then fill in the best mutations
+        sample_wildtypes = self._get_sample_status_map().reindex(samples).map({"Normal": "Wildtype_Normal", "Tumor": "Wildtype_Tumor"})
+        wildtype = np.repeat(np.asarray(sample_wildtypes, dtype=object), len(genes))
+        cell_mutations = wildtype.copy()
+        cell_locations = np.where(pd.isnull(wildtype), np.nan, "No_mutation").astype(object)
+        cell_mutations[mutated_cells] = mutations[best_mutations]
+        cell_locations[mutated_cells] = locations[best_mutations]
+
+        # Wildtype fills aren't real mutations, so they rank below everything and any CNV event replaces them
+        cell_ranks = np.full(num_cells, np.inf)
+        cell_ranks[mutated_cells] = mutation_ranks[best_mutations]
+
+        # Add deletions and amplifications from the CNV data. They're last in each cell, so they only win if they have a strictly higher priority, or if there's nothing else.
+        gene_cnv = np.full((len(samples), len(genes)), np.nan)
+        in_cnv = cnv_col_positions != -1
+        if in_cnv.any():
+            cnv_cols = cnv.iloc[:, first_cnv_cols[cnv_col_positions[in_cnv]]]
+            gene_cnv[:, in_cnv] = cnv_cols.reindex(samples).to_numpy(dtype=float)
+        gene_cnv = gene_cnv.ravel()
+
+        cnv_events = np.where(gene_cnv <= -.2, "Deletion", np.where(gene_cnv >= .2, "Amplification", None)).astype(object)
+        has_event = pd.notnull(cnv_events)
+        event_ranks = np.where(cnv_events[has_event] == "Deletion", get_rank("Deletion"), get_rank("Amplification"))
+        event_wins = np.zeros(num_cells, dtype=bool)
+        event_wins[has_event] = event_ranks < cell_ranks[has_event]
+        cell_mutations[event_wins] = cnv_events[event_wins]
+        cell_locations[event_wins] = cnv_events[event_wins]
+
+        # Count the candidates in each cell to get its status. Wildtype fills aren't counted as mutations.
+        num_candidates = num_mutations + has_event
+        cell_mutation_statuses = np.where(num_candidates > 1, "Multiple_mutation", "Single_mutation").astype(object)
+        cell_mutation_statuses[num_candidates == 0] = wildtype[num_candidates == 0]
+
+        # Build the matrix out of categorical columns, with the categories shared across genes
+        fields = [("Mutation", cell_mutations), ("Location", cell_locations), ("Mutation_Status", cell_mutation_statuses)]
+        if not show_location:
+            fields = [field for field in fields if field[0] != "Location"]
+
+        field_codes = {}
+        for field, values in fields:
+            codes, categories = pd.factorize(values, sort=True)
+            field_codes[field] = (codes.reshape(len(samples), len(genes)), categories)
+
+        columns = {}
+        for i, gene in enumerate(genes):
+            for field, (codes, categories) in field_codes.items():
+                columns[gene + "_" + field] = pd.Categorical.from_codes(codes[:, i], categories=categories)
+
+        df = pd.DataFrame(columns, index=samples)
+        df.columns.name = "Name"
         return df
 
-
     # Join functions
     def join_omics_to_omics(self, df1_name, df2_name, genes1=None, genes2=None, how="outer", quiet=False, tissue_type="both"):
         """Take specified column(s) from one omics dataframe, and join to specified columns(s) from another omics dataframe. Intersection (inner join) of indices is used.
@@ -473,12 +521,12 @@ class Dataset:
             self._warn_inserted_nans(df1_name, df2_name, selected1.index, selected2.index)
 
         # Sort the dataframe so all the tumor samples are first, then all the normal samples
-        sample_status_col = self._get_dataframe("clinical")["Sample_Tumor_Normal"]
+        sample_status_col = self._get_dataframe("clinical", copy=False)["Sample_Tumor_Normal"]
         joined = sort_df_by_sample_status(joined, sample_status_col)
 
         return joined
 
-    def join_omics_to_mutations(self, omics_df_name, mutations_genes, omics_genes=None, mutations_filter=None, show_location=True, how="outer", quiet=False, tissue_type="both"):
+    def join_omics_to_mutations(self, omics_df_name, mutations_genes, omics_genes=None, mutations_filter=None, show_location=True, how="outer", quiet=False, tissue_type="both", long_format=False):
         """Select all mutations for specified gene(s), and joins them to all or part of the given omics dataframe. Intersection (inner join) of indices is used. Each location or mutation cell contains a list, which contains the one or more location or mutation values corresponding to that sample for that gene, or a value indicating that the sample didn't have a mutation in that gene.
 
         Parameters:
@@ -490,6 +538,7 @@ class Dataset:
         how (str, optional): How to perform the join, acceptable values are from ['outer', 'inner', 'left', 'right']. Defaults to 'outer'.
         quiet (bool, optional): Whether to warn when inserting NaNs. Defaults to False.
         tissue_type (str): Acceptable values in ["tumor","normal","both"]. Specifies the desired tissue type desired in the dataframe. Defaults to "both".
+        long_format (bool, optional): Whether to return one row for each mutation instead of lists, with categorical Gene, Mutation, Location, and Mutation_Status columns. Each sample's omics values are repeated on each of its rows, and each gene a sample has no mutations in gets one row with the value indicating that. Rows are sorted by sample, then by gene in the order given. Defaults to False.
 
         Returns:
         pandas.DataFrame: The mutations for the specified gene, joined to all or part of the omics dataframe. Each location or mutation cell contains a list, which contains the one or more location or mutation values corresponding to that sample for that gene, or a value indicating that the sample didn't have a mutation in that gene.
@@ -499,10 +548,26 @@ class Dataset:
 
         # Select the data from each dataframe
         omics = self._get_omics_cols(omics_df_name, omics_genes, tissue_type)
-        mutations = self._get_genes_mutations(mutations_genes, mutations_filter)
+        mutations = self._get_genes_mutations(mutations_genes, mutations_filter, long_format=long_format)
         if tissue_type == "normal":
             mutations = mutations.iloc[0:0] #If tissue type is normal, we drop all of the mutations rows and join only with the columns.
 
+        if long_format:
+            # The long mutations only have rows for mutated samples, so first give the omics data a row for every sample in the somatic_mutation dataframe, the same rows the lists would have
+            mutation_samples = self._get_dataframe("somatic_mutation", copy=False).index.drop_duplicates()
+            if tissue_type == "normal":
+                mutation_samples = mutation_samples[0:0]
+            joined = omics.reindex(omics.index.join(mutation_samples, how=how))
+            sample_status_col = self._get_dataframe("clinical", copy=False)["Sample_Tumor_Normal"]
+            joined = sort_df_by_sample_status(joined, sample_status_col)
+            joined = self._join_mutations_long(joined, mutations, show_location, fill=True, quiet=quiet)
+
+            # Warn them about any NaNs that were inserted in the outer join
+            if not quiet and how != "inner":
+                self._warn_inserted_nans(omics_df_name, "somatic_mutation", omics.index, mutation_samples)
+
+            return joined
+
         mutations_were_filtered = mutations_filter is not None
         joined = self._join_other_to_mutations(omics, mutations, mutations_were_filtered, show_location, how=how, quiet=quiet)
 
@@ -511,7 +576,7 @@ class Dataset:
             self._warn_inserted_nans(omics_df_name, "somatic_mutation", omics.index, mutations.index)
 
         # Sort the dataframe so all the tumor samples are first, then all the normal samples
-        sample_status_col = self._get_dataframe("clinical")["Sample_Tumor_Normal"]
+        sample_status_col = self._get_dataframe("clinical", copy=False)["Sample_Tumor_Normal"]
         joined = sort_df_by_sample_status(joined, sample_status_col)
 
         return joined
@@ -545,7 +610,7 @@ class Dataset:
             self._warn_inserted_nans(df1_name, df2_name, selected1.index, selected2.index)
 
         # Sort the dataframe so all the tumor samples are first, then all the normal samples
-        sample_status_col = self._get_dataframe("clinical")["Sample_Tumor_Normal"]
+        sample_status_col = self._get_dataframe("clinical", copy=False)["Sample_Tumor_Normal"]
         joined = sort_df_by_sample_status(joined, sample_status_col)
 
         return joined
@@ -583,12 +648,12 @@ class Dataset:
             self._warn_inserted_nans(metadata_df_name, omics_df_name, metadata_selected.index, omics_selected.index)
 
         # Sort the dataframe so all the tumor samples are first, then all the normal samples
-        sample_status_col = self._get_dataframe("clinical")["Sample_Tumor_Normal"]
+        sample_status_col = self._get_dataframe("clinical", copy=False)["Sample_Tumor_Normal"]
         joined = sort_df_by_sample_status(joined, sample_status_col)
 
         return joined
 
-    def join_metadata_to_mutations(self, metadata_df_name, mutations_genes, metadata_cols=None, mutations_filter=None, show_location=True, how="outer", quiet=False, tissue_type="both"):
+    def join_metadata_to_mutations(self, metadata_df_name, mutations_genes, metadata_cols=None, mutations_filter=None, show_location=True, how="outer", quiet=False, tissue_type="both", long_format=False):
         """Select all mutations for specified gene(s), and joins them to all or part of the given metadata dataframe. Intersection (inner join) of indices is used. Each location or mutation cell contains a list, which contains the one or more location or mutation values corresponding to that sample for that gene, or a value indicating that the sample didn't have a mutation in that gene.
 
         Parameters:
@@ -600,6 +665,7 @@ class Dataset:
         how (str, optional): How to perform the join, acceptable values are from ['outer', 'inner', 'left', 'right']. Defaults to 'outer'.
         quiet (bool, optional): Whether to warn when inserting NaNs. Defaults to False.
         tissue_type (str): Acceptable values in ["tumor","normal","both"]. Specifies the desired tissue type desired in the dataframe. Defaults to "both".
+        long_format (bool, optional): Whether to return one row for each mutation instead of lists, with categorical Gene, Mutation, Location, and Mutation_Status columns. Each sample's metadata values are repeated on each of its rows, and each gene a sample has no mutations in gets one row with the value indicating that. Rows are sorted by sample, then by gene in the order given. Defaults to False.
 
         Returns:
         pandas.DataFrame: The mutations for the specified gene, joined to all or part of the metadata dataframe. Each location or mutation cell contains a list, which contains the one or more location or mutation values corresponding to that sample for that gene, or a value indicating that the sample didn't have a mutation in that gene.
@@ -609,11 +675,27 @@ class Dataset:
 
         # Select the data from each dataframe
         metadata = self._get_metadata_cols(metadata_df_name, metadata_cols, tissue_type)
-        mutations = self._get_genes_mutations(mutations_genes, mutations_filter)
+        mutations = self._get_genes_mutations(mutations_genes, mutations_filter, long_format=long_format)
         
         if tissue_type == "normal":
             mutations = mutations.iloc[0:0] #If tissue type is normal, we drop all of the mutations rows and join only with the columns.
 
+        if long_format:
+            # The long mutations only have rows for mutated samples, so first give the metadata a row for every sample in the somatic_mutation dataframe, the same rows the lists would have
+            mutation_samples = self._get_dataframe("somatic_mutation", copy=False).index.drop_duplicates()
+            if tissue_type == "normal":
+                mutation_samples = mutation_samples[0:0]
+            joined = metadata.reindex(metadata.index.join(mutation_samples, how=how))
+            sample_status_col = self._get_dataframe("clinical", copy=False)["Sample_Tumor_Normal"]
+            joined = sort_df_by_sample_status(joined, sample_status_col)
+            joined = self._join_mutations_long(joined, mutations, show_location, fill=True, quiet=quiet)
+
+            # Warn them about any NaNs that were inserted in the outer join
+            if not quiet and how != "inner":
+                self._warn_inserted_nans(metadata_df_name, "somatic_mutation", metadata.index, mutation_samples)
+
+            return joined
+
         mutations_were_filtered = mutations_filter is not None
         joined = self._join_other_to_mutations(metadata, mutations, mutations_were_filtered, show_location,how=how, quiet=quiet)
 
@@ -622,12 +704,12 @@ class Dataset:
             self._warn_inserted_nans(metadata_df_name, "somatic_mutation", metadata.index, mutations.index)
 
         # Sort the dataframe so all the tumor samples are first, then all the normal samples
-        sample_status_col = self._get_dataframe("clinical")["Sample_Tumor_Normal"]
+        sample_status_col = self._get_dataframe("clinical", copy=False)["Sample_Tumor_Normal"]
         joined = sort_df_by_sample_status(joined, sample_status_col)
 
         return joined
     
-    def multi_join(self, join_dict, mutations_filter=None, flatten=False, levels_to_drop=[], how="outer", tissue_type="both"):    
+    def multi_join(self, join_dict, mutations_filter=None, flatten=False, levels_to_drop=[], how="outer", tissue_type="both", dry_run=False, long_format=False):    
         """Takes a dictionary which keys are dataframes and values are columns from those dataframes and joins all the columns into one dataframe. If the value is an empty list it will join the dataframe
         
         Parameters:
@@ -635,7 +717,7 @@ class Dataset:
         
             Valid dataframes are: acetylproteomics, CNV, phosphoproteomics, phosphoproteomics_gene, proteomics, somatic_mutation_binary, somatic_mutation, transcriptomics, clinical, derived_molecular and experimental_design.
             
-            For somatic_mutation_binary it joins all columns that match a gene. Example {'somatic_mutation_binary' : ['A1CF', 'ZYG11B']} It returns a dataframe with all columns that contain those genes.
+            For somatic_mutation_binary it joins all columns for a gene, i.e. all columns whose name is the gene followed by an underscore and a location. Example {'somatic_mutation_binary' : ['A1CF', 'ZYG11B']} It returns a dataframe with all columns for those genes.
             
         mutations_filter (list, optional): List of mutations to prioritize when filtering out multiple mutations, in order of priority. If none of the multiple mutations in a sample are included in mutations_filter, the function will automatically prioritize truncation over missense mutations, and then mutations earlier in the sequence over later mutations. Passing an empty list will cause this default hierarchy to be applied to all samples. Default parameter of None will cause no filtering to be done, and all mutation data will be included, in a list.
         
@@ -643,25 +725,29 @@ class Dataset:
         
         levels_to_drop (list, optional): Defaults to empty list. Takes a list of strings. Strings are levels to be dropped. If empty it will not drop any.
         
+        how (str, optional): How to perform the join, acceptable values are from ['outer', 'inner', 'left', 'right']. Defaults to 'outer'.
+
         tissue_type (str): Acceptable values in ["tumor","normal","both"]. Specifies the desired tissue type desired in the dataframe. Defaults to "both"
+
+        dry_run (bool, optional): If True, select the columns and plan the join, but don't build the joined dataframe. Instead, return a dataframe with the number of rows and columns selected from each dataframe, and the shape and estimated memory of the joined dataframe. Defaults to False.
+
+        long_format (bool, optional): If True, join the somatic_mutation data with one row for each mutation instead of lists, in categorical Gene, Mutation, Location, and Mutation_Status columns after all the other columns. Each sample's values from the other dataframes are repeated on each of its rows, and each gene a sample has no mutations in gets one row with NaN mutation values, the same as the empty cells it would get with lists. Defaults to False.
         
         Returns: pandas.DataFrame
         """
+        self._check_how_parameter(how)
+
         column_names = []    
         to_join=[]
+        long_mutations = None
         
         for df_name in join_dict.keys():
             ## If key belongs to omics
             if df_name in self._valid_omics_dfs:
                 # If key is somatic_mutation_binary it will join all columns that match a gene
                 if df_name == "somatic_mutation_binary":
-                    binary_data = self.get_somatic_mutation_binary()
-                    binary_data = "\n".join(list(binary_data.columns))
-                    found_genes = []
                     if len(join_dict[df_name]) != 0:
-                        for gene in join_dict[df_name]:
-                            found_genes += (re.findall((gene+".+\n"), binary_data))
-                        found_genes = list(map(lambda x: x.strip("\n"), found_genes))#returns a list of columns that match the given gene
+                        found_genes = self._get_binary_gene_columns(join_dict[df_name]) # returns a list of columns that match the given genes
                         columns = self._get_omics_cols(df_name, found_genes, tissue_type= tissue_type)
                     else:
                         columns = self._get_omics_cols(df_name, None, tissue_type= tissue_type)
@@ -678,7 +764,11 @@ class Dataset:
                     columns = self._get_metadata_cols(df_name, None, tissue_type = tissue_type)
             ## If key is somatic_mutation 
             elif df_name == "somatic_mutation":
-                columns = self._get_genes_mutations(join_dict[df_name], mutations_filter = mutations_filter)
+                if long_format: # Join just the samples for now, and add the mutations once everything else is joined
+                    long_mutations = self._get_genes_mutations(join_dict[df_name], mutations_filter = mutations_filter, long_format=True)
+                    columns = pd.DataFrame(index=self._get_dataframe("somatic_mutation", copy=False).index.drop_duplicates(), columns=pd.Index([], name="Name"))
+                else:
+                    columns = self._get_genes_mutations(join_dict[df_name], mutations_filter = mutations_filter)
 
             ### Checks if there are columns with the same name and adds the name of the
             for i in columns.columns:
@@ -691,7 +781,27 @@ class Dataset:
 
             to_join.append(columns)
 
-        joined, how = reduce(self._join_dataframe, to_join, how)
+        if len(to_join) == 0:
+            raise InvalidParameterError("join_dict is empty. Pass at least one dataframe to join.")
+
+        # Plan the join before we build it: give every table the same column levels, and compute the final row index from the tables' indices alone
+        joined_index, kept_samples = self._plan_multi_join(to_join, how)
+
+        if dry_run:
+            return self._describe_multi_join(join_dict.keys(), to_join, joined_index, long_mutations=long_mutations)
+
+        if joined_index is None: # The indices have duplicate samples, so we can't just reindex each table. Join them one at a time instead.
+            joined, how = reduce(self._join_dataframe, to_join, how)
+        else:
+            aligned = []
+            for columns, kept in zip(to_join, kept_samples):
+                if kept is not None:
+                    columns = columns[columns.index.isin(kept)]
+                aligned.append(columns.reindex(joined_index))
+            joined = pd.concat(aligned, axis=1) # Every table now has the final index, so this just puts the columns side by side
+
+        if long_mutations is not None:
+            joined = self._join_mutations_long(joined, long_mutations, show_location=True, fill=False, quiet=True)
     
         if len(levels_to_drop) != 0:
             joined = ut.reduce_multiindex(joined, levels_to_drop=levels_to_drop)
@@ -701,28 +811,304 @@ class Dataset:
         return joined
 
     # "Private" methods
-    
-    def _get_dataframe(self, name, tissue_type="both"):
+
+    def _load_data(self, table_files=None, lazy=False, n_jobs=1):
+        """Parse the data files for this dataset into dataframes in the self._data dict, and format them. Child classes call this at the end of their __init__ functions, and implement _parse_file to parse each individual file. If the formatted tables for this version were cached by a previous full load, and are still valid, they're loaded from the cache instead.
+
+        Parameters:
+        table_files (dict, keys of str, values of list of str, optional): A dictionary where the keys are table names, and the values are lists of the names of the data files each table is parsed from, across all versions. Only needed if lazy is True.
+        lazy (bool, optional): Whether to wait to parse each table until it's first requested. The file(s) the clinical dataframe is parsed from are still parsed right away, since the clinical dataframe is needed to format all the other tables. Default is False.
+        n_jobs (int, optional): The number of threads to parse the data files with. Pass -1 to use one thread for each CPU. Default is 1.
+
+        Returns: None
+        """
+        if n_jobs == -1:
+            n_jobs = os.cpu_count()
+        elif not isinstance(n_jobs, int) or n_jobs < 1:
+            raise InvalidParameterError(f"{n_jobs} is not a valid value for n_jobs. Pass a positive integer, or -1 to use one thread for each CPU.")
+
+        file_paths = self._data_files_paths
+
+        if lazy:
+            if table_files is None:
+                raise CptacDevError(f"The {self.get_cancer_type()} dataset doesn't say which files each table is parsed from, so it can't be loaded lazily.")
+
+            # Get the paths of the files each table is parsed from in this version
+            for name, names_files in table_files.items():
+                names_paths = [path for path in self._data_files_paths if os.path.basename(path) in names_files]
+                if len(names_paths) > 0:
+                    self._unparsed_tables[name] = names_paths
+
+            # Parse the clinical dataframe's files now, along with any other tables that come from those files. Defer everything else.
+            clinical_paths = self._unparsed_tables.get("clinical", [])
+            self._unparsed_tables = {name: paths for name, paths in self._unparsed_tables.items() if not set(paths) & set(clinical_paths)}
+            deferred_paths = {path for paths in self._unparsed_tables.values() for path in paths}
+            file_paths = [path for path in self._data_files_paths if path not in deferred_paths]
+
+        # If we've already formatted the tables for this version of the data, and neither the data files nor the package have changed since, load them from the cache instead of parsing the files again
+        self._use_cache = is_cache_valid(self._cancer_type, self._version)
+        if self._use_cache:
+            loading_msg = f"Loading {self.get_cancer_type()} v{self.version()} from cache..."
+            print(loading_msg, end='\r')
+
+            cached = load_cached_tables(self._cancer_type, self._version, exclude=self._unparsed_tables.keys())
+            cached_definitions = load_cached_definitions(self._cancer_type, self._version) if cached is not None else None
+
+            print(' ' * len(loading_msg), end='\r') # Erase the loading message
+
+            # If anything in the cache couldn't be read, we fall back to parsing the files, which will cache them again
+            if cached is not None and cached_definitions is not None:
+                self._data.update(cached)
+                self._definitions.update(cached_definitions)
+                self._compact_mutation_tables() # In case the cache was saved before we stored them this way
+                self._share_sample_index()
+                return
+            self._use_cache = False
+
+        # Load the data into dataframes in the self._data dict. The files are independent until we format the dataframes, so we can parse them in parallel.
+        loading_msg = f"Loading {self.get_cancer_type()} v{self.version()}"
+        parsed = [None] * len(file_paths) # We keep the results in the same order as the files, so the tables come out the same no matter which file finishes first
+        with concurrent.futures.ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            futures = {executor.submit(self._parse_file, file_path): i for i, file_path in enumerate(file_paths)}
+            for future in concurrent.futures.as_completed(futures):
+
+                # Print a loading message. We add a dot every time a file finishes, so the user knows it's not frozen.
+                loading_msg = loading_msg + "."
+                print(loading_msg, end='\r')
+
+                parsed[futures[future]] = future.result()
+
+        for file_data in parsed:
+            self._data.update(file_data)
+
+        print(' ' * len(loading_msg), end='\r') # Erase the loading message
+        formatting_msg = "Formatting dataframes..."
+        print(formatting_msg, end='\r')
+
+        self._format_dataframes()
+        self._compact_mutation_tables()
+        self._share_sample_index()
+
+        print(" " * len(formatting_msg), end='\r') # Erase the formatting message
+
+        # Cache the formatted tables, so next time we can skip all that. We only do this if we parsed everything, since tables parsed lazily are formatted with just the samples we've seen so far.
+        if len(self._unparsed_tables) == 0:
+            save_cached_tables(self._cancer_type, self._version, self._data, self._definitions)
+
+    def _parse_file(self, file_path):
+        """Parse one of the dataset's data files. Child classes must implement this.
+
+        Parameters:
+        file_path (str): The path to the file to parse.
+
+        Returns:
+        dict: The dataframes parsed from the file. Keys are str of dataframe names, values are pandas.DataFrame
+        """
+        raise CptacDevError(f"The {self.get_cancer_type()} dataset needs to implement _parse_file.")
+
+    def _format_dataframes(self):
+        """Format the tables in self._data once they've all been parsed. By default, this combines tables parsed from more than one file with _combine_tables, renames every table's samples with one map of Patient_IDs from _get_patient_id_map, formats each table individually with _format_table, reindexes the clinical dataframe with every sample in the dataset and fills in its Sample_Tumor_Normal column with _impute_sample_status, and then sorts the rows of every table. Child classes whose tables need other formatting across tables can override this.
+
+        Returns: None
+        """
+        self._data = self._combine_tables(self._data)
+        self._reformat_patient_ids(self._data)
+
+        for name in self._data.keys(): # Loop over the keys so we can alter the values without any issues
+            self._data[name] = self._format_table(name, self._data[name])
+
+        # Get a union of all dataframes' indices, with duplicates removed
+        # Exclude the followup dataframe because it has samples from a different cohort that aren't included anywhere else in the dataset
+        master_index = unionize_indices(self._data, exclude="followup")
+
+        # Use the master index to reindex the clinical dataframe, so the clinical dataframe has a record of every sample in the dataset. Rows that didn't exist before (such as the rows for normal samples) are filled with NaN.
+        clinical = self._data["clinical"]
+        clinical = clinical.reindex(master_index)
+        self._data["clinical"] = self._impute_sample_status(clinical)
+
+        # Call function from dataframe_tools.py to sort all tables first by sample status, and then by the index
+        self._data = sort_all_rows(self._data)
+
+        # Call function from dataframe_tools.py to standardize the names of the index and column axes
+        self._data = standardize_axes_names(self._data)
+
+    def _combine_tables(self, data):
+        """Combine tables that are parsed from more than one file, such as separate tumor and normal proteomics files, into the tables the dataset provides. This is called on all the parsed tables before they're formatted, or, if the dataset was loaded lazily, on the tables parsed together when one is requested, so it needs to handle the tables it combines not being there. By default, does nothing. Child classes can override this.
+
+        Parameters:
+        data (dict): The parsed tables. Keys are str of dataframe names, values are pandas.DataFrame
+
+        Returns:
+        dict: The tables, with any that go together combined.
+        """
+        return data
+
+    def _get_patient_id_map(self, patient_ids):
+        """Work out the reformatted Patient_IDs for samples in the parsed tables, for example to mark normal samples with ".N" like the other datasets. By default, the Patient_IDs are left as they are. Child classes can override this.
+
+        Parameters:
+        patient_ids (pandas.Index): The distinct Patient_IDs in the parsed tables, including the followup table, as they were parsed.
+
+        Returns:
+        pandas.Series: The new Patient_IDs, indexed by the old ones. None if they don't need reformatting.
+        """
+        return None
+
+    def _reformat_patient_ids(self, data):
+        """Rename the samples in parsed tables with the map from _get_patient_id_map, worked out once over all the tables' samples.
+
+        Parameters:
+        data (dict): The parsed tables. Keys are str of dataframe names, values are pandas.DataFrame. Edited in place.
+
+        Returns: None
+        """
+        # The followup dataframe's samples are included, since their Patient_IDs are formatted the same way as everything else's
+        id_map = self._get_patient_id_map(unionize_indices(data))
+        if id_map is not None:
+            apply_patient_id_map(data, id_map, unmapped_ok="followup")
+
+    def _format_table(self, name, df):
+        """Do the formatting for a single parsed table that doesn't depend on any other tables, such as reformatting its Patient_IDs. By default, does nothing. Child classes can override this.
+
+        Parameters:
+        name (str): The name of the table.
+        df (pandas.DataFrame): The table, as parsed by _parse_file.
+
+        Returns:
+        pandas.DataFrame: The formatted table.
+        """
+        return df
+
+    def _impute_sample_status(self, clinical):
+        """Fill in the Sample_Tumor_Normal column of the clinical dataframe for samples that weren't in the original clinical data. By default, does nothing. Child classes can override this.
+
+        Parameters:
+        clinical (pandas.DataFrame): The clinical dataframe, reindexed with all the samples in the dataset.
+
+        Returns:
+        pandas.DataFrame: The clinical dataframe with its Sample_Tumor_Normal column filled in.
+        """
+        return clinical
+
+    def _parse_unparsed_table(self, name):
+        """For a dataset that was loaded lazily, parse and format a table that hasn't been parsed yet, and add any samples it has that we haven't seen before to the clinical dataframe.
+
+        Parameters:
+        name (str): The name of the table to parse.
+
+        Returns: None
+        """
+        file_paths = self._unparsed_tables.pop(name)
+
+        # If the rest of the dataset came from the cache, this table will be there too, already formatted
+        if self._use_cache:
+            cached = load_cached_tables(self._cancer_type, self._version, names=[name])
+            if cached is not None:
+                self._data.update(cached)
+                self._compact_mutation_tables()
+                self._share_sample_index()
+                return
+
+        loading_msg = f"Loading {self.get_cancer_type()} v{self.version()} {name}..."
+        print(loading_msg, end='\r')
+
+        parsed = {}
+        for file_path in file_paths:
+            parsed.update(self._parse_file(file_path))
+
+        print(' ' * len(loading_msg), end='\r') # Erase the loading message
+
+        parsed = self._combine_tables(parsed)
+        self._reformat_patient_ids(parsed)
+
+        for table_name, df in parsed.items():
+            self._unparsed_tables.pop(table_name, None) # In case we got another table from the same file(s)
+            self._data[table_name] = self._format_table(table_name, df)
+
+        # Add any new samples to the clinical dataframe, so it keeps a record of every sample in the tables we've parsed
+        # Exclude the followup dataframe because it has samples from a different cohort that aren't included anywhere else in the dataset
+        clinical = self._data["clinical"]
+        parsed_index = unionize_indices({table_name: self._data[table_name] for table_name in parsed.keys()}, exclude="followup")
+        new_samples = parsed_index.difference(clinical.index)
+        if len(new_samples) > 0:
+            clinical = clinical.reindex(clinical.index.append(new_samples))
+            clinical = self._impute_sample_status(clinical)
+            clinical = sort_df_by_sample_status(clinical, clinical["Sample_Tumor_Normal"])
+            self._data["clinical"] = clinical
+
+        # Sort the new tables first by sample status, and then by the index, and standardize their axes names
+        sample_status_col = self._data["clinical"]["Sample_Tumor_Normal"]
+        for table_name in parsed.keys():
+            self._data[table_name] = sort_df_by_sample_status(self._data[table_name], sample_status_col)
+        self._data = standardize_axes_names(self._data)
+        self._compact_mutation_tables()
+        self._share_sample_index()
+
+    def _compact_mutation_tables(self):
+        """Store the mutation tables that have been parsed in a compact form. We do this after all the other formatting, so the rest of the formatting code doesn't have to handle them.
+
+        The somatic_mutation_binary table is stored as a sparse dataframe. Almost all its values are 0, so this takes a small fraction of the memory of the dense table.
+
+        The Gene and Mutation columns of the somatic_mutation table are stored as categoricals, with sorted categories. Most datasets already read them that way.
+
+        Returns: None
+        """
+        if "somatic_mutation_binary" in self._data.keys():
+            self._data["somatic_mutation_binary"] = sparsify_binary_table(self._data["somatic_mutation_binary"])
+
+        if "somatic_mutation" in self._data.keys():
+            somatic_mutation = self._data["somatic_mutation"]
+            to_encode = {col: "category" for col in ["Gene", "Mutation"] if col in somatic_mutation.columns and not isinstance(somatic_mutation[col].dtype, pd.CategoricalDtype)}
+            if len(to_encode) > 0:
+                self._data["somatic_mutation"] = somatic_mutation.astype(to_encode)
+
+    def _share_sample_index(self):
+        """Have all the parsed tables share the clinical dataframe's index, which has every sample in the dataset, so each Patient_ID string is only stored once. Tables with exactly the same samples, in the same order, get a view of the clinical index itself, which pandas recognizes as identical when aligning them. Other tables get an index built from the same string objects, which keeps memory down, and speeds up aligning tables by Patient_ID, since Python caches each string's hash. Each table's values are left alone.
+
+        Returns: None
+        """
+        samples = self._data["clinical"].index
+        if not samples.is_unique:
+            return
+        sample_values = samples.to_numpy(dtype=object)
+
+        for name, df in self._data.items():
+            if df.index is samples or df.index.is_(samples):
+                continue
+            elif df.index.equals(samples):
+                df.index = samples.view() # A view, so renaming one table's index doesn't rename them all
+            else:
+                codes = samples.get_indexer(df.index)
+                if (codes < 0).all():
+                    continue
+                shared = np.where(codes < 0, df.index.to_numpy(dtype=object), sample_values[codes]) # Samples that aren't in the clinical dataframe, e.g. in the followup dataframe, keep their own strings
+                df.index = pd.Index(shared, name=df.index.name)
+
+    def _get_dataframe(self, name, tissue_type="both", copy=True):
         """Check if a dataframe with the given name exists, and return a copy of it if it does.
 
         Parameters:
         name (str): The name of the dataframe to get.
         tissue_type (str): Acceptable values in ["tumor","normal","both"]. Specifies the desired tissue type desired in the dataframe. Defaults to "both".
+        copy (bool, optional): Whether to return a copy of the dataframe. If False and tissue_type is "both", returns the dataset's own dataframe, without taking the time and memory to copy it. In that case, it must not be modified, or the changes will show up everywhere else the dataframe is used. Default True.
 
         Returns:
-        pandas.DataFrame: A copy of the desired dataframe, if it exists in this dataset.
+        pandas.DataFrame: A copy of the desired dataframe, if it exists in this dataset, or the dataframe itself if copy is False.
         """
+        if name in self._unparsed_tables.keys(): # The dataset was loaded lazily, and this table hasn't been requested before
+            self._parse_unparsed_table(name)
+
         if name in self._data.keys():
             df = self._data[name]
-            return_df = df.copy(deep=True) # We copy it, with deep=True, so edits on their copy don't affect the master for this instance
-            return_df.index.name = df.index.name
-            return_df.columns.name = df.columns.name
-
-            if tissue_type == "tumor":
-                return self._tumor_only(return_df)
-            elif tissue_type == "normal":
-                return self._normal_only(return_df)
+
+            if tissue_type in ["tumor", "normal"]:
+                return df.take(self.sample_partitions(name)[tissue_type]) # Taking the rows makes a new dataframe, so we don't need to copy it first
             elif tissue_type == "both":
+                if not copy:
+                    return df
+                return_df = df.copy(deep=True) # We copy it, with deep=True, so edits on their copy don't affect the master for this instance
+                return_df.index.name = df.index.name
+                return_df.columns.name = df.columns.name
                 return return_df
             else:
                 raise InvalidParameterError(f"Unrecognized value for tissue_type parameter. You passed '{tissue_type}'. Valid options are 'tumor', 'normal', or 'both'.")
@@ -731,9 +1117,8 @@ class Dataset:
 
     def _get_sample_status_map(self):
         """Get a pandas Series from the clinical dataframe, with sample ids as the index, and each sample's status (tumor or normal) as the values."""
-        clinical = self.get_clinical()
-        status_map = clinical["Sample_Tumor_Normal"]
-        status_map.name = "Sample_Status"
+        clinical = self._get_dataframe("clinical", copy=False)
+        status_map = clinical["Sample_Tumor_Normal"].rename("Sample_Status")
         return status_map
 
     def _check_df_valid(self, df_name, df_type):
@@ -755,12 +1140,12 @@ class Dataset:
         else:
             raise CptacDevError(f"Invalid df_type of {df_type} passed to cptac.Dataset._check_df_valid.")
 
-        if df_name not in self._data.keys():
+        if df_name not in self._data.keys() and df_name not in self._unparsed_tables.keys():
             raise DataFrameNotIncludedError(f"{df_name} dataframe not included in the {self.get_cancer_type()} dataset.")
         elif df_name not in valid_dfs:
             error_msg = f"{df_name} is not a valid {df_type} dataframe for this function in this dataset. Valid options:"
             for valid_name in valid_dfs:
-                if valid_name in self._data.keys(): # Only print it if it's included in this dataset
+                if valid_name in self._data.keys() or valid_name in self._unparsed_tables.keys(): # Only print it if it's included in this dataset
                     error_msg = error_msg + '\n\t' + valid_name
             raise InvalidParameterError(error_msg)
 
@@ -809,8 +1194,8 @@ class Dataset:
         # Check that they passed a valid omics df
         self._check_df_valid(omics_df_name, "omics")
 
-        # Get our omics df, using _get_dataframe to catch invalid requests
-        omics_df = self._get_dataframe(omics_df_name, tissue_type)
+        # Get our omics df, using _get_dataframe to catch invalid requests. We only select from it, so we don't need our own copy.
+        omics_df = self._get_dataframe(omics_df_name, tissue_type, copy=False)
 
         # Process genes parameter
         if isinstance(genes, str): # If it's a single gene, make it a list so we can treat everything the same
@@ -820,29 +1205,33 @@ class Dataset:
         elif genes is None: # If it's the default of None, rename columns and return the entire dataframe
             # Add the gene name to end beginning of each column header, to preserve info when we join dataframes.
             if isinstance(omics_df.columns, pd.MultiIndex):
+                omics_df = omics_df.copy(deep=True) # Since we're returning the whole thing, copy it before renaming the columns
                 omics_df.columns = omics_df.columns.set_levels(omics_df.columns.levels[0] + '_' + omics_df_name, level=0)
             else:
-                omics_df = omics_df.add_suffix('_' + omics_df_name)
+                omics_df = omics_df.add_suffix('_' + omics_df_name) # This returns a copy
+            if omics_df_name == "somatic_mutation_binary":
+                omics_df = omics_df.sparse.to_dense() # It's stored sparse, but we give back regular columns, so they join like any other table's
             return omics_df
         else: # If it's none of those, they done messed up. Tell 'em.
             raise InvalidParameterError("Genes parameter \n{}\nis of invalid type {}. Valid types: str, list or array-like of str, or NoneType.".format(genes, type(genes)))
 
         genes = pd.Index(genes, name="Name")
 
-        if isinstance(omics_df.columns, pd.MultiIndex):
-            contained = genes.intersection(omics_df.columns.get_level_values("Name")).drop_duplicates() # Get the genes that actually exist in the dataframe's columns
-            mi_contained = omics_df.columns[omics_df.columns.get_level_values("Name").isin(genes)]
+        # Look up the positions of the columns for the genes that actually exist in the dataframe
+        col_positions, found = self._get_gene_column_positions(omics_df_name, genes)
+        contained = genes[found].drop_duplicates()
+        not_contained = genes.difference(contained).drop_duplicates() # So we can warn the user later
+
+        selected = omics_df.iloc[:, col_positions]
+        if omics_df_name == "somatic_mutation_binary":
+            selected = selected.sparse.to_dense() # It's stored sparse, but we give back regular columns, so they join like any other table's
 
-            not_contained = genes.difference(contained).drop_duplicates() # So we can warn the user later
+        if isinstance(omics_df.columns, pd.MultiIndex):
             arrays = [not_contained] + [[np.nan] for i in range(omics_df.columns.nlevels - 1)]
             mi_not_contained = pd.MultiIndex.from_product(arrays, names=omics_df.columns.names)
 
-            genes = mi_contained.union(mi_not_contained) # To use for reindexing the dataframe
-        else:
-            contained = genes.intersection(omics_df.columns).drop_duplicates() # Get the genes that actually exist in the dataframe's columns
-            not_contained = genes.difference(contained).drop_duplicates() # So we can warn the user later
+            genes = selected.columns.union(mi_not_contained) # To use for reindexing the dataframe
 
-        selected = omics_df[contained]
         selected = selected.reindex(columns=genes) # This will add the columns not included in the dataframe, and fill them with NaN.
 
         # Warn the user about columns filled with NaN
@@ -851,6 +1240,8 @@ class Dataset:
 
         # Append dataframe name to end of each column header, to preserve info when we merge dataframes
         if isinstance(omics_df.columns, pd.MultiIndex):
+            if len(selected.columns) > 0: # set_levels can't handle empty levels
+                selected.columns = selected.columns.remove_unused_levels() # Otherwise the levels still have every gene in the whole dataframe, and we'd rename them all
             selected.columns = selected.columns.set_levels(selected.columns.levels[0] + '_' + omics_df_name, level=0)
         else:
             selected = selected.add_suffix('_' + omics_df_name)
@@ -858,6 +1249,132 @@ class Dataset:
         selected.columns.name = "Name"
         return selected
 
+    def _get_gene_columns(self, name, gene_prefixes=False):
+        """Get an index of where each gene's columns are in an omics table. The positions for all of a gene's columns are stored together, CSR style: the positions for the gene at position i in the gene index are positions[offsets[i]:offsets[i + 1]]. This is built the first time it's needed for each table, and reused until the table is replaced.
+
+        Parameters:
+        name (str): The name of the table. Must already be parsed.
+        gene_prefixes (bool, optional): Whether to take each column's gene from the part of its name before the first underscore, as in the somatic_mutation_binary table, where columns are named with a gene and a location. Otherwise the whole name is used. Default False.
+
+        Returns:
+        pandas.Index: The unique genes in the table's columns.
+        numpy.ndarray: The offsets of each gene's positions.
+        numpy.ndarray: The column positions, grouped by gene. Within each gene, they're in the same order as in the table.
+        """
+        df = self._data[name]
+        cached = self._gene_columns.get((name, gene_prefixes))
+        if cached is not None and cached[0] is df:
+            return cached[1:]
+
+        if isinstance(df.columns, pd.MultiIndex):
+            col_genes = df.columns.get_level_values("Name")
+        else:
+            col_genes = df.columns
+
+        if gene_prefixes:
+            col_genes = col_genes.str.split("_", n=1).str[0]
+
+        codes, gene_index = pd.factorize(col_genes) # Columns with no gene name get a code of -1
+        offsets, positions = self._group_positions(codes, len(gene_index))
+
+        self._gene_columns[(name, gene_prefixes)] = (df, gene_index, offsets, positions)
+        return gene_index, offsets, positions
+
+    def _get_gene_mutation_rows(self):
+        """Get an index of where each gene's rows are in the somatic_mutation table, CSR style like _get_gene_columns: the positions for the gene at position i in the gene index are positions[offsets[i]:offsets[i + 1]]. This is built the first time it's needed, and reused until the table is replaced.
+
+        Returns:
+        pandas.Index: The genes in the table's Gene column. Genes with no rows may be included, with empty slices.
+        numpy.ndarray: The offsets of each gene's positions.
+        numpy.ndarray: The row positions, grouped by gene. Within each gene, they're in the same order as in the table.
+        """
+        df = self._get_dataframe("somatic_mutation", copy=False)
+        cached = self._gene_mutation_rows
+        if cached is not None and cached[0] is df:
+            return cached[1:]
+
+        row_genes = df["Gene"]
+        if isinstance(row_genes.dtype, pd.CategoricalDtype): # The genes are already encoded, so we can use their codes without hashing anything
+            codes = row_genes.cat.codes.to_numpy()
+            gene_index = pd.Index(row_genes.cat.categories)
+        else:
+            codes, gene_index = pd.factorize(row_genes)
+        offsets, positions = self._group_positions(codes, len(gene_index))
+
+        self._gene_mutation_rows = (df, gene_index, offsets, positions)
+        return gene_index, offsets, positions
+
+    def _group_positions(self, codes, num_groups):
+        """Group positions by their codes, CSR style, for _get_gene_columns and _get_gene_mutation_rows.
+
+        Parameters:
+        codes (numpy.ndarray of int): The group code of each position. Positions with a code of -1 are left out.
+        num_groups (int): The number of groups.
+
+        Returns:
+        numpy.ndarray: The offsets of each group's positions.
+        numpy.ndarray: The positions, grouped by code. Within each group, they're in order.
+        """
+        order = np.argsort(codes, kind="stable") # Stable, so each group's positions stay in order
+        num_ungrouped = np.count_nonzero(codes < 0)
+        positions = order[num_ungrouped:] # The positions with no group sort to the front, so this drops them
+        counts = np.bincount(codes[codes >= 0], minlength=num_groups)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        return offsets, positions
+
+    def _get_gene_column_positions(self, name, genes):
+        """Get the positions of all the columns for some genes in an omics table.
+
+        Parameters:
+        name (str): The name of the table. Must already be parsed.
+        genes (pandas.Index): The genes to get the columns for.
+
+        Returns:
+        numpy.ndarray: The positions of the columns for all the genes that are in the table, in the same order as in the table.
+        numpy.ndarray: Boolean array saying which of the genes are in the table.
+        """
+        gene_index, offsets, positions = self._get_gene_columns(name)
+        return self._gather_gene_positions(gene_index, offsets, positions, genes)
+
+    def _get_gene_mutation_positions(self, genes):
+        """Get the positions of all the rows for some genes in the somatic_mutation table.
+
+        Parameters:
+        genes (pandas.Index): The genes to get the rows for.
+
+        Returns:
+        numpy.ndarray: The positions of the rows for all the genes that are in the table, in the same order as in the table.
+        numpy.ndarray: Boolean array saying which of the genes have any rows in the table.
+        """
+        gene_index, offsets, positions = self._get_gene_mutation_rows()
+        return self._gather_gene_positions(gene_index, offsets, positions, genes)
+
+    def _gather_gene_positions(self, gene_index, offsets, positions, genes):
+        """Gather the positions for some genes from a CSR style gene index, like the ones from _get_gene_columns and _get_gene_mutation_rows.
+
+        Parameters:
+        gene_index (pandas.Index): The genes in the index.
+        offsets (numpy.ndarray): The offsets of each gene's positions.
+        positions (numpy.ndarray): The positions, grouped by gene.
+        genes (pandas.Index): The genes to get the positions for.
+
+        Returns:
+        numpy.ndarray: The positions for all the genes that were found, sorted.
+        numpy.ndarray: Boolean array saying which of the genes have any positions.
+        """
+        gene_codes = gene_index.get_indexer(genes)
+        found = gene_codes >= 0
+        found[found] = offsets[gene_codes[found] + 1] > offsets[gene_codes[found]] # A gene can be in the index with no positions, e.g. an unused category
+        found_codes = np.unique(gene_codes[found])
+
+        # Gather each found gene's slice of positions in one go
+        starts = offsets[found_codes]
+        lengths = offsets[found_codes + 1] - starts
+        slice_starts = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        gene_positions = np.sort(positions[slice_starts + np.arange(lengths.sum())])
+
+        return gene_positions, found
+
     def _get_metadata_cols(self, df_name, cols, tissue_type="both"):
         """Select a single column or several columns from a metadata dataframe.
 
@@ -872,16 +1389,16 @@ class Dataset:
         # Check that they passed a valid metadata df
         self._check_df_valid(df_name, "metadata")
 
-        # Get our dataframe, using _get_dataframe to catch invalid requests
-        df = self._get_dataframe(df_name, tissue_type)
+        # Get our dataframe, using _get_dataframe to catch invalid requests. We only select from it, so we don't need our own copy.
+        df = self._get_dataframe(df_name, tissue_type, copy=False)
 
         # Process genes parameter
         if isinstance(cols, str): # If it's a single column, make it a list so we can treat everything the same
             cols = [cols]
         elif isinstance(cols, (list, pd.Series, pd.Index)): # If it's already a list or array-like, we're all good
             pass
-        elif cols is None: # If it's the default of None, return the entire dataframe
-            return df
+        elif cols is None: # If it's the default of None, return a copy of the entire dataframe
+            return df.copy(deep=True)
         else: # If it's none of those, they done messed up. Tell 'em.
             raise InvalidParameterError("Columns parameter {} is of invalid type {}. Valid types: str, or list or array-like of str.".format(cols, type(cols)))
 
@@ -895,17 +1412,18 @@ class Dataset:
         selected = df[cols]
         return selected
 
-    def _get_genes_mutations(self, genes, mutations_filter):
+    def _get_genes_mutations(self, genes, mutations_filter, long_format=False):
         """Gets all the mutations for one or multiple genes, for all patients.
 
         Parameters:
         genes (str, or list or array-like of str): The gene(s) to grab mutations for. str if one, list or array-like of str if multiple.
         mutations_filter (list, optional): List of mutations to prioritize when filtering out multiple mutations, in order of priority. If none of the multiple mutations in a sample are included in mutations_filter, the function will automatically prioritize truncation over missense mutations, and then mutations earlier in the sequence over later mutations. Passing an empty list will cause this default hierarchy to be applied to all samples. Passing None will cause no filtering to be done, and all mutation data will be included, in a list.
+        long_format (bool, optional): Whether to return one row for each mutation, with a categorical Gene column, instead of one row for each sample with columns for each gene. Only samples with mutations in the genes are included. Default is False.
 
         Returns:
         pandas.DataFrame: The mutations in each patient for the specified gene(s).
         """
-        somatic_mutation = self.get_somatic_mutation()
+        somatic_mutation = self._get_dataframe("somatic_mutation", copy=False)
 
         # Process genes parameter
         if isinstance(genes, str): # If it's a single gene, make it a list so we can treat everything the same
@@ -928,66 +1446,93 @@ class Dataset:
                 if (filter_val not in somatic_mutation[mutation_col].values) and (filter_val not in somatic_mutation[location_col].values):
                     raise InvalidParameterError(f"Filter value {filter_val} does not exist in the mutations dataframe for this dataset. Check for typos and existence. Merge aborted.")
 
-        # Create an empty dataframe, which we'll fill with the columns we select using our genes, and then return.
-        df = pd.DataFrame(index=somatic_mutation.index.copy().drop_duplicates())
-        genes = pd.Series(genes).drop_duplicates()
-        for gene in genes:
-            gene_mutations = somatic_mutation[somatic_mutation[gene_col] == gene] # Get all the mutations for that gene
-            if len(gene_mutations) == 0: # If the gene doesn't match any genes in the dataframe, tell them
+        # Get the mutations for all the genes at once. Each row gets the position of its gene in our genes list, and the position of its sample among all the samples in the table.
+        genes = pd.Index(genes).drop_duplicates()
+        samples = somatic_mutation.index.drop_duplicates()
+        gene_mutations = somatic_mutation.iloc[self._get_gene_mutation_positions(genes)[0]] # Slices of the table's gene index, instead of checking every row's gene
+        gene_positions = genes.get_indexer(gene_mutations[gene_col])
+        sample_codes = samples.get_indexer(gene_mutations.index)
+        mutations = np.asarray(gene_mutations[mutation_col], dtype=object)
+        locations = np.asarray(gene_mutations[location_col], dtype=object)
+
+        # Sort the rows by gene and then sample. The sort is stable, so each sample's mutations for a gene stay in the same order as in the table.
+        order = np.lexsort((sample_codes, gene_positions))
+        group_keys = gene_positions[order] * len(samples) + sample_codes[order]
+        group_starts = np.flatnonzero(np.diff(group_keys, prepend=-1))
+        group_ends = np.append(group_starts[1:], len(order)) if len(group_starts) > 0 else group_starts
+        group_genes = gene_positions[order][group_starts]
+        group_samples = samples[sample_codes[order][group_starts]]
+
+        # The index starts with every sample in the somatic_mutation dataframe. Joining each gene's mutations to it used to sort it, unless the gene had mutations for every sample, so we do the same.
+        sample_index = samples
+        genes_found = np.bincount(group_genes, minlength=len(genes))
+        for i, gene in enumerate(genes):
+            if genes_found[i] == 0: # If the gene doesn't match any genes in the dataframe, tell them
                 raise InvalidParameterError("{} gene not found in somatic_mutation data.".format(gene))
-            gene_mutations = gene_mutations.drop(columns=[gene_col]) # Gene column is same for every sample, so we don't need it anymore.
 
             # Check whether all filter values exist for this particular gene. If not, that's fine, we just want to warn the user.
             if mutations_filter is not None:
+                gene_rows = gene_positions == i
                 for filter_val in mutations_filter:
-                    if (filter_val not in gene_mutations[mutation_col].values) and (filter_val not in gene_mutations[location_col].values):
+                    if (filter_val not in mutations[gene_rows]) and (filter_val not in locations[gene_rows]):
                         warnings.warn(f"Filter value {filter_val} does not exist in the mutations data for the {gene} gene, though it exists for other genes.", ParameterWarning, stacklevel=3)
 
-            # Create another empty dataframe, which we'll fill with the mutation and location data for this gene, as lists
-            prep_index = gene_mutations.index.copy().drop_duplicates()
-            prep_columns = gene_mutations.columns.copy()
-            mutation_status_idx = pd.Index([mutation_status_col]) # Prep mutation_status_col to be joined
-            prep_cols_with_mut_status = prep_columns.append(mutation_status_idx) # Add a mutation_status column, which will indicate if there are 1 or multiple mutations
-            mutation_lists = pd.DataFrame(index=prep_index, columns=prep_cols_with_mut_status)
-
-            # Get the mutation(s), mutation status, and location information for this gene and sample
-            # Yes, I know I'm doing that horrible thing, using nested for loops to work with dataframes. However, I tried refactoring it to use DataFrame.groupby and DataFrame.apply, and both actually made it slower. Go figure.
-            for sample in mutation_lists.index:
-                sample_data = gene_mutations.loc[sample] # Get slice of dataframe for the sample
-                sample_mutations = sample_data[mutation_col] # Get mutation(s)
-                sample_locations = sample_data[location_col] # Get location(s)
-
-                # Make the mutations a list (even if there's only one)
-                if isinstance(sample_mutations, pd.Series):
-                    sample_mutations_list = sample_mutations.tolist()
-                else:
-                    sample_mutations_list = [sample_mutations]
-
-                # Make the locations a list (even if there's only one)
-                if isinstance(sample_locations, pd.Series):
-                    sample_locations_list = sample_locations.tolist()
-                else:
-                    sample_locations_list = [sample_locations]
+            gene_samples = group_samples[group_genes == i]
+            if not gene_samples.equals(sample_index):
+                sample_index = sample_index.union(gene_samples)
 
-                # Figure out what our mutation status is (either single_mutation or multiple_mutation)
-                if len(sample_mutations_list) > 1:
-                    sample_mutation_status = "Multiple_mutation"
-                else:
-                    sample_mutation_status = "Single_mutation"
+        group_statuses = np.where(group_ends - group_starts > 1, "Multiple_mutation", "Single_mutation").astype(object)
+        group_ids = np.repeat(np.arange(len(group_starts)), group_ends - group_starts)
+        if mutations_filter is not None: # Filter multiple mutations down to just one
+            chosen = order[self._filter_multiple_mutations(mutations_filter, mutations[order], locations[order], group_ids)]
 
-                if mutations_filter is not None: # Filter multiple mutations down to just one
-                    chosen_mutation, chosen_location = self._filter_multiple_mutations(mutations_filter, sample_mutations_list, sample_locations_list)
-                    mutation_lists.at[sample, mutation_col] = chosen_mutation
-                    mutation_lists.at[sample, location_col] = chosen_location
-                else: # Include all the mutations!
-                    mutation_lists.at[sample, mutation_col] = sample_mutations_list
-                    mutation_lists.at[sample, location_col] = sample_locations_list
+        if long_format: # One row for each mutation, or for each chosen mutation if we filtered, so no lists needed
+            if mutations_filter is not None:
+                rows = chosen
+                group_ids = np.arange(len(group_starts))
+            else:
+                rows = order
+
+            df = pd.DataFrame({
+                gene_col: pd.Categorical.from_codes(group_genes[group_ids], categories=genes),
+                mutation_col: mutations[rows],
+                location_col: locations[rows],
+                mutation_status_col: group_statuses[group_ids],
+            }, index=gene_mutations.index[rows])
+            df.columns.name = "Name"
+            return df
 
-                # Also add the mutations status column
-                mutation_lists.at[sample, mutation_status_col] = sample_mutation_status
+        # Fill in the mutation(s), location(s), and mutation status for each gene and sample
+        prep_columns = [col for col in somatic_mutation.columns if col != gene_col] + [mutation_status_col] # Gene column is same for every sample, so we don't need it. Add a mutation_status column, which will indicate if there are 1 or multiple mutations.
+        num_cols = len(prep_columns)
+        values = [np.full(len(sample_index), np.nan, dtype=object) for i in range(len(genes) * num_cols)]
+        group_rows = sample_index.get_indexer(group_samples)
+        mutation_col_pos = prep_columns.index(mutation_col)
+        location_col_pos = prep_columns.index(location_col)
+        status_col_pos = prep_columns.index(mutation_status_col)
 
-            mutation_lists = mutation_lists.add_prefix(gene + '_') # Add the gene name to end beginning of each column header, to preserve info when we join dataframes.
-            df = df.join(mutation_lists, how='outer') # Append the columns to our dataframe we'll return.
+        if mutations_filter is not None:
+            group_mutations = mutations[chosen]
+            group_locations = locations[chosen]
+        else: # Include all the mutations!
+            group_mutations = np.empty(len(group_starts), dtype=object)
+            group_locations = np.empty(len(group_starts), dtype=object)
+            for i, (start, end) in enumerate(zip(group_starts, group_ends)):
+                group_mutations[i] = mutations[order[start:end]].tolist()
+                group_locations[i] = locations[order[start:end]].tolist()
+
+        for i in range(len(genes)):
+            in_gene = group_genes == i
+            gene_cols = i * num_cols
+            values[gene_cols + mutation_col_pos][group_rows[in_gene]] = group_mutations[in_gene]
+            values[gene_cols + location_col_pos][group_rows[in_gene]] = group_locations[in_gene]
+            values[gene_cols + status_col_pos][group_rows[in_gene]] = group_statuses[in_gene]
+
+        # Add the gene name to end beginning of each column header, to preserve info when we join dataframes.
+        columns = [gene + '_' + col for gene in genes for col in prep_columns]
+        df = pd.DataFrame(dict(zip(range(len(values)), values)), index=sample_index)
+        df.columns = pd.Index(columns, dtype=object)
+        if len(genes) > 0:
             df.columns.name = "Name"
 
         return df
@@ -1014,34 +1559,25 @@ class Dataset:
         joined = join_col_to_dataframe(joined, sample_status_map)
         joined.columns.name = "Name" # This attribute gets lost in the join above
 
-        # Set our fill values
-        wildtype_normal_fill = "Wildtype_Normal"
-        wildtype_tumor_fill = "Wildtype_Tumor"
-        no_mutation_fill = "No_mutation"
+        # Set our fill values for each row, based on its sample status. Rows with no sample status don't get filled.
+        sample_statuses = sample_status_map.reindex(joined.index)
+        wildtype_fills = np.asarray(sample_statuses.map({"Normal": "Wildtype_Normal", "Tumor": "Wildtype_Tumor"}), dtype=object)
+        no_mutation_fills = np.full(len(joined.index), np.nan, dtype=object)
+        no_mutation_fills[pd.notnull(sample_statuses).to_numpy()] = "No_mutation"
 
         # Fill in Wildtype_Normal or Wildtype_Tumor for NaN values (i.e., no mutation data for that sample) in joined dataframe mutation columns
         mutation_regex = r'^.*_Mutation$' # Construct regex to find all mutation columns
         mutation_cols = joined.columns[joined.columns.get_level_values("Name").str.match(mutation_regex)] # Get a list of all mutation columns
+        num_filled = self._fill_mutation_cols(joined, mutation_cols, wildtype_fills, wrap_in_lists=not mutations_were_filtered) # If we didn't filter mutations, encapsulate the fill values in lists, to match the other values in the column
 
         fill_log = [] # We're going to keep track of value filling, and let the user know we did it.
-        for mutation_col in mutation_cols:
-
-            # Log how many values we're going to fill for this gene
-            num_filled = (((sample_status_map == "Normal") | (sample_status_map == "Tumor")) & (pd.isnull(joined[mutation_col]))).sum() # See how many values we'll fill by using sum to get number of "True" in array
-            if num_filled > 0:
+        for mutation_col, col_num_filled in zip(mutation_cols, num_filled):
+            if col_num_filled > 0:
                 if isinstance(mutation_col, tuple):
                     gene = mutation_col[0].rsplit("_", maxsplit=1)[0]
                 else:
                     gene = mutation_col.rsplit("_", maxsplit=1)[0]
-                fill_log.append(f"{num_filled} samples for the {gene} gene")
-
-            # Impute values
-            joined.loc[(sample_status_map == "Normal") & (pd.isnull(joined[mutation_col])), mutation_col] = wildtype_normal_fill # Change all NaN mutation values for Normal samples to Wildtype_Normal.
-            joined.loc[(sample_status_map == "Tumor") & (pd.isnull(joined[mutation_col])), mutation_col] = wildtype_tumor_fill # Change all NaN mutation values for Tumor samples to Wildtype_Tumor
-
-            # If we didn't filter mutations, encapsulate the fill values in lists, to match the other values in the column
-            if not mutations_were_filtered:
-                joined[mutation_col] = joined[mutation_col].apply(lambda x: x if isinstance(x, list) else [x])
+                fill_log.append(f"{col_num_filled} samples for the {gene} gene")
 
         if len(fill_log) > 0 and not quiet:
             warnings.warn(f"In joining the somatic_mutation table, no mutations were found for the following samples, so they were filled with Wildtype_Tumor or Wildtype_Normal: {', '.join(fill_log)}", FilledMutationDataWarning, stacklevel=3)
@@ -1049,40 +1585,164 @@ class Dataset:
         # Depending on show_location, either fill NaN values in the joined dataframe location columns with "No_mutation", or just drop the location columns altogether
         location_regex = r'^.*_Location$' # Construct regex to find all location columns
         location_cols = joined.columns[joined.columns.get_level_values("Name").str.match(location_regex)] # Get a list of all location columns
-        for location_col in location_cols:
-            if show_location: # If we're including the location column, fill NaN with "No_mutation", since that's what it means, so things are clearer to the user.
-
-                # Make sure Sample Status is not NaN, though--if it is, we have no mutation data at all for that sample, so we can't say "No_mutation". It must have been a sample that was in the other dataframe, but not the mutations.
-                joined.loc[(pd.isnull(joined[location_col])) & (pd.notnull(sample_status_map)), location_col] = no_mutation_fill 
-                
-                # If we didn't filter mutations, encapsulate the fill values in lists, to match the other values in the column
-                if not mutations_were_filtered:
-                    joined[location_col] = joined[location_col].apply(lambda x: x if isinstance(x, list) else [x])
-            else:
-                joined = joined.drop(columns=[location_col]) # Drop the location column, if the caller wanted us to.
+        if show_location: # If we're including the location column, fill NaN with "No_mutation", since that's what it means, so things are clearer to the user. We don't fill samples with no sample status, since we have no mutation data at all for them.
+            self._fill_mutation_cols(joined, location_cols, no_mutation_fills, wrap_in_lists=not mutations_were_filtered)
+        else:
+            joined = joined.drop(columns=location_cols) # Drop the location columns, if the caller wanted us to.
 
         # Fill NaN values in Mutation_Status column with either Wildtype_Tumor or Wildtype_Normal
         mutation_status_regex = r"^.*_Mutation_Status$" # Construct a regex to find all Mutation_Status columns
         mutation_status_cols = joined.columns[joined.columns.get_level_values("Name").str.match(mutation_status_regex)] # Get a list of all Mutation_Status columns
-        for mutation_status_col in mutation_status_cols:
-            joined.loc[(sample_status_map == "Normal") & (pd.isnull(joined[mutation_status_col])), mutation_status_col] = "Wildtype_Normal" # Change all NaN mutation status values for Normal samples to Wildtype_Normal
-            joined.loc[(sample_status_map == "Tumor") & (pd.isnull(joined[mutation_status_col])), mutation_status_col] = "Wildtype_Tumor" # Change all NaN mutation status values for Tumor samples to Wildtype_Tumor
+        self._fill_mutation_cols(joined, mutation_status_cols, wildtype_fills, wrap_in_lists=False)
 
         return joined
 
-    def _filter_multiple_mutations(self, mutations_filter, sample_mutations_list, sample_locations_list):
-        """Based on a mutations filter, choose one mutation and its location from two lists of mutations and locations.
+    def _fill_mutation_cols(self, joined, cols, fills, wrap_in_lists):
+        """Fill the NaNs in several columns of a joined dataframe at once, in place, with a fill value for each row.
 
         Parameters:
-        mutations_filter (list of str): A list of mutations to prioritize, in order of priority. Passing an empty list will cause truncations to be chosen over missense, and mutations earlier in the sequence over later ones.
-        sample_mutations_list (list of str): The mutations to filter.
-        sample_locations_list (list of str): The locations to filter, in the same order as the mutations.
+        joined (pandas.DataFrame): The dataframe to fill.
+        cols (pandas.Index): The columns to fill.
+        fills (numpy.ndarray): The fill value for each row. Rows where it's NaN aren't filled.
+        wrap_in_lists (bool): Whether to put each filled value, and any values left NaN, in a list, to match the lists of mutations or locations in the rest of the column.
+
+        Returns:
+        numpy.ndarray of int: The number of values filled in each column.
+        """
+        if len(cols) == 0:
+            return np.zeros(0, dtype=int)
+
+        values = joined[cols].to_numpy(dtype=object, copy=True)
+        is_null = pd.isnull(values)
+        to_fill = is_null & pd.notnull(fills)[:, np.newaxis]
+        values[to_fill] = np.broadcast_to(fills[:, np.newaxis], values.shape)[to_fill]
+
+        if wrap_in_lists:
+            values[is_null] = np.frompyfunc(lambda value: [value], 1, 1)(values[is_null])
+
+        joined[cols] = values
+        return to_fill.sum(axis=0)
+
+    def _join_mutations_long(self, other, mutations, show_location, fill, quiet):
+        """Join mutations data in long format to other data with one row for each sample, repeating each sample's row once for each of its mutations in each gene. Each gene without mutations in a sample gets a single row, filled with Wildtype_Normal or Wildtype_Tumor if fill is True.
+
+        Parameters:
+        other (pandas.DataFrame): The other data to join the mutations to, already joined and sorted. Its rows decide which samples are included, and in what order.
+        mutations (pandas.DataFrame): The selected mutations data in long format, from _get_genes_mutations.
+        show_location (bool): Whether to include the Location column from the mutation dataframe.
+        fill (bool): Whether to fill the rows for genes without mutations, and add a Sample_Status column. If False, they're left NaN.
+        quiet (bool): Whether to show warning when filling in rows with no mutation data with "Wildtype_Tumor" or "Wildtype_Normal"
+
+        Returns:
+        pandas.DataFrame: The joined dataframe, with one row for each mutation, and Gene, Mutation, Location, and Mutation_Status columns as categoricals.
+        """
+        if not other.index.is_unique:
+            raise InvalidParameterError("The joined data has duplicate samples, so the mutations can't be joined in long format. Pass long_format=False to join them with lists instead.")
+
+        # Each sample and gene pair gets a cell number. Samples can have several mutations in a cell, so we sort the mutations' cells together with the empty cells, keeping the mutations in each cell in their original order.
+        gene_col = "Gene"
+        mutation_cols = ["Mutation", "Location", "Mutation_Status"]
+        genes = mutations[gene_col].cat.categories
+        sample_rows = other.index.get_indexer(mutations.index)
+        mutations = mutations[sample_rows != -1]
+        mutation_cells = sample_rows[sample_rows != -1] * len(genes) + mutations[gene_col].cat.codes.to_numpy()
+        empty_cells = np.setdiff1d(np.arange(len(other.index) * len(genes)), mutation_cells)
+        cells = np.concatenate([mutation_cells, empty_cells])
+        order = np.argsort(cells, kind="stable")
+        cells = cells[order]
+        sample_rows = cells // len(genes)
+        is_empty = order >= len(mutation_cells)
+
+        gene_codes = cells % len(genes)
+        values = {gene_col: pd.Categorical.from_codes(gene_codes, categories=genes)}
+        for col in mutation_cols:
+            values[col] = np.concatenate([mutations[col].to_numpy(dtype=object), np.full(len(empty_cells), np.nan, dtype=object)])[order]
+        mutations_long = pd.DataFrame(values)
+
+        if fill:
+            # Set our fill values for each row, based on its sample status, the same way _join_other_to_mutations does. Only the rows for genes without mutations are filled, so a mutation with no location keeps its NaN. Rows with no sample status don't get filled.
+            sample_statuses = self._get_sample_status_map().reindex(other.index).take(sample_rows)
+            wildtype_fills = np.asarray(sample_statuses.map({"Normal": "Wildtype_Normal", "Tumor": "Wildtype_Tumor"}), dtype=object)
+            wildtype_fills[~is_empty] = np.nan
+            no_mutation_fills = np.full(len(wildtype_fills), np.nan, dtype=object)
+            no_mutation_fills[pd.notnull(wildtype_fills)] = "No_mutation"
+
+            self._fill_mutation_cols(mutations_long, pd.Index(["Mutation", "Mutation_Status"]), wildtype_fills, wrap_in_lists=False)
+            self._fill_mutation_cols(mutations_long, pd.Index(["Location"]), no_mutation_fills, wrap_in_lists=False)
+
+            num_filled = np.bincount(gene_codes[pd.notnull(wildtype_fills)], minlength=len(genes))
+            fill_log = [f"{gene_num_filled} samples for the {gene} gene" for gene, gene_num_filled in zip(genes, num_filled) if gene_num_filled > 0] # We're going to keep track of value filling, and let the user know we did it.
+            if len(fill_log) > 0 and not quiet:
+                warnings.warn(f"In joining the somatic_mutation table, no mutations were found for the following samples, so they were filled with Wildtype_Tumor or Wildtype_Normal: {', '.join(fill_log)}", FilledMutationDataWarning, stacklevel=3)
+
+        if not show_location:
+            mutations_long = mutations_long.drop(columns="Location")
+        for col in mutation_cols:
+            if col in mutations_long.columns:
+                mutations_long[col] = pd.Categorical(mutations_long[col]) # Each category is only stored once, so the mutations take up space for each mutation, not for each Python object
+
+        mutations_long.columns.name = "Name"
+        if fill:
+            mutations_long["Sample_Status"] = sample_statuses.to_numpy()
+        if mutations_long.columns.nlevels != other.columns.nlevels:
+            mutations_long.columns = add_index_levels(to=mutations_long.columns, source=other.columns)
+
+        joined = pd.concat([other.iloc[sample_rows].reset_index(drop=True), mutations_long], axis=1)
+        joined.index = other.index[sample_rows]
+        joined.columns.name = "Name" # This attribute gets lost in the concat above
+
+        return joined
+
+    def _get_genotype_filter(self):
+        """Get the default list of mutations to prioritize in genotype functions, in order of priority, based on the cancer type. Deletions and amplifications from the CNV data are included.
 
         Returns:
-        str: The chosen mutation
-        str: The chosen location
+        list of str: The mutations to prioritize.
+        """
+        if self.get_cancer_type() == "colon":
+            return ["Deletion", #deletion
+                'frameshift deletion', 'frameshift insertion', 'frameshift substitution', 'stopgain', 'stoploss', #truncation
+                'Missense_Mutation_hotspot',
+                'nonframeshift deletion', 'nonframeshift insertion', 'nonframeshift substitution', 'nonsynonymous SNV', #missense
+                'Amplification',
+                'Wildtype']
+
+        elif self.get_cancer_type() == "hnscc":
+            return ["Deletion", #deletion
+                'Frame_Shift_Del', 'Frame_Shift_Ins', 'Nonsense_Mutation', 'Nonstop_Mutation', #truncation
+                'Missense_Mutation_hotspot',
+                'Missense_Mutation',
+                'Amplification',
+                'In_Frame_Del', 'In_Frame_Ins', 'Splice_Site' #inframe changes
+                'Silent','Wildtype']
+
+        elif self.get_cancer_type() == "gbm":
+            return ["Deletion", #deletion
+                'Frame_Shift_Del', 'Frame_Shift_Ins', 'Nonsense_Mutation', 'Nonstop_Mutation', #truncation
+                'Missense_Mutation_hotspot',
+                'Missense_Mutation',
+                'Amplification',
+                'In_Frame_Del', 'In_Frame_Ins', 'Splice_Site' #inframe changes
+                'Silent','Wildtype']
+
+        else:
+            return ["Deletion",
+                'Frame_Shift_Del', 'Frame_Shift_Ins', 'Nonsense_Mutation', 'Nonstop_Mutation', #tuncation
+                'Missense_Mutation_hotspot',
+                'Missense_Mutation',
+                'Amplification',
+                'In_Frame_Del', 'In_Frame_Ins', 'Splice_Site'
+                'Silent',
+                'Wildtype']
+
+    def _get_mutation_classes(self):
+        """Get which mutation types are truncations, missenses, and noncoding mutations, based on the cancer type, for prioritizing mutations.
+
+        Returns:
+        list of str: The truncation mutation types.
+        list of str: The missense mutation types.
+        list of str: The noncoding mutation types. Only used for gbm, so empty for other cancer types.
         """
-        # Based on the cancer type, define which mutation types are truncations, for sorting later
         if self._cancer_type == 'colon':
             truncations = ['frameshift deletion', 'frameshift insertion', 'frameshift substitution', 'stopgain', 'stoploss']
             missenses = ['nonframeshift deletion', 'nonframeshift insertion', 'nonframeshift substitution', 'nonsynonymous SNV']
@@ -1095,104 +1755,178 @@ class Dataset:
 
         if self._cancer_type == "gbm":
             noncodings = ["Intron", "RNA", "3'Flank", "Splice_Region", "5'UTR", "5'Flank", "3'UTR"]
+        else:
+            noncodings = []
 
-        # Filter the mutations!!
-        chosen_indices = []
-        for filter_val in mutations_filter: # This will start at the beginning of the filter list, thus filters earlier in the list are prioritized, like we want
-            if filter_val in sample_mutations_list:
-                chosen_indices = [index for index, value in enumerate(sample_mutations_list) if value == filter_val]
-            elif filter_val in sample_locations_list: # The mutations filter can also filter by location
-                chosen_indices = [index for index, value in enumerate(sample_locations_list) if value == filter_val]
-            if len(chosen_indices) > 0: # We found at least one mutation from the filter to prioritize, so we don't need to worry about later values in the filter priority list
-                break
-
-        if len(chosen_indices) == 0: # None of the mutations for the sample were in the filter, so we're going to have to use our default hierarchy
-            for mutation in sample_mutations_list:
-                if mutation in truncations:
-                    chosen_indices += [index for index, value in enumerate(sample_mutations_list) if value == mutation]
-
-        if len(chosen_indices) == 0: # None of them were in the filter, nor were truncations, so we'll grab all the missenses
-            for mutation in sample_mutations_list:
-                if mutation in missenses:
-                    chosen_indices += [index for index, value in enumerate(sample_mutations_list) if value == mutation]
-
-        if self._cancer_type == "gbm" and len(chosen_indices) == 0: # None of them were in the filter, nor were truncations, nor missenses, so we'll grab all the noncodings
-            for mutation in sample_mutations_list:
-                if mutation in noncodings:
-                    chosen_indices += [index for index, value in enumerate(sample_mutations_list) if value == mutation]
-
-        if len(chosen_indices) == 0: # There were no truncations or missenses, so they should all be Silent mutations
-            for mutation in sample_mutations_list:
-                if mutation not in ["Silent", "synonymous SNV"]:
-                    warnings.warn(f"Unknown mutation type {mutation}. Assigned lowest priority in filtering.", ParameterWarning, stacklevel=4)
-            chosen_indices = range(len(sample_mutations_list)) # We'll sort them all by location
-
-        # If there are multiple mutations in chosen_indices, the following code will pick the one soonest in the peptide sequence.
-        soonest_mutation = sample_mutations_list[chosen_indices[0]]
-        soonest_location = sample_locations_list[chosen_indices[0]]
-        for index in chosen_indices:
-            mutation = sample_mutations_list[index]
-            location = sample_locations_list[index]
-
-            if pd.isnull(location): # Some of the mutations have no location. We'll de-prioritize those.
-                continue
-            if pd.isnull(soonest_location): # This would happen if our initial value for soonest_location was NaN. If we got here, then the one we're testing isn't null, and we'll automatically prefer it
-                soonest_location = location
-                soonest_mutation = mutation
-                continue
+        return truncations, missenses, noncodings
 
-            num_location = self._parse_mutation_location(location) # Here, we're parsing the numerical position out of the location strings, for comparisons
-            num_soonest_location = self._parse_mutation_location(soonest_location)
-            if num_location < num_soonest_location:
-                soonest_location = location
-                soonest_mutation = mutation
-        return soonest_mutation, soonest_location
+    def _filter_multiple_mutations(self, mutations_filter, mutations, locations, group_ids):
+        """Based on a mutations filter, choose one mutation and its location for each group of mutations, e.g. all the mutations in one gene for one sample.
 
-    def _parse_mutation_location(self, location):
-        """Parse the number out of the location for a mutation.
+        Each mutation gets a priority rank: mutations in the filter come first, in filter order, then truncations, then missenses, then (for gbm) noncoding mutations, then everything else. Within the best rank in each group, we pick the mutation soonest in the peptide sequence, with mutations that have no location last.
 
         Parameters:
-        location (str): The location to parse.
+        mutations_filter (list of str): A list of mutations to prioritize, in order of priority. Passing an empty list will cause truncations to be chosen over missense, and mutations earlier in the sequence over later ones.
+        mutations (numpy.ndarray of str): The mutations to filter.
+        locations (numpy.ndarray of str): The locations to filter, in the same order as the mutations.
+        group_ids (numpy.ndarray of int): The group each mutation belongs to, numbered from 0, in the same order as the mutations. Each group must have at least one mutation.
 
         Returns:
-        int: The numerical part of the location.
+        numpy.ndarray of int: For each group, in order, the position of the chosen mutation in the mutations and locations arrays.
         """
-        if pd.isnull(location):
-            return location
-        num = ""
-        found_digits = False
-        for char in location:
-            if char.isdigit():
-                num = num + char
-                found_digits = True
-            else:
-                if found_digits: # We only want the first block of numbers
-                    return int(num)
-        return int(num) # We get here if the location ended with a digit
-
-    def _tumor_only(self, df):
-        """For a given dataframe, extract only the tumor samples."""
+        # Based on the cancer type, get which mutation types are truncations, for sorting later
+        truncations, missenses, noncodings = self._get_mutation_classes()
+
+        # Rank each distinct mutation type and location once, instead of checking every mutation against the lists. Codes of -1 are NaNs, which index the extra slot at the end of each array of ranks.
+        mutation_codes, mutation_types = pd.factorize(mutations)
+        location_codes, location_values = pd.factorize(locations)
+
+        truncation_rank = 2 * len(mutations_filter) # Ranks below this are for filter values: 2 * i if the ith value matched the mutation, 2 * i + 1 if it matched the location, since matching mutations were checked first
+        missense_rank, noncoding_rank, other_rank = truncation_rank + 1, truncation_rank + 2, truncation_rank + 3
+        mutation_ranks = np.array([truncation_rank if mutation in truncations else missense_rank if mutation in missenses else noncoding_rank if mutation in noncodings else other_rank for mutation in mutation_types] + [other_rank])
+        location_ranks = np.full(len(location_values) + 1, other_rank)
+        for i, filter_val in reversed(list(enumerate(mutations_filter))): # Go backwards, so filter values earlier in the list overwrite later ones, like we want
+            mutation_ranks[:-1][mutation_types == filter_val] = 2 * i
+            location_ranks[:-1][location_values == filter_val] = 2 * i + 1
+        ranks = np.minimum(mutation_ranks[mutation_codes], location_ranks[location_codes])
+
+        # Parse the numerical position out of each location, for comparisons. Locations without any digits go after the ones with them, and missing locations go last.
+        location_nums = self._parse_mutation_locations(location_values)
+        positions = np.append(np.where(np.isnan(location_nums), np.inf, location_nums), np.nan)[location_codes]
+
+        # Mutations at the same position are tied the way they always were: by the order each mutation type first appears in the group for truncations, missenses, and noncodings, and by table order otherwise
+        _, first_indices, first_inverse = np.unique(group_ids * (len(mutation_types) + 1) + mutation_codes + 1, return_index=True, return_inverse=True)
+        row_nums = np.arange(len(mutations))
+        ties = np.where((ranks >= truncation_rank) & (ranks < other_rank), first_indices[first_inverse], row_nums)
+
+        # Sort by group, then rank, then position, and take the first mutation in each group
+        order = np.lexsort((row_nums, ties, positions, ranks, group_ids))
+        sorted_groups = group_ids[order]
+        chosen = order[np.flatnonzero(np.diff(sorted_groups, prepend=-1))]
+
+        # If a group's best mutation wasn't in the filter, a truncation, or a missense, they should all be Silent mutations
+        other_groups = group_ids[chosen][ranks[chosen] == other_rank]
+        for mutation in pd.unique(mutations[np.isin(group_ids, other_groups)]):
+            if mutation not in ["Silent", "synonymous SNV"]:
+                warnings.warn(f"Unknown mutation type {mutation}. Assigned lowest priority in filtering.", ParameterWarning, stacklevel=4)
+
+        return chosen
+
+    def _parse_mutation_locations(self, locations):
+        """Parse the number out of the locations for some mutations.
 
-        clinical = self._get_dataframe("clinical")
-        clinical_tumor = clinical[clinical.Sample_Tumor_Normal == "Tumor"]
-        tumor_list = list(clinical_tumor.index.values)
-        tumor_df = df.loc[df.index.isin(tumor_list)]
-        return tumor_df
-
-    def _normal_only(self, df):
-        """For a given dataframe, extract only the tumor samples."""
+        Parameters:
+        locations (numpy.ndarray of str): The locations to parse.
 
-        clinical = self._get_dataframe("clinical")
-        clinical_normal = clinical[clinical.Sample_Tumor_Normal == "Normal"]
-        normal_list = list(clinical_normal.index.values)
-        normal_df = df.loc[df.index.isin(normal_list)]
-        return normal_df
+        Returns:
+        numpy.ndarray of float: The first block of digits in each location. NaN if the location was NaN or had no digits.
+        """
+        return pd.Series(locations, dtype=object).str.extract(r"(\d+)", expand=False).astype(float).to_numpy()
 
     def _check_how_parameter(self, given_how):
         possible_values = ['outer', 'inner', 'left', 'right']
         if given_how not in possible_values:
             raise InvalidParameterError("'{}' is not a valid value for 'how'. Possible values are 'outer', 'inner', 'left', 'right'.".format(given_how))
             
+    def _get_binary_gene_columns(self, genes):
+        """Get the names of the columns in the somatic_mutation_binary dataframe for some genes. Each column there is named with a gene and a location, separated by an underscore.
+
+        Parameters:
+        genes (str, or list or array-like of str): The gene(s) to get columns for.
+
+        Returns:
+        list of str: The columns for the genes, grouped by gene in the order the genes were given, and in the same order as in the dataframe within each gene.
+        """
+        if isinstance(genes, str):
+            genes = [genes]
+
+        binary_columns = self._get_dataframe("somatic_mutation_binary", copy=False).columns
+        if isinstance(binary_columns, pd.MultiIndex):
+            binary_columns = binary_columns.get_level_values("Name")
+
+        # Look up each gene's range of column positions in the table's gene index, instead of matching every column name
+        gene_index, offsets, positions = self._get_gene_columns("somatic_mutation_binary", gene_prefixes=True)
+        gene_codes = gene_index.get_indexer(pd.Index(genes).drop_duplicates())
+        found = [positions[offsets[code]:offsets[code + 1]] for code in gene_codes if code != -1]
+        if len(found) == 0:
+            return []
+        return list(binary_columns[np.concatenate(found)])
+
+    def _plan_multi_join(self, tables, how):
+        """Plan joining several tables, without joining them. Gives all the tables the same column levels, the same way joining them one at a time would, and computes the row index of the joined dataframe from just the tables' indices.
+
+        Parameters:
+        tables (list of pandas.DataFrame): The tables to join, in order. Their columns are edited in place.
+        how (str): How to perform the join, acceptable values are from ['outer', 'inner', 'left', 'right'].
+
+        Returns:
+        pandas.Index: The row index of the joined dataframe. None if any of the tables have duplicate samples in their index, since then the tables can't just be reindexed to it.
+        list of pandas.Index: For each table, the samples whose values from that table make it into the joined dataframe, or None if they all do.
+        """
+        joined_index = tables[0].index
+        for i in range(1, len(tables)):
+            table = tables[i]
+            if tables[0].columns.names != table.columns.names: # All the tables before this one have the same column levels, so we only need to check one
+                for prev_table in tables[:i]:
+                    prev_table.columns = add_index_levels(to=prev_table.columns, source=table.columns)
+                table.columns = add_index_levels(to=table.columns, source=tables[0].columns)
+
+            joined_index = joined_index.join(table.index, how=how)
+
+        # A right join keeps only the rows in the table being joined, so a table's values only make it into the joined dataframe for samples that are in every table after it
+        kept_samples = [None for table in tables]
+        if how == "right":
+            later_index = tables[-1].index
+            for i in range(len(tables) - 2, -1, -1):
+                kept_samples[i] = later_index
+                later_index = later_index.intersection(tables[i].index)
+
+        if not all(table.index.is_unique for table in tables):
+            return None, kept_samples
+        return joined_index, kept_samples
+
+    def _describe_multi_join(self, df_names, tables, joined_index, long_mutations=None):
+        """Describe a planned multi_join: how much was selected from each dataframe, and how big the joined dataframe will be. Memory is estimated from the column dtypes, counting each object as a pointer.
+
+        Parameters:
+        df_names (list of str): The names of the dataframes the tables were selected from.
+        tables (list of pandas.DataFrame): The tables to join, in order.
+        joined_index (pandas.Index): The row index of the joined dataframe, or None if it's unknown until the tables are joined.
+        long_mutations (pandas.DataFrame, optional): If the somatic_mutation data is being joined in long format, the mutations from _get_genes_mutations. Its table in tables is then just a placeholder for its samples. Default of None means it isn't.
+
+        Returns:
+        pandas.DataFrame: One row for each table, plus one for the joined dataframe, with the number of rows and columns and the estimated size in megabytes.
+        """
+        def estimate_size(num_rows, dtypes):
+            return round(num_rows * sum(dtype.itemsize if isinstance(dtype, np.dtype) else 8 for dtype in dtypes) / 1e6, 1)
+
+        rows = []
+        all_dtypes = []
+        for df_name, table in zip(df_names, tables):
+            if df_name == "somatic_mutation" and long_mutations is not None:
+                table = long_mutations
+            rows.append([df_name, table.shape[0], table.shape[1], estimate_size(table.shape[0], table.dtypes)])
+            all_dtypes.extend(table.dtypes)
+
+        num_joined_rows = None if joined_index is None else len(joined_index)
+        if long_mutations is not None:
+            if joined_index is not None and joined_index.is_unique: # Otherwise the join will raise an error
+                # Count the rows the way _join_mutations_long builds them: one for each mutation, plus one for each sample and gene without any
+                genes = long_mutations["Gene"].cat.categories
+                sample_rows = joined_index.get_indexer(long_mutations.index)
+                in_join = sample_rows != -1
+                mutation_cells = sample_rows[in_join] * len(genes) + long_mutations["Gene"].cat.codes.to_numpy()[in_join]
+                num_joined_rows = len(joined_index) * len(genes) - len(np.unique(mutation_cells)) + len(mutation_cells)
+            else:
+                num_joined_rows = None
+
+        if num_joined_rows is None:
+            rows.append(["joined", np.nan, len(all_dtypes), np.nan])
+        else:
+            rows.append(["joined", num_joined_rows, len(all_dtypes), estimate_size(num_joined_rows, all_dtypes)])
+
+        return pd.DataFrame(rows, columns=["Table", "Rows", "Columns", "Memory_MB"])
+
     def _join_dataframe(self, df1, df2):
         """Joins a dataframe to another dataframe.
  
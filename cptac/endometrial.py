@@ -15,18 +15,23 @@ import os
 import warnings
 from .dataset import Dataset
 from .dataframe_tools import *
-from .exceptions import FailedReindexWarning, ReindexMapError
+from .exceptions import FailedReindexWarning, InvalidParameterError, ReindexMapError
 
 class Endometrial(Dataset):
 
-    def __init__(self, version="latest", no_internet=False):
+    def __init__(self, version="latest", no_internet=False, lazy=False, n_jobs=1):
         """Load all of the endometrial dataframes as values in the self._data dict variable, with names as keys, and format them properly.
 
         Parameters:
         version (str, optional): The version number to load, or the string "latest" to just load the latest building. Default is "latest".
         no_internet (bool, optional): Whether to skip the index update step because it requires an internet connection. This will be skipped automatically if there is no internet at all, but you may want to manually skip it if you have a spotty internet connection. Default is False.
+        lazy (bool, optional): Not supported for the endometrial dataset, since its tables have to be formatted together. Passing True raises an InvalidParameterError. Default is False.
+        n_jobs (int, optional): The number of threads to parse the data files with, since they can be parsed independently. Pass -1 to use one thread for each CPU. Default is 1.
         """
 
+        if lazy:
+            raise InvalidParameterError("The endometrial dataset can't be loaded lazily, because its tables are reindexed from Sample_IDs to Patient_IDs with a column of the clinical dataframe, after dropping the cases it marks as excluded, so they have to be loaded together. Pass lazy=False.")
+
         # Set some needed variables, and pass them to the parent Dataset class __init__ function
 
         valid_versions = ["2.1", "2.1.1"] # This keeps a record of all versions that the code is equipped to handle. That way, if there's a new data release but they didn't update their package, it won't try to parse the new data version it isn't equipped to handle.
@@ -62,78 +67,84 @@ class Endometrial(Dataset):
 
         super().__init__(cancer_type="endometrial", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet)
 
-        # Load the data files into dataframes in the self._data dict
-        loading_msg = f"Loading {self.get_cancer_type()} v{self.version()}"
-        for file_path in self._data_files_paths: 
-
-            # Print a loading message. We add a dot every time, so the user knows it's not frozen.
-            loading_msg = loading_msg + "."
-            print(loading_msg, end='\r')
-
-            path_elements = file_path.split(os.sep) # Get a list of the levels of the path
-            file_name = path_elements[-1] # The last element will be the name of the file
-            df_name = file_name.split(".")[0] # Dataframe name will be the first section of file name; i.e. proteomics.txt.gz becomes proteomics
-
-            # Load the file, based on what it is
-            if file_name == "clinical.txt":
-                # Fix for reading error on clinical.txt:
-                with open(file_path, "r", errors="ignore") as clinical_file:
-                    df = pd.read_csv(clinical_file, sep="\t", index_col=0)
-                df = df.sort_index()
-                self._data[df_name] = df # Maps dataframe name to dataframe
-
-            elif file_name == "definitions.txt":
-                with open(file_path, "r") as definitions_file:
-                    for line in definitions_file.readlines():
-                        line = line.strip()
-                        line = line.split("\t")
-                        term = line[0]
-                        definition = line[1]
-                        self._definitions[term] = definition
-
-            elif file_name == "somatic.maf.gz":
-                df = pd.read_csv(file_path, sep = "\t")
-                split_barcode = df["Tumor_Sample_Barcode"].str.split("_", n=1, expand=True) # The first part of the barcode is the patient id, which we need want to make the index
-                df["Tumor_Sample_Barcode"] = split_barcode[0]
-                df = df[["Tumor_Sample_Barcode","Hugo_Symbol","Variant_Classification","HGVSp_Short"]]
-                df = df.rename({"Tumor_Sample_Barcode":"Patient_ID","Hugo_Symbol":"Gene","Variant_Classification":"Mutation","HGVSp_Short":"Location"}, axis='columns')
-                df = df.sort_values(by=["Patient_ID", "Gene"])
-                df = df.set_index("Patient_ID")
-                self._data["somatic_mutation"] = df # Maps dataframe name to dataframe
-
-            elif file_name == "acetylproteomics.cct.gz" or file_name == "phosphoproteomics_site.cct.gz":
-                df = pd.read_csv(file_path, sep = "\t", index_col=0)
-                df.index = df.index.str.rsplit('-', n=1, expand=True) # Separate the index into a multiindex where the 1st level is the gene, and 2nd is the site
-                df.index = df.index.set_names(["Name", "Site"]) # Properly name the levels
-                df = df.sort_index()
-                df = df.transpose()
-                self._data[df_name] = df # Maps dataframe name to dataframe
-
-            elif file_name == 'UCEC_followup_9_12.xlsx' and self._version == "2.1.1":
-                df = pd.read_excel(file_path)
-
-                # Replace redundant values for 'not reported' with NaN
-                nan_equivalents = ['Not Reported/ Unknown', 'Reported/ Unknown', 'Not Applicable', 'na', 'unknown',
-                    'Not Performed', 'Unknown tumor status', 'Unknown', 'Unknown Tumor Status', 'Not specified']
-                    
-                df = df.replace(nan_equivalents, np.nan)
-
-                # Rename, set, and sort index
-                df = df.rename(columns={'Case ID': 'Patient_ID'})
-                df = df.set_index("Patient_ID")
-                df = df.sort_index()
-
-                self._data["followup"] = df
-
-            else:
-                df = pd.read_csv(file_path, sep="\t", index_col=0)
-                df = df.transpose()
-                df = df.sort_index()
-                self._data[df_name] = df # Maps dataframe name to dataframe
-
-        print(' ' * len(loading_msg), end='\r') # Erase the loading message
-        formatting_msg = "Formatting dataframes..."
-        print(formatting_msg, end='\r')
+        # Load the data into dataframes in the self._data dict, and format them
+        self._load_data(n_jobs=n_jobs)
+
+    def _parse_file(self, file_path):
+        """Parse one of the endometrial data files into dataframes.
+
+        Parameters:
+        file_path (str): The path to the file to parse.
+
+        Returns:
+        dict: The dataframes parsed from the file. Keys are str of dataframe names, values are pandas.DataFrame
+        """
+        data = {}
+        path_elements = file_path.split(os.sep) # Get a list of the levels of the path
+        file_name = path_elements[-1] # The last element will be the name of the file
+        df_name = file_name.split(".")[0] # Dataframe name will be the first section of file name; i.e. proteomics.txt.gz becomes proteomics
+
+        # Load the file, based on what it is
+        if file_name == "clinical.txt":
+            # Fix for reading error on clinical.txt:
+            with open(file_path, "r", errors="ignore") as clinical_file:
+                df = pd.read_csv(clinical_file, sep="\t", index_col=0)
+            df = df.sort_index()
+            data[df_name] = df # Maps dataframe name to dataframe
+
+        elif file_name == "definitions.txt":
+            with open(file_path, "r") as definitions_file:
+                for line in definitions_file.readlines():
+                    line = line.strip()
+                    line = line.split("\t")
+                    term = line[0]
+                    definition = line[1]
+                    self._definitions[term] = definition
+
+        elif file_name == "somatic.maf.gz":
+            df = pd.read_csv(file_path, sep = "\t", usecols=["Tumor_Sample_Barcode", "Hugo_Symbol", "Variant_Classification", "HGVSp_Short"], dtype={"Hugo_Symbol": "category", "Variant_Classification": "category"}) # We don't need any of the other columns, so we don't read them. Genes and mutations repeat a lot, so we store them as categoricals.
+            split_barcode = df["Tumor_Sample_Barcode"].str.split("_", n=1, expand=True) # The first part of the barcode is the patient id, which we need want to make the index
+            df["Tumor_Sample_Barcode"] = split_barcode[0]
+            df = df[["Tumor_Sample_Barcode","Hugo_Symbol","Variant_Classification","HGVSp_Short"]] # usecols keeps the columns in the order they're in the file, so this puts them in the order we want
+            df = df.rename({"Tumor_Sample_Barcode":"Patient_ID","Hugo_Symbol":"Gene","Variant_Classification":"Mutation","HGVSp_Short":"Location"}, axis='columns')
+            df = df.sort_values(by=["Patient_ID", "Gene"])
+            df = df.set_index("Patient_ID")
+            data["somatic_mutation"] = df # Maps dataframe name to dataframe
+
+        elif file_name == "acetylproteomics.cct.gz" or file_name == "phosphoproteomics_site.cct.gz":
+            df = pd.read_csv(file_path, sep = "\t", index_col=0)
+            df.index = df.index.str.rsplit('-', n=1, expand=True) # Separate the index into a multiindex where the 1st level is the gene, and 2nd is the site
+            df.index = df.index.set_names(["Name", "Site"]) # Properly name the levels
+            df = df.sort_index()
+            df = df.transpose()
+            data[df_name] = df # Maps dataframe name to dataframe
+
+        elif file_name == 'UCEC_followup_9_12.xlsx' and self._version == "2.1.1":
+            df = pd.read_excel(file_path)
+
+            # Replace redundant values for 'not reported' with NaN
+            nan_equivalents = ['Not Reported/ Unknown', 'Reported/ Unknown', 'Not Applicable', 'na', 'unknown',
+                'Not Performed', 'Unknown tumor status', 'Unknown', 'Unknown Tumor Status', 'Not specified']
+                
+            df = df.replace(nan_equivalents, np.nan)
+
+            # Rename, set, and sort index
+            df = df.rename(columns={'Case ID': 'Patient_ID'})
+            df = df.set_index("Patient_ID")
+            df = df.sort_index()
+
+            data["followup"] = df
+
+        else:
+            df = pd.read_csv(file_path, sep="\t", index_col=0)
+            df = df.transpose()
+            df = df.sort_index()
+            data[df_name] = df # Maps dataframe name to dataframe
+
+        return data
+
+    def _format_dataframes(self):
+        """Format the endometrial dataframes once they've all been parsed."""
 
         # Separate out clinical, derived_molecular, and experimental_design dataframes
         all_clinical = self._data["clinical"]
@@ -229,5 +240,3 @@ class Endometrial(Dataset):
 
         # Call function from dataframe_tools.py to standardize the names of the index and column axes
         self._data = standardize_axes_names(self._data)
-
-        print(" " * len(formatting_msg), end='\r') # Erase the formatting message
@@ -50,6 +50,10 @@ class MissingFileError(FileError):
     """A data file was missing."""
     pass
 
+class InvalidFileFormatError(FileError):
+    """A data file wasn't in the format we expected."""
+    pass
+
 class DataError(CptacError):
     """Something was wrong with the data."""
     pass
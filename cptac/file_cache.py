@@ -0,0 +1,258 @@
+#   Copyright 2018 Samuel Payne sam_payne@byu.edu
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import os
+import glob
+import shutil
+import pickle
+import tempfile
+import pandas as pd
+from .file_tools import get_dataset_path, get_index_hashes, hash_bytes
+from .version import __version__
+from .exceptions import *
+
+CACHE_DIR = "cache"
+KEY_FILE = "key.txt"
+DEFINITIONS_FILE = "definitions.pkl"
+TABLE_EXTENSION = ".pkl"
+
+def get_cache_path(dataset, version):
+    """Get the path to the directory where the formatted tables for a version of a dataset are cached.
+
+    Parameters:
+    dataset (str): The name of the dataset.
+    version (str): The version number of the dataset. Should have already been validated.
+
+    Returns:
+    str: The path to the cache directory for that version of the dataset. It may not exist yet.
+    """
+    dataset_path = get_dataset_path(dataset)
+    return os.path.join(dataset_path, CACHE_DIR, f"{dataset}_v{version}")
+
+def get_cache_key(dataset, version):
+    """Compute the key for the cached tables of a version of a dataset. The key changes whenever the hash of any of the version's data files in the index changes, any of the data files on disk is replaced, or cptac or pandas is updated, since any of those could change how the tables come out or whether we can read them back.
+
+    Parameters:
+    dataset (str): The name of the dataset.
+    version (str): The version number of the dataset. Should have already been validated.
+
+    Returns:
+    str: The cache key.
+    """
+    version_hashes = get_index_hashes(dataset, version)
+    version_path = os.path.join(get_dataset_path(dataset), f"{dataset}_v{version}")
+
+    key_lines = [f"cptac {__version__}", f"pandas {pd.__version__}"]
+    for file_name in sorted(version_hashes.keys()):
+        # The index can be updated before the new data files are downloaded, so we also key on the size and modification time of the files we'd actually parse
+        try:
+            file_stat = os.stat(os.path.join(version_path, file_name))
+            file_state = f"{file_stat.st_size}\t{file_stat.st_mtime_ns}"
+        except OSError:
+            file_state = "missing"
+        key_lines.append(f"{file_name}\t{version_hashes[file_name]}\t{file_state}")
+
+    return hash_bytes("\n".join(key_lines).encode("utf-8"))
+
+def _read_key_file(cache_path):
+    """Read the key file for a cache directory. The first line is the cache key, and each line after that is the name of a table in the cache.
+
+    Parameters:
+    cache_path (str): The path to the cache directory.
+
+    Returns:
+    str: The cache key. None if the key file doesn't exist or can't be read.
+    list of str: The names of the cached tables. None if the key file doesn't exist or can't be read.
+    """
+    try:
+        with open(os.path.join(cache_path, KEY_FILE), 'r') as key_file:
+            lines = key_file.read().splitlines()
+    except OSError: # It doesn't exist, or another process is replacing the cache right now
+        return None, None
+
+    if len(lines) == 0:
+        return None, None
+
+    return lines[0].strip(), [line.strip() for line in lines[1:] if line.strip() != ""]
+
+def is_cache_valid(dataset, version):
+    """Check whether there are cached tables for a version of a dataset, and whether they're up to date with the index and the package version.
+
+    Parameters:
+    dataset (str): The name of the dataset.
+    version (str): The version number of the dataset. Should have already been validated.
+
+    Returns:
+    bool: Whether the cache is valid.
+    """
+    cached_key, table_names = _read_key_file(get_cache_path(dataset, version))
+    if cached_key is None:
+        return False
+
+    return cached_key == get_cache_key(dataset, version)
+
+def load_cached_tables(dataset, version, names=None, exclude=None):
+    """Load formatted tables from the cache for a version of a dataset. Does not check whether the cache is valid; call is_cache_valid first.
+
+    Parameters:
+    dataset (str): The name of the dataset.
+    version (str): The version number of the dataset. Should have already been validated.
+    names (list of str, optional): The names of the tables to load. Default of None will load all the tables listed in the cache's key file.
+    exclude (list of str, optional): The names of tables not to load. Default of None will not exclude any tables.
+
+    Returns:
+    dict: The cached tables. Keys are str of dataframe names, values are pandas.DataFrame. Returns None if any of the requested tables aren't in the cache, or can't be read.
+    """
+    cache_path = get_cache_path(dataset, version)
+
+    # The key file lists every table that was cached, so a table that's gone missing since is caught here, instead of the dataset quietly loading without it
+    cached_key, table_names = _read_key_file(cache_path)
+    if table_names is None:
+        return None
+
+    if names is None:
+        names = table_names
+    elif not set(names).issubset(table_names):
+        return None
+
+    if exclude is not None:
+        names = [name for name in names if name not in exclude]
+
+    tables = {}
+    for name in names:
+        try:
+            tables[name] = pd.read_pickle(os.path.join(cache_path, name + TABLE_EXTENSION))
+        except Exception: # A missing or truncated pickle, or one we can't unpickle, can fail in all sorts of ways. The caller parses the files instead, and caches them again.
+            return None
+
+    return tables
+
+def load_cached_definitions(dataset, version):
+    """Load the cached definitions for a version of a dataset.
+
+    Parameters:
+    dataset (str): The name of the dataset.
+    version (str): The version number of the dataset. Should have already been validated.
+
+    Returns:
+    dict: The cached definitions. Empty if none were cached. None if they were cached, but can't be read.
+    """
+    definitions_path = os.path.join(get_cache_path(dataset, version), DEFINITIONS_FILE)
+    if not os.path.isfile(definitions_path):
+        return {}
+
+    try:
+        with open(definitions_path, 'rb') as definitions_file:
+            return pickle.load(definitions_file)
+    except Exception: # Same as for the tables in load_cached_tables
+        return None
+
+def save_cached_tables(dataset, version, data, definitions):
+    """Cache the formatted tables for a version of a dataset, replacing anything that was cached for it before. The new cache is written to a temporary directory next to the old one, and then moved into place, so another process loading the dataset at the same time never sees a half-written cache.
+
+    Parameters:
+    dataset (str): The name of the dataset.
+    version (str): The version number of the dataset. Should have already been validated.
+    data (dict): The formatted tables. Keys are str of dataframe names, values are pandas.DataFrame
+    definitions (dict): The dataset's definitions, if it has any.
+
+    Returns:
+    bool: Whether the tables were cached. The cache is optional, so if we can't write it (for example, if the data directory is read-only), we just return False.
+    """
+    cache_path = get_cache_path(dataset, version)
+    cache_parent, cache_name = os.path.split(cache_path)
+    temp_path = None
+    old_path = None
+
+    try:
+        os.makedirs(cache_parent, exist_ok=True)
+        temp_path = tempfile.mkdtemp(prefix=f".{cache_name}_", dir=cache_parent) # The leading dot keeps _get_cache_paths from finding it
+
+        for name, df in data.items():
+            df.to_pickle(os.path.join(temp_path, name + TABLE_EXTENSION))
+
+        with open(os.path.join(temp_path, DEFINITIONS_FILE), 'wb') as definitions_file:
+            pickle.dump(definitions, definitions_file)
+
+        with open(os.path.join(temp_path, KEY_FILE), 'w') as key_file:
+            key_file.write("\n".join([get_cache_key(dataset, version)] + list(data.keys())) + "\n")
+
+        # A directory can't be replaced while it has files in it, so we move the old cache out of the way first
+        if os.path.isdir(cache_path):
+            old_path = tempfile.mkdtemp(prefix=f".{cache_name}_old_", dir=cache_parent)
+            os.replace(cache_path, os.path.join(old_path, cache_name))
+        os.replace(temp_path, cache_path)
+        temp_path = None
+
+    except OSError:
+        return False
+
+    finally:
+        if temp_path is not None:
+            shutil.rmtree(temp_path, ignore_errors=True)
+        if old_path is not None:
+            shutil.rmtree(old_path, ignore_errors=True)
+
+    return True
+
+def _get_cache_paths():
+    """Get the paths to all the cache directories for all versions of all datasets, including pancan datasets.
+
+    Returns:
+    list of str: The cache directory paths.
+    """
+    path_here = os.path.abspath(os.path.dirname(__file__))
+    cache_search = os.path.join(path_here, "data_*", CACHE_DIR, "*_v*")
+    pancan_cache_search = os.path.join(path_here, "pancan", "data_*", CACHE_DIR, "*_v*")
+    return sorted(glob.glob(cache_search) + glob.glob(pancan_cache_search))
+
+def cache_info():
+    """Get information about the cached tables for each dataset. Tables are cached the first time a dataset version is fully loaded, and used to skip parsing the data files the next time it's loaded.
+
+    Returns:
+    pandas.DataFrame: One row for each cached dataset version, with the number of tables cached, the size of the cache in megabytes, and whether the cache is still valid for the current index and package version.
+    """
+    rows = []
+    for cache_path in _get_cache_paths():
+        dataset, version = os.path.basename(cache_path).split("_v", 1)
+
+        file_paths = [os.path.join(cache_path, file_name) for file_name in os.listdir(cache_path)]
+        cached_key, table_names = _read_key_file(cache_path)
+        num_tables = len(table_names) if table_names is not None else 0
+        size = sum(os.path.getsize(path) for path in file_paths)
+
+        try:
+            valid = is_cache_valid(dataset, version)
+        except (CptacError, KeyError): # The index or that version's entry in it is missing
+            valid = False
+
+        rows.append([dataset, version, num_tables, round(size / 1e6, 1), valid])
+
+    return pd.DataFrame(rows, columns=["Dataset", "Version", "Tables", "Size_MB", "Valid"])
+
+def clear_cache(dataset="all", version="all"):
+    """Delete cached tables. They'll be rebuilt the next time the dataset is fully loaded.
+
+    Parameters:
+    dataset (str, optional): The name of the dataset to clear the cache for, or "all" to clear it for all datasets. Default is "all".
+    version (str, optional): The version number to clear the cache for, or "all" to clear it for all versions. Default is "all".
+
+    Returns:
+    int: The number of cached dataset versions that were deleted.
+    """
+    num_cleared = 0
+    for cache_path in _get_cache_paths():
+        cache_dataset, cache_version = os.path.basename(cache_path).split("_v", 1)
+        if dataset.lower() in ["all", cache_dataset] and version in ["all", cache_version]:
+            shutil.rmtree(cache_path)
+            num_cleared += 1
+
+    return num_cleared
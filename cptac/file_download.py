@@ -10,6 +10,7 @@
 #   limitations under the License.
 
 import os
+import time
 import requests
 import getpass
 import bs4
@@ -20,6 +21,12 @@ from .exceptions import NoInternetError
 USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.10; rv:39.0)'
 HEADERS = {'User-Agent': USER_AGENT}
 
+# Settings for checking whether our indices are up-to-date
+INDEX_CHECK_FILE = "index_checked.txt" # Stores the time we last successfully checked a dataset's index against the server
+INDEX_CHECK_TTL = 60 * 60 # How long, in seconds, to go without checking an index again. Override with the CPTAC_INDEX_CHECK_TTL environment variable; 0 checks every time.
+INDEX_CHECK_TIMEOUT = (3.05, 10) # Connect and read timeouts, in seconds, for the check
+_index_check_offline = False # Set when a check fails for lack of internet, so we don't keep trying for the rest of the session
+
 def download(dataset, version="latest", redownload=False):
     """Download data files for the specified datasets. Defaults to downloading latest version on server.
 
@@ -56,8 +63,8 @@ def download(dataset, version="latest", redownload=False):
     dataset = dataset.lower()
     dataset_path = get_dataset_path(dataset)
 
-    # Update the index
-    update_index(dataset)
+    # Update the index. They asked for the latest data, so we check even if we did recently.
+    update_index(dataset, force=True)
 
     # Load the index
     index = get_index(dataset)
@@ -118,15 +125,18 @@ def download(dataset, version="latest", redownload=False):
             downloaded_path = download_file(file_url, file_path, server_hash, password=password, file_message=f"{dataset} v{version} data files", file_number=file_number, total_files=total_files)
     return True
 
-def update_index(dataset):
-    """Check if the index of the given dataset is up to date with server version, and update it if needed.
+def update_index(dataset, force=False):
+    """Check if the index of the given dataset is up to date with server version, and update it if needed. To save a trip to the server every time a dataset is loaded, we skip the check if we already did it successfully within the last INDEX_CHECK_TTL seconds, or if a check already failed for lack of internet in this session.
 
     Parameters:
     dataset (str): The name of the dataset to check the index of.
+    force (bool, optional): Whether to check the index even if we checked it recently, or a previous check found no internet. Default False.
 
     Returns:
     bool: Indicates if we were able to check the index and update if needed (i.e. we had internet)
     """
+    global _index_check_offline
+
     # Get the path to our dataset
     dataset_path = get_dataset_path(dataset)
 
@@ -135,6 +145,14 @@ def update_index(dataset):
     index_hash_file = "index_hash.txt"
     index_file = "index.txt"
 
+    index_path = os.path.join(dataset_path, index_file)
+
+    if not force:
+        if _index_check_offline:
+            raise NoInternetError("Insufficient internet. Check your internet connection.")
+        if os.path.isfile(index_path) and _is_index_check_fresh(dataset_path):
+            return True
+
     # Get, from the server, what the md5 hash of our index file should be
     index_urls_path = os.path.join(dataset_path, index_urls_file)
     urls_dict = parse_tsv_dict(index_urls_path)
@@ -143,15 +161,19 @@ def update_index(dataset):
     checking_msg = f"Checking that {dataset} index is up-to-date..."
     print(checking_msg, end='\r')
     try:
-        server_index_hash = download_text(index_hash_url)
+        server_index_hash = download_text(index_hash_url, timeout=INDEX_CHECK_TIMEOUT)
+    except NoInternetError:
+        _index_check_offline = True
+        raise
     finally:
         print(" " * len(checking_msg), end='\r') # Erase the checking message, even if there was an internet error
 
-    index_path = os.path.join(dataset_path, index_file)
+    _index_check_offline = False
 
     if os.path.isfile(index_path):
         local_index_hash = hash_file(index_path)
         if local_index_hash == server_index_hash:
+            _record_index_check(dataset_path)
             return True
 
     index_url = urls_dict.get(index_file)
@@ -160,21 +182,60 @@ def update_index(dataset):
     if os.path.isfile(index_path):
         local_index_hash = hash_file(index_path)
         if local_index_hash == server_index_hash:
+            _record_index_check(dataset_path)
             return True
     # If we get here, something apparently went wrong with the download.
     raise NoInternetError("Insufficient internet. Check your internet connection.")
 
-def download_text(url):
+def _get_index_check_ttl():
+    """Get how long, in seconds, to go without checking an index again. Uses the CPTAC_INDEX_CHECK_TTL environment variable if it's set to a number, otherwise INDEX_CHECK_TTL."""
+    try:
+        return float(os.environ["CPTAC_INDEX_CHECK_TTL"])
+    except (KeyError, ValueError):
+        return INDEX_CHECK_TTL
+
+def _is_index_check_fresh(dataset_path):
+    """Check whether we successfully checked a dataset's index against the server within the TTL.
+
+    Parameters:
+    dataset_path (str): The path to the dataset's directory.
+
+    Returns:
+    bool: Whether the last check is recent enough that we can skip checking again.
+    """
+    check_path = os.path.join(dataset_path, INDEX_CHECK_FILE)
+    try:
+        with open(check_path, 'r') as check_file:
+            checked_time = float(check_file.read().strip())
+    except (OSError, ValueError):
+        return False
+
+    return 0 <= time.time() - checked_time < _get_index_check_ttl()
+
+def _record_index_check(dataset_path):
+    """Save the time of a successful index check for a dataset. If we can't write the file (for example, if the data directory is read-only), we'll just check again next time.
+
+    Parameters:
+    dataset_path (str): The path to the dataset's directory.
+    """
+    try:
+        with open(os.path.join(dataset_path, INDEX_CHECK_FILE), 'w') as check_file:
+            check_file.write(str(time.time()))
+    except OSError:
+        pass
+
+def download_text(url, timeout=None):
     """Download text from a direct download url for a text file.
 
     Parameters:
     url (str): The direct download url for the text.
+    timeout (float, optional): How many seconds to wait for the server before giving up. Default of None will wait indefinitely.
 
     Returns:
     str: The downloaded text.
     """
     try:
-        response = requests.get(url, headers=HEADERS, allow_redirects=True)
+        response = requests.get(url, headers=HEADERS, allow_redirects=True, timeout=timeout)
         response.raise_for_status() # Raises a requests HTTPError if the response code was unsuccessful
     except requests.RequestException: # Parent class for all exceptions in the requests module
         raise NoInternetError("Insufficient internet. Check your internet connection.") from None
@@ -12,10 +12,17 @@
 import hashlib
 import os
 import glob
+import gzip
 import warnings
 import packaging.version
+import pandas as pd
 from .exceptions import *
 
+# In-process caches, so we don't keep probing the file system and re-parsing indices every time a dataset is loaded or downloaded
+_dataset_paths = {} # Keys are dataset names, values are the paths to their directories. See get_dataset_path.
+_installed_versions = {} # Keys are dataset directory paths, values are tuples of the directory's modification time and the latest version installed in it. See get_latest_installed.
+_index_registry = {} # Keys are dataset names, values are dicts with the modification time and size of the index file when we parsed it, the parsed index, and its hashes. See get_index.
+
 def get_dataset_path(dataset):
     """Get the path to the main directory for a dataset.
 
@@ -25,21 +32,22 @@ def get_dataset_path(dataset):
     Returns:
     str: The path to the main directory of the specified dataset.
     """
+    if dataset in _dataset_paths: # The dataset directories ship with the package, so once we've found one, it won't move
+        return _dataset_paths[dataset]
+
     path_here = os.path.abspath(os.path.dirname(__file__))
     dataset_dir = f"data_{dataset}"
     dataset_path = os.path.join(path_here, dataset_dir)
 
-    if os.path.isdir(dataset_path):
-        return dataset_path
-        
-    else:
+    if not os.path.isdir(dataset_path):
         pancan_dir = "pancan"
         dataset_path = os.path.join(path_here, pancan_dir, dataset_dir)
-        if os.path.isdir(dataset_path):
-            return dataset_path
-        else:
+        if not os.path.isdir(dataset_path):
             raise InvalidParameterError(f"{dataset} is not a valid dataset.")
 
+    _dataset_paths[dataset] = dataset_path
+    return dataset_path
+
 def validate_version(version, dataset, use_context, valid_versions=None):
     """Parse and validate a given version number. If version is "latest", check that index and installed latest match.
 
@@ -121,6 +129,12 @@ def get_latest_installed(dataset_path):
     Returns:
     str: The latest version installed locally. Returns None if no versions are installed.
     """
+    # Adding or removing a version directory changes the modification time of the dataset directory, so if it hasn't changed, neither has the answer
+    dir_mtime = os.stat(dataset_path).st_mtime_ns
+    cached = _installed_versions.get(dataset_path)
+    if cached is not None and cached[0] == dir_mtime:
+        return cached[1]
+
     dirs = [dir.strip() for dir in os.listdir(dataset_path)
                 if os.path.isdir(os.path.join(dataset_path, dir))]
 
@@ -130,18 +144,44 @@ def get_latest_installed(dataset_path):
     versions = [dir.replace(version_dir_prefix, '') for dir in dirs
                     if dir.startswith(version_dir_prefix)]
     if len(versions) == 0:
-        return
-    latest_installed = max(versions, key=packaging.version.parse)
+        latest_installed = None
+    else:
+        latest_installed = max(versions, key=packaging.version.parse)
+
+    _installed_versions[dataset_path] = (dir_mtime, latest_installed)
     return latest_installed
 
 def get_index(dataset):
-    """Get the index for a dataset, as a nested dictionary
+    """Get the index for a dataset, as a nested dictionary. Each index file is only parsed once, and parsed again if it changes. The returned dictionary is shared between callers, so don't modify it.
 
     Parameters:
     dataset(str): The name of dataset you want the index of.
 
     Returns:
-    dict: The index, as a nested dictionary.
+    dict: The index, as a nested dictionary. Keys are version numbers, values are dicts where the keys are data file names, and the values are dicts with the "hash" and "url" for that file.
+    """
+    return _get_index_entry(dataset)["index"]
+
+def get_index_hashes(dataset, version):
+    """Get the hashes of the data files for a version of a dataset, from its index.
+
+    Parameters:
+    dataset (str): The name of the dataset.
+    version (str): The version number. Should have already been validated.
+
+    Returns:
+    dict: Keys are data file names, values are the hashes of those files. Shared between callers, so don't modify it.
+    """
+    return _get_index_entry(dataset)["hashes"][version]
+
+def _get_index_entry(dataset):
+    """Get a dataset's entry in the index registry, parsing its index file if we haven't yet, or if it's changed since we last did.
+
+    Parameters:
+    dataset(str): The name of dataset you want the index of.
+
+    Returns:
+    dict: The registry entry for the dataset. Has the keys "stamp", "index", and "hashes".
     """
     dataset_path = get_dataset_path(dataset)
     index_file = "index.txt"
@@ -157,6 +197,13 @@ def get_index(dataset):
         else:
             raise DatasetNotInstalledError(f"{dataset} dataset is not installed. To install, run \"cptac.download(dataset='{dataset}')\".")
 
+    # If the index file has the same modification time and size as when we last parsed it, we can use what we parsed then
+    index_stat = os.stat(index_path)
+    stamp = (index_stat.st_mtime_ns, index_stat.st_size)
+    entry = _index_registry.get(dataset)
+    if entry is not None and entry["stamp"] == stamp:
+        return entry
+
     with open(index_path, 'r') as index_file:
         index_lines = index_file.readlines()
 
@@ -175,7 +222,12 @@ def get_index(dataset):
             index[version][file_name] = {}
             index[version][file_name]["hash"] = file_hash
             index[version][file_name]["url"] = file_url
-    return index
+
+    hashes = {version: {file_name: file_index["hash"] for file_name, file_index in version_index.items()} for version, version_index in index.items()}
+
+    entry = {"stamp": stamp, "index": index, "hashes": hashes}
+    _index_registry[dataset] = entry
+    return entry
 
 def parse_tsv_dict(path):
     """Read in a dictionary from the given two column tsv file.
@@ -227,3 +279,56 @@ def hash_bytes(bytes):
     hasher.update(bytes)
     hash = hasher.hexdigest()
     return hash
+
+def read_gct(file_path, na_values=None):
+    """Read a GCT file. Reads the header to find out which columns are row annotations and how many column annotation rows there are, so the data values can be parsed straight into floats, without parsing everything as strings first.
+
+    Parameters:
+    file_path (str): The path to the GCT file. Can be gzipped. Must be GCT version 1.2 or 1.3.
+    na_values (list of str, optional): Extra data values to read as NaN, on top of read_csv's defaults, for files with stray missing value markers. Not applied to the row annotations. Default of None adds none.
+
+    Returns:
+    pandas.DataFrame: The row annotations, as strings. Each row is one feature (e.g. a gene or a site), in the same order as in the file, indexed by its position in the file.
+    pandas.DataFrame: The data values, as floats, with samples as the index and features as the columns. The columns are the positions of the features in the file, so they match the index of the row annotations.
+    """
+    file_opener = gzip.open if file_path.endswith(".gz") else open
+    with file_opener(file_path, 'rt') as gct_file:
+        gct_version = gct_file.readline().strip()
+        dimensions = gct_file.readline().split()
+
+    # In GCT 1.3, the second line gives the number of row annotation columns and column annotation rows. GCT 1.2 always has just one row annotation column (Description), and no column annotation rows.
+    if gct_version == "#1.3":
+        num_row_annotations = int(dimensions[2])
+        num_col_annotations = int(dimensions[3])
+    elif gct_version == "#1.2":
+        num_row_annotations = 1
+        num_col_annotations = 0
+    else:
+        raise InvalidFileFormatError(f"{os.path.basename(file_path)} is not a valid GCT file. Expected the first line to be '#1.2' or '#1.3', but it was '{gct_version}'.")
+
+    # The header is the third line. The first column is the feature id, then the row annotations, then the samples.
+    col_names = pd.read_csv(file_path, sep='\t', skiprows=2, nrows=0).columns
+    annotation_cols = col_names[:num_row_annotations + 1]
+    col_dtypes = {col: object for col in annotation_cols}
+    col_dtypes.update({col: "float64" for col in col_names[num_row_annotations + 1:]})
+
+    col_annotation_rows = range(3, 3 + num_col_annotations) # The column annotation rows come right after the header. We skip them, since they duplicate the metadata tables.
+    skiprows = [0, 1] + list(col_annotation_rows)
+    if na_values is not None:
+        na_values = {col: na_values for col in col_names[num_row_annotations + 1:]} # Only for the data values, so annotations like "na" gene symbols are left for the loaders to filter
+    try:
+        df = pd.read_csv(file_path, sep='\t', skiprows=skiprows, dtype=col_dtypes, na_values=na_values)
+    except ValueError: # Some value isn't a number or one of read_csv's missing value markers. Find it, so the error says what it was.
+        df = pd.read_csv(file_path, sep='\t', skiprows=skiprows, dtype=object, na_values=na_values)
+        for col in col_names[num_row_annotations + 1:]:
+            values = df[col]
+            bad_values = values[pd.to_numeric(values, errors="coerce").isnull() & values.notnull()]
+            if len(bad_values) > 0:
+                raise InvalidFileFormatError(f"{os.path.basename(file_path)} has a value in column '{col}' that isn't a number: '{bad_values.iloc[0]}'. If it marks a missing value, pass it to read_gct in na_values.")
+        raise
+    data = df.drop(columns=annotation_cols)
+
+    row_annotations = df[annotation_cols]
+    data = data.transpose()
+
+    return row_annotations, data
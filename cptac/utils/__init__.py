@@ -9,41 +9,60 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-# Function imports
-from .stats_utils import (
-        permutation_test_corr,
-        permutation_test_means,
-        wrap_pearson_corr,
-        wrap_ttest
-    )
-
-from .pathway_utils import (
-        # Pathway member query functions
-        get_pathways_with_proteins,
-        get_proteins_in_pathways,
-
-        # WikiPathways functions
-        get_interacting_proteins_wikipathways,
-        list_pathways_wikipathways,
-
-        # Reactome functions
-        reactome_pathway_overlay,
-        reactome_enrichment_analysis,
-
-        # Other pathway databases functions
-        get_interacting_proteins_biogrid,
-        get_interacting_proteins_bioplex,
-        get_interacting_proteins_string
-    )
-
-from .other_utils import (
-        # Protein list getters
-        get_corum_protein_lists,
-        get_hgnc_protein_lists,
-
-        # Other functions
-        get_frequently_mutated,
-        reduce_multiindex,
-        parse_hotspot,
-        search
-    )
+import importlib
+
+# Function imports. The submodules pull in heavy dependencies like scipy and statsmodels, so we don't import them until one of their functions is first used.
+_FUNCTION_MODULES = {
+    # stats_utils
+    "permutation_test_corr": "stats_utils",
+    "permutation_test_means": "stats_utils",
+    "wrap_pearson_corr": "stats_utils",
+    "wrap_ttest": "stats_utils",
+
+    # pathway_utils
+    # Pathway member query functions
+    "get_pathways_with_proteins": "pathway_utils",
+    "get_proteins_in_pathways": "pathway_utils",
+
+    # WikiPathways functions
+    "get_interacting_proteins_wikipathways": "pathway_utils",
+    "list_pathways_wikipathways": "pathway_utils",
+
+    # Reactome functions
+    "reactome_pathway_overlay": "pathway_utils",
+    "reactome_enrichment_analysis": "pathway_utils",
+
+    # Other pathway databases functions
+    "get_interacting_proteins_biogrid": "pathway_utils",
+    "get_interacting_proteins_bioplex": "pathway_utils",
+    "get_interacting_proteins_string": "pathway_utils",
+
+    # other_utils
+    # Protein list getters
+    "get_corum_protein_lists": "other_utils",
+    "get_hgnc_protein_lists": "other_utils",
+
+    # Other functions
+    "get_frequently_mutated": "other_utils",
+    "reduce_multiindex": "other_utils",
+    "parse_hotspot": "other_utils",
+    "search": "other_utils",
+}
+
+__all__ = list(_FUNCTION_MODULES.keys())
+_SUBMODULES = sorted(set(_FUNCTION_MODULES.values()))
+
+def __getattr__(name):
+    """Import the submodule for a function the first time the function is used, or a submodule the first time it's used itself."""
+    if name in _SUBMODULES:
+        return importlib.import_module("." + name, __name__) # Importing a submodule also sets it as an attribute of the package, so we don't need to save it
+    if name not in _FUNCTION_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module("." + _FUNCTION_MODULES[name], __name__)
+    value = getattr(module, name)
+    globals()[name] = value # So we only go through __getattr__ once for each function
+    return value
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(__all__) | set(_SUBMODULES))
@@ -237,23 +237,22 @@ the gene was mutated once per sample."""
 
 def get_frequently_mutated(cancer_object, cutoff = 0.1):  
     # Get total tumor count
-    clinical_df = cancer_object.get_clinical()
+    clinical_df = cancer_object.get_clinical(copy=False)
     tumor_status = clinical_df[['Sample_Tumor_Normal']]
     tumor = tumor_status.loc[tumor_status['Sample_Tumor_Normal'] == 'Tumor']
     total_tumor_count = float(len(tumor))
     
-    # Get mutations data frame
-    somatic_mutations = cancer_object.get_somatic_mutation() 
+    # Get mutations data frame, and the dataset's index of which of its rows belong to each gene, so we can count samples for every gene at once instead of grouping the table by gene
+    gene_index, offsets, positions = cancer_object._get_gene_mutation_rows()
+    somatic_mutations = cancer_object._get_dataframe("somatic_mutation", copy=False)
+    row_genes = np.full(len(somatic_mutations), -1)
+    row_genes[positions] = np.repeat(np.arange(len(gene_index)), np.diff(offsets))
+    row_samples = pd.factorize(somatic_mutations.index)[0]
+    mutations = pd.Series(somatic_mutations['Mutation'].to_numpy(dtype=object))
 
     # Drop silent mutations for Hnscc, Ovarian, and Ccrcc dataset, and synonymous SNV (i.e. silent) mutations in HNSCC
-    if 'Silent' in somatic_mutations['Mutation'].unique():
-        somatic_mutations = somatic_mutations.loc[somatic_mutations['Mutation'] != 'Silent']
-    if 'RNA' in somatic_mutations['Mutation'].unique():
-        somatic_mutations = somatic_mutations.loc[somatic_mutations['Mutation'] != 'RNA'] #ignore RNA in LSCC
-    if 'synonymous SNV' in somatic_mutations['Mutation'].unique():
-        somatic_mutations = somatic_mutations.loc[somatic_mutations['Mutation'] != 'synonymous SNV']
-        
-    origin_df = somatic_mutations.reset_index() #prepare to count unique samples
+    # Also ignore RNA in LSCC
+    kept = ~mutations.isin(['Silent', 'RNA', 'synonymous SNV']).to_numpy()
         
     # Create two categories in Mutation column - 'M': Missense, 'T': Truncation
     if cancer_object.get_cancer_type() in ('hnscc') and cancer_object.version() == '0.1':
@@ -274,64 +273,68 @@ def get_frequently_mutated(cancer_object, cutoff = 0.1):
             'Missense_Mutation': 'M', 'Frame_Shift_Del': 'T','Nonsense_Mutation': 'T', 
             'Splice_Site': 'T', 'Frame_Shift_Ins': 'T','Nonstop_Mutation':'T'}
     
-    mutations_replaced_M_T = origin_df.replace(missense_truncation_groups)
+    mutations_replaced_M_T = mutations.replace(missense_truncation_groups)
     
     # replace non_coding mutations for Gbm
-    unique_mutations = len(mutations_replaced_M_T['Mutation'].unique())
+    unique_mutations = len(mutations_replaced_M_T[kept].unique())
     gbm = False
     if cancer_object.get_cancer_type() == 'gbm':
         gbm = True
         non_coding = {'Intron': 'NC', 'RNA': 'NC', "5'Flank": 'NC', "3'Flank": 'NC', 
             "5'UTR": 'NC', "3'UTR": 'NC', 'Splice_Region' : 'NC'}
         mutations_replaced_M_T = mutations_replaced_M_T.replace(non_coding)
-        unique_mutations_2 = len(mutations_replaced_M_T['Mutation'].unique())
         
     elif unique_mutations != 2: # Check that all mutation names are catagorized
         print('Warning: New mutation name not classified. Counts will be affected.')
-        print(mutations_replaced_M_T['Mutation'].unique())
+        print(mutations_replaced_M_T[kept].unique())
+    mutation_groups = mutations_replaced_M_T.to_numpy()
     
     # Find frequently mutated genes (total fraction > cutoff)
     # Same steps will be repeated for finding the missense and truncation mutation frequencies
-    # Step 1 - group by gene and count unique samples
+    # Step 1 - count unique samples for each gene
     # Step 2 - format
     # Step 3 - filter using the cutoff and create fraction 
-    count_mutations = origin_df.groupby(['Gene']).nunique()
-    count_mutations = count_mutations.rename(columns={"Patient_ID": "Unique_Samples_Mut"}) # Step 2 
-    count_mutations = count_mutations.drop(['Mutation', 'Location'], axis = 1)
-    fraction_mutated = count_mutations.apply(lambda x: x / total_tumor_count) # Step 3 
-    fraction_greater_than_cutoff = fraction_mutated.where(lambda x: x > cutoff) #na used when not > cutoff
-    filtered_gene_df = fraction_greater_than_cutoff.dropna() # drop genes below cutoff
-    
+    has_mutations = np.bincount(row_genes[kept & (row_genes >= 0)], minlength=len(gene_index)) > 0
+    count_mutations = _count_gene_samples(row_genes, row_samples, kept, len(gene_index)) # Step 1
+    fraction_mutated = count_mutations / total_tumor_count # Step 3
+    passed = has_mutations & (fraction_mutated > cutoff) # drop genes below cutoff
+    freq_mutated_df = pd.DataFrame({"Unique_Samples_Mut": fraction_mutated[passed]}, index=pd.Index(gene_index[passed], name='Gene')) # Step 2
     
     # Create and join Missense column (following similar steps as seen above) *Counts missense once in sample
-    miss = mutations_replaced_M_T.loc[mutations_replaced_M_T['Mutation'] == 'M']
-    count_miss = miss.groupby(['Gene']).nunique()
-    missense_df = count_miss.rename(columns={"Patient_ID": "Missense_Mut"})
-    missense_df = missense_df.drop(['Mutation', 'Location'], axis = 1)
-    fraction_missense = missense_df.apply(lambda x: x / total_tumor_count)
-    freq_mutated_df = filtered_gene_df.join(fraction_missense, how='left').fillna(0)
+    count_miss = _count_gene_samples(row_genes, row_samples, kept & (mutation_groups == 'M'), len(gene_index))
+    freq_mutated_df["Missense_Mut"] = count_miss[passed] / total_tumor_count
     
     # Create and join Truncation column (following similar steps as seen above)
-    trunc = mutations_replaced_M_T.loc[mutations_replaced_M_T['Mutation'] == 'T']
-    count_trunc = trunc.groupby(['Gene']).nunique()
-    truncation_df = count_trunc.rename(columns={"Patient_ID": "Truncation_Mut"})
-    truncation_df = truncation_df.drop(['Mutation', 'Location'], axis = 1)
-    fraction_truncation = truncation_df.apply(lambda x: x / total_tumor_count)
-    freq_mutated_df = freq_mutated_df.join(fraction_truncation, how='left').fillna(0)
+    count_trunc = _count_gene_samples(row_genes, row_samples, kept & (mutation_groups == 'T'), len(gene_index))
+    freq_mutated_df["Truncation_Mut"] = count_trunc[passed] / total_tumor_count
     
     if gbm == True:
         # Create and join non-coding column (following similar steps as seen above)
-        nc = mutations_replaced_M_T.loc[mutations_replaced_M_T['Mutation'] == 'NC']
-        count_nc = nc.groupby(['Gene']).nunique()
-        nc_df = count_nc.rename(columns={"Patient_ID": "Non-Coding"})
-        nc_df = nc_df.drop(['Mutation', 'Location'], axis = 1)
-        fraction_nc = nc_df.apply(lambda x: x / total_tumor_count)
-        freq_mutated_df = freq_mutated_df.join(fraction_nc, how='left').fillna(0)
+        count_nc = _count_gene_samples(row_genes, row_samples, kept & (mutation_groups == 'NC'), len(gene_index))
+        freq_mutated_df["Non-Coding"] = count_nc[passed] / total_tumor_count
         
+    freq_mutated_df = freq_mutated_df.sort_index() #genes in alphabetical order
     freq_mutated_df = freq_mutated_df.reset_index() #move genes to their own column
     
     return freq_mutated_df
 
+def _count_gene_samples(row_genes, row_samples, rows, num_genes):
+    """Count the unique samples with mutations in each gene, for get_frequently_mutated.
+
+    Parameters:
+    row_genes (numpy.ndarray of int): The gene code of each row in the somatic_mutation table. -1 for rows with no gene.
+    row_samples (numpy.ndarray of int): The sample code of each row. -1 for rows with no sample.
+    rows (numpy.ndarray of bool): Which rows to count.
+    num_genes (int): The number of gene codes.
+
+    Returns:
+    numpy.ndarray: The number of unique samples for each gene code.
+    """
+    rows = rows & (row_genes >= 0) & (row_samples >= 0)
+    num_samples = row_samples.max() + 1 if len(row_samples) > 0 else 1
+    gene_samples = np.unique(row_genes[rows] * num_samples + row_samples[rows])
+    return np.bincount(gene_samples // num_samples, minlength=num_genes)
+
 
 def parse_hotspot(path, mut_df):
     '''
@@ -87,29 +87,12 @@ def wrap_ttest(df, label_column, comparison_columns=None, alpha=.05, equal_var=T
             comparison_columns = list(df.columns)
             comparison_columns.remove(label_column)
 
-        '''Determine the number of real valued columns on which we will do t-tests'''
-        number_of_comparisons = len(comparison_columns)
-
-        '''Store comparisons and p-values in two arrays'''
-        comparisons = []
-        pvals = []
-
-        '''Loop through each comparison column, perform the t-test, and record the p-val'''
-
-        for column in comparison_columns:
-            if len(partition1[column].dropna(axis=0)) <= mincount:
-                continue
-            elif len(partition2[column].dropna(axis=0)) <= mincount:
-                continue
-            else:
-                stat, pval = scipy.stats.ttest_ind(
-                    a=partition1[column].dropna(axis=0),
-                    b=partition2[column].dropna(axis=0), 
-                    equal_var=equal_var
-                )
-
-                comparisons.append(column)
-                pvals.append(pval)
+        '''Compute the t-test for every comparison column at once, skipping columns that don't have more than mincount values in both groups'''
+        values1 = partition1[comparison_columns].to_numpy(dtype=float)
+        values2 = partition2[comparison_columns].to_numpy(dtype=float)
+        t_stats, pvals, tested = _ttest_columns(values1, values2, equal_var=equal_var, mincount=mincount)
+        comparisons = np.asarray(comparison_columns, dtype=object)[tested]
+        pvals = pvals[tested]
 
         if len(pvals) == 0: # None of the groups had enough members to pass the mincount
             raise InvalidParameterError("No groups had enough members to pass mincount; no tests run.")
@@ -118,28 +101,12 @@ def wrap_ttest(df, label_column, comparison_columns=None, alpha=.05, equal_var=T
         results = statsmodels.stats.multitest.multipletests(pvals=pvals, alpha=alpha, method=correction_method)
         reject = results[0]
 
-        '''Format results in a pandas dataframe'''
-        results_df = pd.DataFrame(columns=['Comparison','P_Value'])
-
-        '''If return all, add all comparisons and p-values to dataframe'''
-        if return_all:
-            if pval_return_corrected:
-                results_df['Comparison'] = comparisons
-                results_df['P_Value'] = results[1]
-
-            else:
-                results_df['Comparison'] = comparisons
-                results_df['P_Value'] = pvals
-
-            '''Else only add significant comparisons'''
-        else:
-            for i in range(0, len(reject)):
-                if reject[i]:
-                    if pval_return_corrected:
-                        results_df = results_df.append({'Comparison':comparisons[i],'P_Value':results[1][i]}, ignore_index=True)
-                    else:
-                        results_df = results_df.append({'Comparison':comparisons[i],'P_Value':pvals[i]}, ignore_index=True)
-
+        '''Format results in a pandas dataframe. If return all, include all comparisons and p-values, else only the significant ones.'''
+        reported_pvals = results[1] if pval_return_corrected else pvals
+        if not return_all:
+            comparisons = comparisons[reject]
+            reported_pvals = reported_pvals[reject]
+        results_df = pd.DataFrame({'Comparison': comparisons, 'P_Value': reported_pvals})
 
         '''Sort dataframe by ascending p-value'''
         results_df = results_df.sort_values(by='P_Value', ascending=True)
@@ -157,6 +124,60 @@ def wrap_ttest(df, label_column, comparison_columns=None, alpha=.05, equal_var=T
         return None
 
 
+def _nan_column_stats(values):
+    """Count the non-NaN values in each column of a matrix, and compute their means and sample variances, ignoring NaNs.
+
+    Parameters:
+    values (numpy.ndarray): 2D array of floats, with a column for each comparison.
+
+    Returns:
+    numpy.ndarray: The number of non-NaN values in each column.
+    numpy.ndarray: The mean of each column. NaN for columns with no values.
+    numpy.ndarray: The sample variance (with one degree of freedom) of each column. NaN for columns with fewer than 2 values.
+    """
+    present = ~np.isnan(values)
+    counts = present.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.where(present, values, 0).sum(axis=0) / counts
+        variances = (np.where(present, values - means, 0) ** 2).sum(axis=0) / (counts - 1)
+    return counts, means, variances
+
+def _ttest_columns(values1, values2, equal_var=True, mincount=0):
+    """Do an independent two-sample t-test on each column of two matrices at once, ignoring NaNs. Gives the same results as running scipy.stats.ttest_ind on each column with its NaNs dropped.
+
+    Parameters:
+    values1 (numpy.ndarray): 2D array of floats with the first group's values, with a column for each comparison.
+    values2 (numpy.ndarray): 2D array of floats with the second group's values, with the same columns.
+    equal_var (bool, optional): If True, do Student's t-test, which assumes the groups have the same variance. If False, do Welch's t-test. Default True.
+    mincount (int, optional): Only test columns with more than this many values in both groups. Default 0.
+
+    Returns:
+    numpy.ndarray: The t statistic for each column. NaN for columns that weren't tested.
+    numpy.ndarray: The two-sided p-value for each column. NaN for columns that weren't tested.
+    numpy.ndarray: Boolean array saying which columns were tested.
+    """
+    n1, mean1, var1 = _nan_column_stats(values1)
+    n2, mean2, var2 = _nan_column_stats(values2)
+    tested = (n1 > mincount) & (n2 > mincount)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if equal_var:
+            dof = n1 + n2 - 2.0
+            pooled_var = ((n1 - 1) * var1 + (n2 - 1) * var2) / dof
+            std_err = np.sqrt(pooled_var * (1.0 / n1 + 1.0 / n2))
+        else:
+            var_mean1 = var1 / n1
+            var_mean2 = var2 / n2
+            dof = (var_mean1 + var_mean2) ** 2 / (var_mean1 ** 2 / (n1 - 1) + var_mean2 ** 2 / (n2 - 1))
+            std_err = np.sqrt(var_mean1 + var_mean2)
+
+        t_stats = (mean1 - mean2) / std_err
+        pvals = 2 * scipy.stats.t.sf(np.abs(t_stats), dof)
+
+    t_stats[~tested] = np.nan
+    pvals[~tested] = np.nan
+    return t_stats, pvals, tested
+
 '''
 @Param df: Dataframe.Each column is a different gene/ comparison. Rows contains numeric values (such as proteomics) for correlation test
 @Param label_column: String. Name of column that will be your x axis and will be compared to all values in df unless otherwise specified.
@@ -166,9 +187,11 @@ All other columns beside label column unless specified here.
 @Param correction_method: String. Specifies method of adjustment for multiple testing. See -
 https://www.statsmodels.org/stable/generated/statsmodels.stats.multitest.multipletests.html
     - for documentation and available methods.
+@Param method (default = 'pearson'): String. 'pearson' for the Pearson correlation coefficient, or 'spearman' for the Spearman rank correlation.
 This function will return a data frame with the columns comparison, the correlation coefficient, and the p value.
+Each comparison uses the samples that have values for both it and the label column, and is only included if there are more than 20 of them.
 '''
-def wrap_pearson_corr(df,label_column, alpha=.05,comparison_columns=None,correction_method='bonferroni',return_all = True):
+def wrap_pearson_corr(df,label_column, alpha=.05,comparison_columns=None,correction_method='bonferroni',return_all = True, method='pearson'):
 
 
     #df = df.dropna(axis=1, how="all")
@@ -177,52 +200,70 @@ def wrap_pearson_corr(df,label_column, alpha=.05,comparison_columns=None,correct
     if not comparison_columns:
         comparison_columns = list(df.columns)
         comparison_columns.remove(label_column)
-    '''Store comparisons,p-values, correlation in their own array'''
-    comparisons = []
-    pvals = []
-    correlation=[]
-
-
-    '''Format results in a pandas dataframe'''
-    newdf = pd.DataFrame(columns=['Comparison','Correlation','P_value'])
-    for gene in comparison_columns:
-        #create subset df with interacting gene/ gene (otherwise drop NaN drops everything)
-        df_subset = df[[label_column,gene]]
-        #do a linear regression to see if it's a meaningful association
-        #dropna will remove rows with nan
-        df_subset = df_subset.dropna(axis=0, how="any")
-        count_row = df_subset.shape[0]
-        if count_row > 20:
-            x1 = df_subset[[label_column]].values
-            y1 = df_subset[[gene]].values
-            x1 = x1[:,0]
-            y1 = y1[:,0]
-            corr, pval = scipy.stats.pearsonr(x1,y1)
-
-            comparisons.append(gene)
-            pvals.append(pval)
-            correlation.append(corr)
 
+    '''Correlate the label column with every comparison column at once, each over the samples that have values for both, and keep the ones with more than 20 samples'''
+    label_values = df[label_column].to_numpy(dtype=float)
+    comparison_values = df[comparison_columns].to_numpy(dtype=float)
+    correlation, counts, pvals = _corr_columns(label_values, comparison_values, method=method)
+    tested = counts > 20
+    comparisons = np.asarray(comparison_columns, dtype=object)[tested]
+    correlation = correlation[tested]
+    pvals = pvals[tested]
 
     '''Correct for multiple testing to determine if each comparison meets the new cutoff'''
     results = statsmodels.stats.multitest.multipletests(pvals=pvals, alpha=alpha, method=correction_method)
     reject = results[0]
 
-    if return_all:
-        for i in range(0,len(comparisons)):
-            newdf = newdf.append({'Comparison': comparisons[i],"Correlation": correlation[i],'P_value': pvals[i]}, ignore_index=True)
-
-    '''Else only add significant comparisons'''
-    if (return_all == False):
-            for i in range(0, len(reject)):
-                if reject[i]:
-                    newdf = newdf.append({'Comparison': comparisons[i],"Correlation": correlation[i],'P_value': pvals[i]}, ignore_index=True)
+    '''Format results in a pandas dataframe. If return all, include all comparisons, else only the significant ones.'''
+    if not return_all:
+        comparisons = comparisons[reject]
+        correlation = correlation[reject]
+        pvals = pvals[reject]
+    newdf = pd.DataFrame({'Comparison': comparisons, 'Correlation': correlation, 'P_value': pvals})
 
     '''Sort dataframe by ascending p-value'''
     newdf = newdf.sort_values(by='P_value', ascending=True)
     '''If results df is not empty, return it, else return None'''
     return newdf
 
+def _corr_columns(x, values, method="pearson"):
+    """Correlate one variable with each column of a matrix at once, ignoring NaNs. Each column is correlated over just the rows where both it and the variable have values. Gives the same results as running scipy.stats.pearsonr or scipy.stats.spearmanr on each pair with its NaNs dropped.
+
+    Parameters:
+    x (numpy.ndarray): 1D array of floats with the variable's value in each row.
+    values (numpy.ndarray): 2D array of floats, with the same rows, and a column for each comparison.
+    method (str, optional): "pearson" for the Pearson correlation coefficient, or "spearman" for the Spearman rank correlation, which is the Pearson correlation of the ranks. Default "pearson".
+
+    Returns:
+    numpy.ndarray: The correlation coefficient for each column. NaN for columns with fewer than 2 rows, or with a constant variable or column over their rows.
+    numpy.ndarray: The number of rows each column was correlated over.
+    numpy.ndarray: The two-sided p-value for each column, for the null hypothesis that the correlation is zero.
+    """
+    if method not in ("pearson", "spearman"):
+        raise InvalidParameterError(f"{method} is not a valid correlation method. Valid options: 'pearson', 'spearman'.")
+
+    present = ~np.isnan(values) & ~np.isnan(x)[:, np.newaxis]
+    counts = present.sum(axis=0)
+    x_values = np.where(present, x[:, np.newaxis], np.nan)
+    y_values = np.where(present, values, np.nan)
+
+    if method == "spearman": # Rank each column's rows among just the rows it's correlated over. Ties get their average rank, like scipy does.
+        x_values = pd.DataFrame(x_values).rank(axis=0).to_numpy()
+        y_values = pd.DataFrame(y_values).rank(axis=0).to_numpy()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_devs = np.where(present, x_values - np.nansum(x_values, axis=0) / counts, 0)
+        y_devs = np.where(present, y_values - np.nansum(y_values, axis=0) / counts, 0)
+        corrs = (x_devs * y_devs).sum(axis=0) / np.sqrt((x_devs ** 2).sum(axis=0) * (y_devs ** 2).sum(axis=0))
+        corrs = np.clip(corrs, -1.0, 1.0) # Rounding can push perfect correlations just past 1
+
+        # Test against a t distribution with n - 2 degrees of freedom, which is what scipy does too
+        dof = counts - 2.0
+        t_stats = corrs * np.sqrt(dof / ((1.0 + corrs) * (1.0 - corrs)))
+        pvals = 2 * scipy.stats.t.sf(np.abs(t_stats), dof)
+
+    return corrs, counts, pvals
+
 def permutation_test_means(group1, group2, num_permutations, paired=False):
     """Use permutation testing to calculate a P value for the difference between the means of two groups. You would use this instead of a Student's t-test if your data do not follow a normal distribution. Note that permutation tests are still subject to the assumption of the Student's t-test that if you want to see if the means of the two groups are different, they need to have the same variance.
 
@@ -0,0 +1,100 @@
+#   Copyright 2018 Samuel Payne sam_payne@byu.edu
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import os
+import time
+import threading
+import warnings
+from .version import __version__
+from .exceptions import NoInternetError, OldPackageVersionWarning
+
+VERSION_URL = "https://byu.box.com/shared/static/kbwivmqnrdnn5im2gu6khoybk5a3rfl0.txt"
+CHECK_FILE = "latest_version.txt"
+FALLBACK_CHECK_DIR = os.path.join("~", ".cache", "cptac") # Where we store the check file if the package directory is read-only
+CHECK_TTL = 24 * 60 * 60 # How long, in seconds, to trust the last version we got from the server before checking again
+CHECK_TIMEOUT = 5 # How long, in seconds, to wait for the server before giving up on the check
+DISABLE_VARIABLE = "CPTAC_NO_VERSION_CHECK"
+
+def get_check_path():
+    """Get the path to the file where we store the latest version we got from the server. This is in the package directory, unless we can't write there (for example, in a system-wide install), in which case it's in ~/.cache/cptac."""
+    path_here = os.path.abspath(os.path.dirname(__file__))
+    if os.access(path_here, os.W_OK):
+        return os.path.join(path_here, CHECK_FILE)
+    return os.path.join(os.path.expanduser(FALLBACK_CHECK_DIR), CHECK_FILE)
+
+def is_check_disabled():
+    """Check whether the user turned off the version check by setting the CPTAC_NO_VERSION_CHECK environment variable to anything other than an empty string, 0, or false."""
+    return os.environ.get(DISABLE_VARIABLE, "").strip().lower() not in ["", "0", "false"]
+
+def read_checked_version():
+    """Read the latest version we got from the server, if we got it recently enough to still trust it.
+
+    Returns:
+    str: The latest version number. An empty string if the last check couldn't reach the server, but was recent enough that we shouldn't try again yet. None if we haven't checked, or the last check is older than the TTL.
+    """
+    check_path = get_check_path()
+    try:
+        if time.time() - os.path.getmtime(check_path) > CHECK_TTL:
+            return None
+        with open(check_path, 'r') as check_file:
+            return check_file.read().strip()
+    except OSError:
+        return None
+
+def write_checked_version(remote_version):
+    """Save the latest version we got from the server, so we don't need to ask again until the TTL runs out. If we can't write the file, we just don't save it.
+
+    Parameters:
+    remote_version (str): The latest version number, or an empty string if we couldn't reach the server. Saving the failure means we don't make every import wait on another doomed check until the TTL runs out.
+    """
+    check_path = get_check_path()
+    try:
+        os.makedirs(os.path.dirname(check_path), exist_ok=True)
+        with open(check_path, 'w') as check_file:
+            check_file.write(remote_version)
+    except OSError:
+        pass
+
+def warn_if_old(remote_version):
+    """Warn the user if their version of the package is older than the latest version."""
+    if remote_version != __version__:
+        warnings.warn(f"Your version of cptac ({__version__}) is out-of-date. Latest is {remote_version}. Please run 'pip install --upgrade cptac' to update it.", OldPackageVersionWarning, stacklevel=2)
+
+def _check_remote_version():
+    """Get the latest version from the server, save it, and warn if we're out of date. Runs in a background thread, so it doesn't hold up the import."""
+    from .file_download import download_text # Imported here because it pulls in requests, which we don't want to slow down importing the package
+    try:
+        remote_version = download_text(VERSION_URL, timeout=CHECK_TIMEOUT)
+    except NoInternetError:
+        write_checked_version("")
+        return
+
+    write_checked_version(remote_version)
+    warn_if_old(remote_version)
+
+def check_version():
+    """Check whether the package is up-to-date, without making the caller wait on the network. If we checked with the server within the last day, we compare against the version we got then, or skip the check if the server couldn't be reached. Otherwise, we ask the server again in a background thread. Set the CPTAC_NO_VERSION_CHECK environment variable to skip the check entirely.
+
+    Returns:
+    threading.Thread: The thread checking the server, in case the caller wants to wait for it. None if we didn't need to start one.
+    """
+    if is_check_disabled():
+        return None
+
+    remote_version = read_checked_version()
+    if remote_version is not None:
+        if remote_version:
+            warn_if_old(remote_version)
+        return None
+
+    thread = threading.Thread(target=_check_remote_version, name="cptac-version-check", daemon=True)
+    thread.start()
+    return thread
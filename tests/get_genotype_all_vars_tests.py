@@ -229,6 +229,29 @@ def test_genotype_hnscc_KRAS():
     
     print_test_result(PASS)
 
+
+def test_genotype_matrix_gbm():
+    # test that the matrix has the same genotypes as get_genotype_all_vars, for genes with somatic mutation data
+    print('Running test_genotype_matrix_gbm...')
+    genes = ['TP53', 'PTEN', 'EGFR']
+    df = g.get_genotype_matrix(genes)
+
+    PASS = True
+    exp_headers = [gene + '_' + col for gene in genes for col in ['Mutation', 'Location', 'Mutation_Status']]
+    if list(df.columns) != exp_headers:
+        print(f"Column headers did not match.\n\tExpected: {exp_headers}\n\tActual: {list(df.columns)}\n")
+        PASS = False
+
+    for gene in genes:
+        single = g.get_genotype_all_vars(gene)
+        for col in ['Mutation', 'Location', 'Mutation_Status']:
+            matrix_col = df[gene + '_' + col].astype(object)
+            if not matrix_col.equals(single[col]):
+                print(f"{gene} {col} values did not match get_genotype_all_vars.")
+                PASS = False
+
+    print_test_result(PASS)
+
     
 k = cptac.Ccrcc()
 g = cptac.Gbm()
@@ -238,5 +261,6 @@ print("\nRunning tests:\n")
 test_genotype_ccrcc_KRAS()
 test_genotype_gbm_KRAS()
 test_genotype_hnscc_KRAS()
+test_genotype_matrix_gbm()
 
 print("Version:", cptac.version())
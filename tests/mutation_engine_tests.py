@@ -0,0 +1,279 @@
+#   Copyright 2018 Samuel Payne sam_payne@byu.edu
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+# Tests for the engines behind the mutation joins and multi_join: _get_genes_mutations, _filter_multiple_mutations, get_genotype_matrix, and _plan_multi_join.
+# These run on small tables made here instead of on a real dataset, so we know exactly which mutation should win each tie.
+
+import unittest.mock
+import warnings
+
+import numpy as np
+import pandas as pd
+import cptac
+from cptac.dataset import Dataset
+from cptac.exceptions import ParameterWarning
+
+class SyntheticDataset(Dataset):
+    """A dataset whose tables are passed in, instead of parsed from data files."""
+
+    def __init__(self, cancer_type, tables):
+        # There are no data files to find, so we skip that part of the parent __init__
+        with unittest.mock.patch("cptac.dataset.validate_version", return_value="0.0"), \
+                unittest.mock.patch("cptac.dataset.get_version_files_paths", return_value=[]):
+            super().__init__(cancer_type=cancer_type, version="0.0", valid_versions=["0.0"], data_files={"0.0": []}, no_internet=True)
+
+        self._data = tables
+        self._compact_mutation_tables() # Store the mutations the way a real dataset does after loading
+
+def make_dataset(cancer_type="endometrial"):
+    """Make a dataset with mutations chosen to exercise each rule for picking one mutation per sample and gene."""
+    rows = [
+        ("S1", "TP53", "Missense_Mutation", "p.R273H"),
+        ("S1", "TP53", "Nonsense_Mutation", "p.R306*"), # Truncations beat missenses, even later in the sequence
+        ("S1", "TP53", "Missense_Mutation", "p.G12D"),
+        ("S2", "TP53", "Missense_Mutation", "p.R273H"),
+        ("S2", "TP53", "Missense_Mutation", "p.G12D"), # Same rank, so the earliest in the sequence wins
+        ("S3", "TP53", "Missense_Mutation", np.nan),
+        ("S3", "TP53", "Missense_Mutation", "p.V100A"), # Missing locations go last
+        ("S4", "TP53", "Silent", "p.A5A"),
+        ("S1", "PTEN", "Frame_Shift_Del", "p.K200fs"),
+        ("S1", "PTEN", "Nonsense_Mutation", "p.K100*"),
+        ("S1", "PTEN", "Frame_Shift_Del", "p.K100fs"), # Ties at the same position go to the mutation type that showed up first in the group
+        ("S2", "PTEN", "Missense_Mutation", np.nan), # The only mutation, so it's chosen with its missing location
+        ("S4", "PTEN", "Unknown_Type", "p.A1B"), # Not a known type, so it gets a warning when it's chosen over the Silent
+        ("S4", "PTEN", "Silent", "p.A5A"),
+        ("S1", "EGFR", "Silent", "p.A5A"),
+        ("S1", "EGFR", "Intron", np.nan), # Noncoding, which only ranks above other mutations for gbm
+    ]
+    somatic_mutation = pd.DataFrame(rows, columns=["Patient_ID", "Gene", "Mutation", "Location"]).set_index("Patient_ID")
+
+    clinical = pd.DataFrame({"Sample_Tumor_Normal": ["Tumor", "Tumor", "Tumor", "Tumor"]}, index=pd.Index(["S1", "S2", "S3", "S4"], name="Patient_ID"))
+    clinical.columns.name = "Name"
+
+    # PTEN is deleted in S3, which has no PTEN mutations, and KRAS, which has no mutations at all, is amplified in S1
+    cnv = pd.DataFrame({"TP53": [0.0, 0.0, 0.0, 0.0], "PTEN": [0.0, 0.0, -1.0, 0.0], "KRAS": [0.5, 0.0, 0.0, 0.0]}, index=pd.Index(["S1", "S2", "S3", "S4"], name="Patient_ID"))
+    cnv.columns.name = "Name"
+
+    return SyntheticDataset(cancer_type, {"clinical": clinical, "somatic_mutation": somatic_mutation, "CNV": cnv})
+
+def print_test_result(PASS):
+    """Prints the result of a test, based on a bool.
+
+    Parameters:
+    PASS (bool): Whether or not the test passed.
+    """
+    if PASS:
+        print('\tPASS')
+    else:
+        print('\tFAIL\n')
+
+def check_frame(act, exp):
+    """Check that a dataframe has the expected index, columns, and values, and print the differences if it doesn't.
+
+    Parameters:
+    act (pandas.DataFrame): The dataframe to check.
+    exp (pandas.DataFrame): The expected dataframe.
+
+    Returns:
+    bool: Whether they matched.
+    """
+    if not act.index.equals(exp.index) or not act.columns.equals(exp.columns):
+        print("Dataframe axes did not match.\n\tExpected: {} {}\n\tActual: {} {}\n".format(list(exp.index), list(exp.columns), list(act.index), list(act.columns)))
+        return False
+
+    PASS = True
+    for col in exp.columns:
+        for sample in exp.index:
+            exp_val = exp.at[sample, col]
+            act_val = act.at[sample, col]
+            if isinstance(exp_val, list) or isinstance(act_val, list):
+                matches = isinstance(act_val, list) and isinstance(exp_val, list) and len(act_val) == len(exp_val) and all(a == e or (pd.isnull(a) and pd.isnull(e)) for a, e in zip(act_val, exp_val))
+            else:
+                matches = act_val == exp_val or (pd.isnull(act_val) and pd.isnull(exp_val))
+            if not matches:
+                print("Dataframe value did not match expected value.\n\tColumn: {}\n\tIndex: {}\n\tExpected: {}\n\tActual: {}\n".format(col, sample, exp_val, act_val))
+                PASS = False
+
+    return PASS
+
+def test_genes_mutations_lists():
+    print('Running test_genes_mutations_lists...')
+    ds = make_dataset()
+    df = ds._get_genes_mutations(["TP53", "PTEN"], mutations_filter=None)
+
+    # Every mutation is kept, in table order, and samples without mutations in a gene are NaN
+    exp = pd.DataFrame({
+        "TP53_Mutation": [["Missense_Mutation", "Nonsense_Mutation", "Missense_Mutation"], ["Missense_Mutation", "Missense_Mutation"], ["Missense_Mutation", "Missense_Mutation"], ["Silent"]],
+        "TP53_Location": [["p.R273H", "p.R306*", "p.G12D"], ["p.R273H", "p.G12D"], [np.nan, "p.V100A"], ["p.A5A"]],
+        "TP53_Mutation_Status": ["Multiple_mutation", "Multiple_mutation", "Multiple_mutation", "Single_mutation"],
+        "PTEN_Mutation": [["Frame_Shift_Del", "Nonsense_Mutation", "Frame_Shift_Del"], ["Missense_Mutation"], np.nan, ["Unknown_Type", "Silent"]],
+        "PTEN_Location": [["p.K200fs", "p.K100*", "p.K100fs"], [np.nan], np.nan, ["p.A1B", "p.A5A"]],
+        "PTEN_Mutation_Status": ["Multiple_mutation", "Single_mutation", np.nan, "Multiple_mutation"],
+    }, index=pd.Index(["S1", "S2", "S3", "S4"], name="Patient_ID"), dtype=object)
+
+    PASS = check_frame(df, exp)
+    print_test_result(PASS)
+
+def test_filter_default_hierarchy():
+    print('Running test_filter_default_hierarchy...')
+    ds = make_dataset()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", ParameterWarning) # The unknown mutation type warning is checked in test_filter_unknown_mutation_warning
+        df = ds._get_genes_mutations(["TP53", "PTEN"], mutations_filter=[])
+
+    exp = pd.DataFrame({
+        "TP53_Mutation": ["Nonsense_Mutation", "Missense_Mutation", "Missense_Mutation", "Silent"],
+        "TP53_Location": ["p.R306*", "p.G12D", "p.V100A", "p.A5A"],
+        "TP53_Mutation_Status": ["Multiple_mutation", "Multiple_mutation", "Multiple_mutation", "Single_mutation"],
+        "PTEN_Mutation": ["Frame_Shift_Del", "Missense_Mutation", np.nan, "Unknown_Type"],
+        "PTEN_Location": ["p.K100fs", np.nan, np.nan, "p.A1B"],
+        "PTEN_Mutation_Status": ["Multiple_mutation", "Single_mutation", np.nan, "Multiple_mutation"],
+    }, index=pd.Index(["S1", "S2", "S3", "S4"], name="Patient_ID"), dtype=object)
+
+    PASS = check_frame(df, exp)
+    print_test_result(PASS)
+
+def test_filter_given_priority():
+    print('Running test_filter_given_priority...')
+    ds = make_dataset()
+    df = ds._get_genes_mutations("TP53", mutations_filter=["Missense_Mutation"])
+
+    # The filter beats the truncation in S1, and the earliest missense wins
+    PASS = True
+    if df.at["S1", "TP53_Mutation"] != "Missense_Mutation" or df.at["S1", "TP53_Location"] != "p.G12D":
+        print("Filtered mutation did not match expected value.\n\tExpected: Missense_Mutation p.G12D\n\tActual: {} {}\n".format(df.at["S1", "TP53_Mutation"], df.at["S1", "TP53_Location"]))
+        PASS = False
+
+    print_test_result(PASS)
+
+def test_filter_unknown_mutation_warning():
+    print('Running test_filter_unknown_mutation_warning...')
+    ds = make_dataset()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        ds._get_genes_mutations("PTEN", mutations_filter=[])
+
+    # Only the unknown type that was chosen is warned about, not the Silent mutation in the same group
+    messages = [str(warning.message) for warning in caught if issubclass(warning.category, ParameterWarning)]
+    exp_messages = ["Unknown mutation type Unknown_Type. Assigned lowest priority in filtering."]
+    PASS = messages == exp_messages
+    if not PASS:
+        print("Warnings did not match.\n\tExpected: {}\n\tActual: {}\n".format(exp_messages, messages))
+
+    print_test_result(PASS)
+
+def test_filter_gbm_noncoding_priority():
+    print('Running test_filter_gbm_noncoding_priority...')
+    PASS = True
+
+    # For gbm, the noncoding Intron beats the Silent mutation, even without a location
+    gbm = make_dataset("gbm")
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        df = gbm._get_genes_mutations("EGFR", mutations_filter=[])
+    if df.at["S1", "EGFR_Mutation"] != "Intron" or not pd.isnull(df.at["S1", "EGFR_Location"]):
+        print("gbm filtered mutation did not match expected value.\n\tExpected: Intron nan\n\tActual: {} {}\n".format(df.at["S1", "EGFR_Mutation"], df.at["S1", "EGFR_Location"]))
+        PASS = False
+    if any(issubclass(warning.category, ParameterWarning) for warning in caught):
+        print("gbm noncoding mutation was warned about as an unknown type.\n")
+        PASS = False
+
+    # For other cancer types, it's just another unknown type, so the Silent mutation with a location wins
+    en = make_dataset("endometrial")
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        df = en._get_genes_mutations("EGFR", mutations_filter=[])
+    if df.at["S1", "EGFR_Mutation"] != "Silent" or df.at["S1", "EGFR_Location"] != "p.A5A":
+        print("Filtered mutation did not match expected value.\n\tExpected: Silent p.A5A\n\tActual: {} {}\n".format(df.at["S1", "EGFR_Mutation"], df.at["S1", "EGFR_Location"]))
+        PASS = False
+    messages = [str(warning.message) for warning in caught if issubclass(warning.category, ParameterWarning)]
+    if messages != ["Unknown mutation type Intron. Assigned lowest priority in filtering."]:
+        print("Warnings did not match.\n\tExpected: Unknown mutation type Intron\n\tActual: {}\n".format(messages))
+        PASS = False
+
+    print_test_result(PASS)
+
+def test_genotype_matrix_cnv_with_custom_filter():
+    print('Running test_genotype_matrix_cnv_with_custom_filter...')
+    ds = make_dataset()
+
+    # The filter doesn't rank deletions or amplifications, but they still beat the wildtype fill where there's no mutation
+    df = ds.get_genotype_matrix(["PTEN", "KRAS"], mutations_filter=["Missense_Mutation"])
+    df = df.astype(object)
+
+    exp = {
+        ("S3", "PTEN"): ("Deletion", "Deletion", "Single_mutation"),
+        ("S1", "KRAS"): ("Amplification", "Amplification", "Single_mutation"),
+        ("S2", "KRAS"): ("Wildtype_Tumor", "No_mutation", "Wildtype_Tumor"),
+        ("S2", "PTEN"): ("Missense_Mutation", np.nan, "Single_mutation"),
+    }
+
+    PASS = True
+    for (sample, gene), exp_vals in exp.items():
+        act_vals = tuple(df.at[sample, gene + "_" + field] for field in ["Mutation", "Location", "Mutation_Status"])
+        if not all(a == e or (pd.isnull(a) and pd.isnull(e)) for a, e in zip(act_vals, exp_vals)):
+            print("Genotype did not match expected value.\n\tSample: {}\n\tGene: {}\n\tExpected: {}\n\tActual: {}\n".format(sample, gene, exp_vals, act_vals))
+            PASS = False
+
+    print_test_result(PASS)
+
+def test_plan_multi_join():
+    print('Running test_plan_multi_join...')
+    ds = make_dataset()
+    PASS = True
+
+    for how in ["outer", "inner", "left", "right"]:
+        table1 = pd.DataFrame({"A": [1.0, 2.0, 3.0]}, index=pd.Index(["S3", "S1", "S2"], name="Patient_ID"))
+        table1.columns.name = "Name"
+        table2 = pd.DataFrame([[4.0, 5.0]], index=pd.Index(["S2"], name="Patient_ID"), columns=pd.MultiIndex.from_tuples([("B", "ID1"), ("C", "ID2")], names=["Name", "Database_ID"]))
+        table2 = table2.reindex(pd.Index(["S4", "S2"], name="Patient_ID"))
+
+        joined_index, kept_samples = ds._plan_multi_join([table1, table2], how)
+
+        # The planned index is the one joining the tables one at a time gives
+        exp_index = table1.index.join(table2.index, how=how)
+        if not joined_index.equals(exp_index):
+            print("Planned {} join index did not match.\n\tExpected: {}\n\tActual: {}\n".format(how, list(exp_index), list(joined_index)))
+            PASS = False
+
+        # Both tables get the same column levels
+        if table1.columns.names != table2.columns.names:
+            print("Column levels did not match after planning.\n\tTable 1: {}\n\tTable 2: {}\n".format(table1.columns.names, table2.columns.names))
+            PASS = False
+
+        # For a right join, only the samples in the later table keep their values from the earlier one
+        exp_kept = [table2.index, None] if how == "right" else [None, None]
+        for kept, exp in zip(kept_samples, exp_kept):
+            if (kept is None) != (exp is None) or (kept is not None and not kept.equals(exp)):
+                print("Kept samples for a {} join did not match.\n\tExpected: {}\n\tActual: {}\n".format(how, exp_kept, kept_samples))
+                PASS = False
+
+    # Duplicate samples mean the tables can't just be reindexed
+    table1 = pd.DataFrame({"A": [1.0, 2.0]}, index=pd.Index(["S1", "S1"], name="Patient_ID"))
+    table2 = pd.DataFrame({"B": [3.0]}, index=pd.Index(["S1"], name="Patient_ID"))
+    joined_index, kept_samples = ds._plan_multi_join([table1, table2], "outer")
+    if joined_index is not None:
+        print("Planned join index for duplicate samples should be None.\n")
+        PASS = False
+
+    print_test_result(PASS)
+
+print("\nRunning tests:\n")
+
+test_genes_mutations_lists()
+test_filter_default_hierarchy()
+test_filter_given_priority()
+test_filter_unknown_mutation_warning()
+test_filter_gbm_noncoding_priority()
+test_genotype_matrix_cnv_with_custom_filter()
+test_plan_multi_join()
+
+print("Version:", cptac.version())
@@ -0,0 +1,69 @@
+#   Copyright 2018 Samuel Payne sam_payne@byu.edu
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+# Tests that importing cptac stays cheap. Each check runs in a fresh interpreter, so nothing is already imported.
+
+import json
+import os
+import subprocess
+import sys
+
+IMPORT_OVERHEAD_LIMIT = 1 # Seconds that importing cptac may add on top of importing pandas, which it can't avoid. Tighter than a limit on the whole import would be, since pandas is most of that time and varies the most between machines.
+HEAVY_MODULES = ["requests", "bs4", "scipy", "statsmodels", "cptac.dataset", "cptac.brca", "cptac.utils.stats_utils"]
+
+def run_in_fresh_interpreter(code):
+    """Run code in a new Python process, with the version check turned off so we don't touch the network, and return what it printed to stdout."""
+    env = dict(os.environ, CPTAC_NO_VERSION_CHECK="1")
+    path_here = os.path.abspath(os.path.dirname(__file__))
+    result = subprocess.run([sys.executable, "-c", code], env=env, cwd=os.path.dirname(path_here), capture_output=True, text=True, check=True)
+    return result.stdout
+
+def test_import_overhead():
+    # Time both imports in the same process, so the machine's speed affects them the same way
+    code = (
+        "import time, json\n"
+        "start = time.perf_counter()\n"
+        "import pandas\n"
+        "pandas_done = time.perf_counter()\n"
+        "import cptac\n"
+        "cptac_done = time.perf_counter()\n"
+        "print(json.dumps([pandas_done - start, cptac_done - pandas_done]))\n"
+    )
+    runs = [json.loads(run_in_fresh_interpreter(code)) for i in range(3)]
+    pandas_time, overhead = min(runs, key=lambda run: run[1])
+    assert overhead < IMPORT_OVERHEAD_LIMIT, f"Importing cptac took {overhead:.3f} seconds on top of the {pandas_time:.3f} seconds to import pandas"
+
+def test_import_is_lazy():
+    code = (
+        "import sys, json\n"
+        "import cptac\n"
+        f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))\n"
+    )
+    assert json.loads(run_in_fresh_interpreter(code)) == []
+
+def test_lazy_names_resolve():
+    code = (
+        "import sys, json\n"
+        "import cptac\n"
+        "names = [cptac.Brca.__name__, cptac.download.__name__, cptac.utils.wrap_ttest.__name__]\n"
+        "print(json.dumps(names + ['scipy' in sys.modules]))\n"
+    )
+    assert json.loads(run_in_fresh_interpreter(code)) == ["Brca", "download", "wrap_ttest", True]
+
+def test_star_import_and_submodules():
+    code = (
+        "import sys, json\n"
+        "namespace = {}\n"
+        "exec('from cptac import *', namespace)\n"
+        "import cptac.utils\n"
+        "print(json.dumps([namespace['Brca'].__name__, 'pd' in namespace, cptac.utils.stats_utils.__name__, cptac.utils.other_utils.__name__]))\n"
+    )
+    assert json.loads(run_in_fresh_interpreter(code)) == ["Brca", False, "cptac.utils.stats_utils", "cptac.utils.other_utils"]
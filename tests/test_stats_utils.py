@@ -0,0 +1,162 @@
+#   Copyright 2018 Samuel Payne sam_payne@byu.edu
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+# Tests that the all-columns-at-once statistics in stats_utils match scipy run on one column at a time. These build their own matrices, so they don't need any datasets downloaded.
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.stats
+import warnings
+
+from cptac.utils.stats_utils import _corr_columns, _ttest_columns, wrap_pearson_corr
+
+def with_nans(values, fraction, generator):
+    """Return a copy of a matrix with about the given fraction of its values replaced by NaN."""
+    values = values.copy()
+    values[generator.random(values.shape) < fraction] = np.nan
+    return values
+
+def make_ttest_groups():
+    """Make two groups with random columns and some NaNs, plus a few columns that need special handling.
+
+    Column 5 is all NaN in the first group. Column 6 is the same constant in both groups, so its t statistic is undefined. Column 7 is constant in the first group only. Column 4 has only 2 values in the second group, to test mincount.
+    """
+    generator = np.random.default_rng(0)
+    values1 = with_nans(generator.normal(size=(12, 8)), 0.25, generator)
+    values2 = with_nans(generator.normal(loc=0.5, scale=2, size=(10, 8)), 0.25, generator)
+
+    values1[:, 5] = np.nan
+    values1[:, 6] = 2.0
+    values2[:, 6] = 2.0
+    values1[:, 7] = 3.0
+    values2[:, 4] = np.nan
+    values2[:2, 4] = [1.0, 4.0]
+    return values1, values2
+
+def expected_ttest(values1, values2, equal_var, mincount):
+    """Run scipy.stats.ttest_ind on each column with its NaNs dropped, skipping columns without more than mincount values in both groups."""
+    t_stats, pvals, tested = [], [], []
+    for col in range(values1.shape[1]):
+        group1 = values1[:, col][~np.isnan(values1[:, col])]
+        group2 = values2[:, col][~np.isnan(values2[:, col])]
+        if len(group1) > mincount and len(group2) > mincount:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning) # scipy warns about the constant column
+                result = scipy.stats.ttest_ind(group1, group2, equal_var=equal_var)
+            t_stats.append(result[0])
+            pvals.append(result[1])
+            tested.append(True)
+        else:
+            t_stats.append(np.nan)
+            pvals.append(np.nan)
+            tested.append(False)
+    return np.array(t_stats), np.array(pvals), np.array(tested)
+
+@pytest.mark.parametrize("equal_var", [True, False])
+@pytest.mark.parametrize("mincount", [0, 3])
+def test_ttest_columns_matches_scipy(equal_var, mincount):
+    values1, values2 = make_ttest_groups()
+    t_stats, pvals, tested = _ttest_columns(values1, values2, equal_var=equal_var, mincount=mincount)
+    expected_t_stats, expected_pvals, expected_tested = expected_ttest(values1, values2, equal_var, mincount)
+
+    np.testing.assert_array_equal(tested, expected_tested)
+    np.testing.assert_allclose(t_stats, expected_t_stats, rtol=1e-10, equal_nan=True)
+    np.testing.assert_allclose(pvals, expected_pvals, rtol=1e-10, equal_nan=True)
+
+def test_ttest_columns_special_columns():
+    values1, values2 = make_ttest_groups()
+    t_stats, pvals, tested = _ttest_columns(values1, values2, mincount=3)
+
+    assert not tested[5] # All NaN in the first group
+    assert not tested[4] # Only 2 values in the second group
+    assert tested[6] and np.isnan(t_stats[6]) and np.isnan(pvals[6]) # Same constant in both groups
+    assert tested[7] and np.isfinite(t_stats[7]) # Constant in one group only
+
+def make_corr_data():
+    """Make a variable and a matrix with NaNs in different rows, so each column is correlated over a different set of rows.
+
+    Column 0 is a noisy copy of the variable, and column 1 is its negation, so they're strongly correlated. Column 2 is constant. Column 3 has only 20 rows with values, and column 4 has 21, to test the n > 20 cut in wrap_pearson_corr. Columns 5 and on are random, with some tied values.
+    """
+    generator = np.random.default_rng(1)
+    num_rows = 40
+    x = generator.normal(size=num_rows)
+    x[generator.random(num_rows) < 0.1] = np.nan
+
+    values = with_nans(generator.normal(size=(num_rows, 9)), 0.2, generator)
+    values[:, 0] = x + generator.normal(scale=0.3, size=num_rows)
+    values[:, 1] = -x
+    values[:, 2] = 5.0
+    values[:, 5] = np.round(values[:, 5]) # Ties, to test average ranks
+
+    x_rows = np.flatnonzero(~np.isnan(x))
+    values[:, 3] = np.nan
+    values[x_rows[:20], 3] = generator.normal(size=20)
+    values[:, 4] = np.nan
+    values[x_rows[:21], 4] = generator.normal(size=21)
+
+    values[generator.random(num_rows) < 0.2, 0] = np.nan
+    return x, values
+
+def expected_corr(x, values, method):
+    """Run scipy.stats.pearsonr or spearmanr on each column paired with the variable, over just the rows where both have values."""
+    corr_func = scipy.stats.pearsonr if method == "pearson" else scipy.stats.spearmanr
+    corrs, counts, pvals = [], [], []
+    for col in range(values.shape[1]):
+        present = ~np.isnan(x) & ~np.isnan(values[:, col])
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore") # scipy warns about the constant column
+            result = corr_func(x[present], values[present, col])
+        corrs.append(result[0])
+        pvals.append(result[1])
+        counts.append(present.sum())
+    return np.array(corrs), np.array(counts), np.array(pvals)
+
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+def test_corr_columns_matches_scipy(method):
+    x, values = make_corr_data()
+    corrs, counts, pvals = _corr_columns(x, values, method=method)
+    expected_corrs, expected_counts, expected_pvals = expected_corr(x, values, method)
+
+    np.testing.assert_array_equal(counts, expected_counts)
+    np.testing.assert_allclose(corrs, expected_corrs, rtol=1e-10, atol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(pvals, expected_pvals, rtol=1e-8, atol=1e-300, equal_nan=True)
+
+def test_corr_columns_ranks_over_pairwise_complete_rows():
+    # If the ranks came from all of a column's values, rather than just the rows the column shares with x, the dropped first row would shift every other rank and spoil the perfect correlation
+    x = np.array([np.nan, 1.0, 2.0, 3.0, 4.0])
+    values = np.array([[-100.0], [10.0], [20.0], [30.0], [40.0]])
+    corrs, counts, pvals = _corr_columns(x, values, method="spearman")
+    assert counts[0] == 4
+    assert corrs[0] == pytest.approx(1.0)
+
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+def test_wrap_pearson_corr_matches_scipy(method):
+    x, values = make_corr_data()
+    columns = [f"col{i}" for i in range(values.shape[1])]
+    df = pd.DataFrame(values, columns=columns)
+    df.insert(0, "label", x)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        result = wrap_pearson_corr(df, "label", method=method, return_all=True)
+
+    expected_corrs, expected_counts, expected_pvals = expected_corr(x, values, method)
+    expected = pd.DataFrame({"Comparison": columns, "Correlation": expected_corrs, "P_value": expected_pvals})
+    expected = expected[expected_counts > 20]
+    assert "col3" not in expected["Comparison"].values # 20 rows isn't enough
+    assert "col4" in expected["Comparison"].values # 21 rows is
+
+    result = result.set_index("Comparison").sort_index()
+    expected = expected.set_index("Comparison").sort_index()
+    pd.testing.assert_index_equal(result.index, expected.index)
+    np.testing.assert_allclose(result["Correlation"], expected["Correlation"], rtol=1e-10, atol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(result["P_value"], expected["P_value"], rtol=1e-8, atol=1e-300, equal_nan=True)